@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class _AsyncProxy:
+    """Exposes a container component's methods as coroutines.
+
+    Calling `await proxy.method(...)` runs `component.method(...)` on the
+    shared executor under the concurrency limit for "<name>.<method>". The
+    component is looked up inside the worker thread, so a first-use build
+    (e.g. OAuth) never runs on the event loop.
+    """
+
+    def __init__(self, services: "AsyncGoogleServices", name: str):
+        self._services = services
+        self._name = name
+
+    def __getattr__(self, attr: str):
+        endpoint = f"{self._name}.{attr}"
+
+        def invoke(*args, **kwargs):
+            method = getattr(self._services.container.get(self._name), attr)
+            return method(*args, **kwargs)
+
+        async def call(*args, **kwargs):
+            return await self._services.run(endpoint, invoke, *args, **kwargs)
+
+        return call
+
+class AsyncGoogleServices:
+    """Async front for the blocking Gmail and Calendar managers.
+
+    The Google client libraries are synchronous, so calling them from an
+    `async def` handler stalls the event loop. This layer runs them on a
+    dedicated, sized thread pool, with a per-endpoint semaphore so a slow
+    endpoint cannot take every worker.
+
+    Usage:
+        services = AsyncGoogleServices(container, 'gmail', 'calendar')
+        emails = await services.gmail.list_recent_emails(max_results=30)
+    """
+
+    DEFAULT_WORKERS = 16
+    DEFAULT_LIMIT = 4
+    # Listing endpoints are slow and get called on every dashboard refresh
+    ENDPOINT_LIMITS = {
+        'gmail.list_recent_emails': 2,
+        'gmail.get_starred_emails': 2,
+        'mail_mirror.list_recent_emails': 2,
+        'mail_mirror.get_starred_emails': 2,
+        'calendar.list_upcoming_events': 2,
+    }
+
+    def __init__(self, container, *names: str, max_workers: Optional[int] = None,
+                 limits: Optional[Dict[str, int]] = None):
+        self.container = container
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.DEFAULT_WORKERS,
+            thread_name_prefix='google-api'
+        )
+        self.limits = {**self.ENDPOINT_LIMITS, **(limits or {})}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+        for name in names:
+            setattr(self, name, _AsyncProxy(self, name))
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self.limits.get(endpoint, self.DEFAULT_LIMIT))
+        return self._semaphores[endpoint]
+
+    async def run(self, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the executor under the endpoint's limit."""
+        stats = self.stats.setdefault(endpoint, {
+            'calls': 0, 'errors': 0, 'waiting': 0, 'in_flight': 0, 'total_ms': 0.0
+        })
+        stats['waiting'] += 1
+        async with self._semaphore(endpoint):
+            stats['waiting'] -= 1
+            stats['in_flight'] += 1
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+            except Exception:
+                stats['errors'] += 1
+                raise
+            finally:
+                stats['in_flight'] -= 1
+                stats['calls'] += 1
+                stats['total_ms'] += (time.perf_counter() - start) * 1000
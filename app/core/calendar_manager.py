@@ -2,12 +2,21 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import google_auth_httplib2
+import heapq
+import httplib2
 import os.path
 import pickle
 from datetime import datetime, timedelta
 from dateparser import parse
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List
+import threading
+import time
 import pytz
+from .calendar_store import CalendarStore, event_timestamp
 
 class CalendarManager:
     SCOPES = ['https://www.googleapis.com/auth/calendar']
@@ -17,13 +26,24 @@ class CalendarManager:
         'monthly': 'RRULE:FREQ=MONTHLY',
         'yearly': 'RRULE:FREQ=YEARLY'
     }
+    # Calendars to exclude
+    EXCLUDED_CALENDARS = ['Weather', 'Holidays in United States', 'Jewish Holidays', 'Edmonton Oilers']
+    # Upper bound on calendars fetched at the same time
+    MAX_FETCH_WORKERS = 8
     
     def __init__(self):
         self.creds = None
         self.service = None
         self.credentials_path = 'app/config/credentials.json'
         self.token_path = 'calendar_token.pickle'  # Separate token file
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_FETCH_WORKERS,
+            thread_name_prefix='calendar-fetch'
+        )
+        self._stats_lock = threading.Lock()
+        self.fetch_stats = {}  # Calendar ID -> timing and error counts
         self._authenticate()
+        self.store = CalendarStore(self)
         
         # Add additional calendars
         self.additional_calendars = {
@@ -53,14 +73,78 @@ class CalendarManager:
                 with open(self.token_path, 'wb') as token:
                     pickle.dump(self.creds, token)
 
-            self.service = build('calendar', 'v3', credentials=self.creds)
+            # Each request gets its own HTTP connection (see _build_request), which
+            # lets calendars be fetched from several threads at once
+            self.service = build(
+                'calendar', 'v3',
+                http=google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http()),
+                requestBuilder=self._build_request
+            )
             print("Calendar authentication successful!")
         
         except Exception as e:
             print(f"Calendar authentication error: {str(e)}")
             raise
 
-    def parse_time(self, time_str: str, reference_date: datetime = None) -> datetime:
+    def _build_request(self, http, *args, **kwargs):
+        """Build an API request on a fresh authorized connection (httplib2 is not thread-safe)."""
+        new_http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http())
+        return HttpRequest(new_http, *args, **kwargs)
+
+    def _record_fetch(self, cal_id: str, cal_name: str, elapsed_ms: float, error: Optional[Exception] = None):
+        with self._stats_lock:
+            stats = self.fetch_stats.setdefault(cal_id, {
+                'name': cal_name, 'calls': 0, 'errors': 0, 'last_ms': 0.0, 'total_ms': 0.0, 'last_error': None
+            })
+            stats['name'] = cal_name
+            stats['calls'] += 1
+            stats['last_ms'] = elapsed_ms
+            stats['total_ms'] += elapsed_ms
+            if error is not None:
+                stats['errors'] += 1
+                stats['last_error'] = str(error)
+
+    def get_fetch_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return fetch timing and error statistics by calendar ID (the name is a field)."""
+        with self._stats_lock:
+            return {
+                cal_id: {**stats, 'avg_ms': stats['total_ms'] / stats['calls'] if stats['calls'] else 0.0}
+                for cal_id, stats in self.fetch_stats.items()
+            }
+
+    def fan_out(self, calendars: Dict[str, str], fetch: Callable[[str, str], Any]) -> Dict[str, Any]:
+        """Run fetch(cal_id, cal_name) for every calendar on the worker pool.
+
+        Results are keyed by calendar ID, since several calendars can share
+        a name.
+
+        Returns:
+            dict: Calendar ID -> fetch result, leaving out calendars that failed
+        """
+        def timed(cal_id, cal_name):
+            start = time.perf_counter()
+            try:
+                result = fetch(cal_id, cal_name)
+            except Exception as e:
+                self._record_fetch(cal_id, cal_name, (time.perf_counter() - start) * 1000, e)
+                print(f"Error fetching events from calendar {cal_name}: {e}")
+                return None
+            self._record_fetch(cal_id, cal_name, (time.perf_counter() - start) * 1000)
+            return result
+
+        futures = {
+            cal_id: self._executor.submit(timed, cal_id, cal_name)
+            for cal_id, cal_name in calendars.items()
+        }
+        results = {}
+        for cal_id, future in futures.items():
+            result = future.result()
+            if result is not None:
+                results[cal_id] = result
+        return results
+
+    @staticmethod
+    def parse_time(time_str: str, reference_date: datetime = None) -> datetime:
         """Parse natural language time strings."""
         parsed = parse(time_str, settings={
             'PREFER_DATES_FROM': 'future',
@@ -113,74 +197,70 @@ class CalendarManager:
                     raise ValueError(f"Invalid recurrence pattern: {recurrence}")
 
             created_event = self.service.events().insert(calendarId='primary', body=event).execute()
+            self.store.mark_stale()
             return created_event['id']
 
         except Exception as e:
             raise Exception(f"Failed to create event: {str(e)}")
 
-    def _get_google_events(self, max_results=10):
-        """Get events from all accessible Google calendars."""
+    def _get_google_events(self, max_results=10) -> List[List[Dict]]:
+        """Get upcoming events from all accessible Google calendars concurrently.
+
+        Returns:
+            list: One list per calendar, each already ordered by start time
+        """
         now = datetime.utcnow().isoformat() + 'Z'
-        all_events = []
-        
-        # Calendars to exclude
-        excluded_calendars = ['Weather', 'Holidays in United States', 'Jewish Holidays', 'Edmonton Oilers']
+
+        def fetch(cal_id, cal_name):
+            # No calendar can contribute more than max_results to the merged top N
+            events_result = self.service.events().list(
+                calendarId=cal_id,
+                timeMin=now,
+                maxResults=max_results,
+                singleEvents=True,
+                orderBy='startTime'
+            ).execute()
+
+            # Add calendar source to each event
+            events = events_result.get('items', [])
+            for event in events:
+                if 'summary' not in event:
+                    event['summary'] = 'Untitled Event'
+                event['calendar'] = cal_name
+            return events
 
         try:
             # First, get list of all calendar IDs
             calendar_list = self.service.calendarList().list().execute()
-            
-            # Fetch events from each calendar
-            for calendar_entry in calendar_list['items']:
-                cal_id = calendar_entry['id']
-                cal_name = calendar_entry['summary']
-                
-                # Skip excluded calendars
-                if cal_name in excluded_calendars:
-                    continue
-                    
-                try:
-                    # Get events from each calendar (don't limit here)
-                    events_result = self.service.events().list(
-                        calendarId=cal_id,
-                        timeMin=now,
-                        maxResults=100,  # Get more events to ensure we have enough after merging
-                        singleEvents=True,
-                        orderBy='startTime'
-                    ).execute()
-                    
-                    # Add calendar source to each event
-                    for event in events_result.get('items', []):
-                        if 'summary' not in event:
-                            event['summary'] = 'Untitled Event'
-                        event['calendar'] = cal_name
-                        all_events.append(event)
-                        
-                except Exception as e:
-                    print(f"Error fetching events from calendar {cal_name}: {e}")
-                    continue
-                    
-            return all_events
-        
+            calendars = {
+                entry['id']: entry['summary']
+                for entry in calendar_list['items']
+                if entry['summary'] not in self.EXCLUDED_CALENDARS
+            }
+            return list(self.fan_out(calendars, fetch).values())
+
         except Exception as e:
             print(f"Error listing calendars: {e}")
             return []
 
     def list_upcoming_events(self, max_results=10):
-        """List upcoming events from all calendars."""
+        """List upcoming events from all calendars, served from the local event store."""
         try:
-            # Get all events first
-            events = self._get_google_events(max_results)
-            
-            # Sort all events
-            def event_sort_key(event):
-                start = event.get('start', {})
-                return start.get('dateTime') or start.get('date') or ''
-            
-            # Sort and limit only at the end
-            sorted_events = sorted(events, key=event_sort_key)
-            return sorted_events[:max_results]  # Apply limit here
+            self.store.sync()
+            return self.store.upcoming_events(max_results)
+        except Exception as e:
+            print(f"Calendar store unavailable, listing live: {e}")
+            return self._list_live_events(max_results)
+
+    def _list_live_events(self, max_results=10):
+        """List upcoming events by querying every calendar directly."""
+        try:
+            per_calendar = self._get_google_events(max_results)
+
+            # k-way merge of the per-calendar lists, stopping after max_results
+            merged = heapq.merge(*per_calendar, key=event_timestamp)
+            return list(islice(merged, max_results))
             
         except Exception as e:
             print(f"Error in list_upcoming_events: {e}")
-            return []
\ No newline at end of file
+            return []
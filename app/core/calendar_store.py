@@ -0,0 +1,209 @@
+from googleapiclient.errors import HttpError
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+import json
+import os
+import pytz
+import sqlite3
+import threading
+import time
+
+def event_timestamp(event: Dict, field: str = 'start', time_zone: Optional[str] = None) -> float:
+    """Return an event's start or end as a POSIX timestamp for ordering.
+
+    All-day events only carry a date, which is midnight in the calendar's
+    time zone (time_zone, or the event's own timeZone, or local time).
+    """
+    when = event.get(field, {})
+    value = when.get('dateTime') or when.get('date')
+    if not value:
+        return 0.0
+    if 'T' in value:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    midnight = datetime.fromisoformat(value)
+    zone = time_zone or when.get('timeZone')
+    if zone:
+        try:
+            return pytz.timezone(zone).localize(midnight).timestamp()
+        except pytz.UnknownTimeZoneError:
+            pass
+    return midnight.timestamp()  # Naive datetimes are taken as local time
+
+class CalendarStore:
+    """Persistent per-calendar event store kept current with Google sync tokens.
+
+    The first sync of a calendar lists its events from a day ago up to
+    HORIZON_DAYS ahead (recurring events are expanded, so an open-ended
+    series needs an end) and saves the returned nextSyncToken. Later syncs
+    only fetch what changed since that token, so the cost follows the number
+    of changes rather than the size of the calendar. Once less than half of
+    the horizon is left, the calendar is listed in full again to extend it.
+    """
+
+    # Minimum seconds between syncs triggered by reads
+    SYNC_INTERVAL = 60
+    PAGE_SIZE = 250
+    HORIZON_DAYS = 365
+
+    def __init__(self, calendar, db_path: str = "data/calendar_events.db"):
+        self.calendar = calendar
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._last_sync = 0
+        self.stats = {'full_syncs': 0, 'incremental_syncs': 0, 'token_expired': 0}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS calendars (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                sync_token TEXT,
+                time_zone TEXT,
+                horizon_end REAL
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                calendar_id TEXT,
+                event_id TEXT,
+                start_ts REAL,
+                end_ts REAL,
+                payload TEXT,
+                PRIMARY KEY (calendar_id, event_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_start ON events (start_ts);
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(calendars)")}
+        if 'horizon_end' not in columns:
+            # Stores from before the horizon: all-day times were computed in
+            # UTC, so drop the sync tokens to force a full resync
+            self.conn.execute("ALTER TABLE calendars ADD COLUMN time_zone TEXT")
+            self.conn.execute("ALTER TABLE calendars ADD COLUMN horizon_end REAL")
+            self.conn.execute("UPDATE calendars SET sync_token = NULL")
+        self.conn.commit()
+
+    def _get_sync_state(self, cal_id: str) -> tuple:
+        """Return the calendar's (sync_token, time_zone, horizon_end)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sync_token, time_zone, horizon_end FROM calendars WHERE id = ?", (cal_id,)
+            ).fetchone()
+        return row if row else (None, None, None)
+
+    def _list_event_pages(self, cal_id: str, sync_token: Optional[str], horizon_end: Optional[float] = None):
+        """List a calendar's events, returning (items, next_sync_token, calendar time zone)."""
+        items = []
+        time_zone = None
+        page_token = None
+        while True:
+            params = {
+                'calendarId': cal_id,
+                'singleEvents': True,
+                'maxResults': self.PAGE_SIZE
+            }
+            if sync_token:
+                params['syncToken'] = sync_token
+            else:
+                params['timeMin'] = (datetime.utcnow() - timedelta(days=1)).isoformat() + 'Z'
+                params['timeMax'] = datetime.utcfromtimestamp(horizon_end).isoformat() + 'Z'
+            if page_token:
+                params['pageToken'] = page_token
+
+            result = self.calendar.service.events().list(**params).execute()
+            items.extend(result.get('items', []))
+            time_zone = result.get('timeZone', time_zone)
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return items, result.get('nextSyncToken'), time_zone
+
+    def _apply_events(self, cal_id: str, cal_name: str, items: List[Dict], sync_token: Optional[str], full: bool,
+                      time_zone: Optional[str], horizon_end: Optional[float]):
+        with self._lock, self.conn:
+            if full:
+                self.conn.execute("DELETE FROM events WHERE calendar_id = ?", (cal_id,))
+            for event in items:
+                if event.get('status') == 'cancelled':
+                    self.conn.execute(
+                        "DELETE FROM events WHERE calendar_id = ? AND event_id = ?",
+                        (cal_id, event['id'])
+                    )
+                    continue
+                if 'summary' not in event:
+                    event['summary'] = 'Untitled Event'
+                event['calendar'] = cal_name
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)",
+                    (
+                        cal_id,
+                        event['id'],
+                        event_timestamp(event, 'start', time_zone),
+                        event_timestamp(event, 'end' if 'end' in event else 'start', time_zone),
+                        json.dumps(event)
+                    )
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO calendars (id, name, sync_token, time_zone, horizon_end) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cal_id, cal_name, sync_token, time_zone, horizon_end)
+            )
+
+    def sync_calendar(self, cal_id: str, cal_name: str) -> bool:
+        """Sync one calendar, incrementally when a sync token is stored and the horizon is far enough out."""
+        sync_token, time_zone, horizon_end = self._get_sync_state(cal_id)
+        horizon_seconds = self.HORIZON_DAYS * 86400
+        if sync_token and horizon_end and horizon_end - time.time() > horizon_seconds / 2:
+            try:
+                items, next_token, listed_zone = self._list_event_pages(cal_id, sync_token)
+                self._apply_events(cal_id, cal_name, items, next_token, False,
+                                   listed_zone or time_zone, horizon_end)
+                self.stats['incremental_syncs'] += 1
+                return True
+            except HttpError as e:
+                # 410 Gone means the token is no longer valid
+                if e.resp.status != 410:
+                    raise
+                print(f"Debug: Sync token expired for calendar {cal_name}, resyncing")
+                self.stats['token_expired'] += 1
+
+        horizon_end = time.time() + horizon_seconds
+        items, next_token, time_zone = self._list_event_pages(cal_id, None, horizon_end)
+        self._apply_events(cal_id, cal_name, items, next_token, True, time_zone, horizon_end)
+        self.stats['full_syncs'] += 1
+        return True
+
+    def sync(self, force: bool = False):
+        """Sync all calendars, at most once per SYNC_INTERVAL unless forced."""
+        if not force and time.time() - self._last_sync < self.SYNC_INTERVAL:
+            return
+
+        calendar_list = self.calendar.service.calendarList().list().execute()
+        calendars = {
+            entry['id']: entry['summary']
+            for entry in calendar_list.get('items', [])
+            if entry['summary'] not in self.calendar.EXCLUDED_CALENDARS
+        }
+
+        # Calendars sync concurrently; fan_out records per-calendar timing and errors
+        self.calendar.fan_out(calendars, self.sync_calendar)
+
+        # Drop calendars that were unsubscribed or excluded
+        with self._lock, self.conn:
+            stored = [row[0] for row in self.conn.execute("SELECT id FROM calendars")]
+            for cal_id in stored:
+                if cal_id not in calendars:
+                    self.conn.execute("DELETE FROM events WHERE calendar_id = ?", (cal_id,))
+                    self.conn.execute("DELETE FROM calendars WHERE id = ?", (cal_id,))
+
+        self._last_sync = time.time()
+
+    def mark_stale(self):
+        """Force the next read to sync, e.g. after creating an event."""
+        self._last_sync = 0
+
+    def upcoming_events(self, max_results: int = 10) -> List[Dict]:
+        """Return events that have not ended yet, ordered by start time."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT payload FROM events WHERE end_ts > ? ORDER BY start_ts LIMIT ?",
+                (time.time(), max_results)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
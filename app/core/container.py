@@ -0,0 +1,56 @@
+from typing import Any, Callable, Dict
+import threading
+import time
+
+class ServiceContainer:
+    """Owns single, lazily built instances of shared clients.
+
+    Factories are registered by name and only run on the first get(), so
+    startup no longer pays for OAuth, discovery documents or database opens
+    that a request may never need. Build time is recorded per component.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._registry_lock = threading.Lock()
+        self.build_times: Dict[str, float] = {}  # Component name -> build time in ms
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Register a zero-argument factory for a component."""
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.RLock()
+
+    def get(self, name: str) -> Any:
+        """Return the component, building it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._factories:
+            raise KeyError(f"Unknown service: {name}")
+
+        # One lock per component so a slow build (e.g. an OAuth flow) only
+        # blocks callers waiting for that same component
+        with self._locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self.build_times[name] = (time.perf_counter() - start) * 1000
+                print(f"Debug: Built {name} in {self.build_times[name]:.0f}ms")
+            return self._instances[name]
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def report(self) -> Dict[str, Any]:
+        """Return build status and time for every registered component."""
+        return {
+            name: {
+                'built': name in self._instances,
+                'build_ms': self.build_times.get(name)
+            }
+            for name in self._factories
+        }
@@ -0,0 +1,257 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import time
+
+MAX_LINE_CHARS = 500
+
+def _read_file_lines(args: tuple) -> tuple:
+    """Read a text file into (line number, text) pairs. Runs in a worker process."""
+    full_path, rel_path, mtime, size = args
+    try:
+        with open(full_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return rel_path, mtime, size, None
+    if b'\0' in data[:8192]:
+        return rel_path, mtime, size, None  # Binary despite its extension
+    text = data.decode('utf-8', errors='ignore')
+    lines = [
+        (line_no, line.strip()[:MAX_LINE_CHARS])
+        for line_no, line in enumerate(text.splitlines(), start=1)
+        if line.strip()
+    ]
+    return rel_path, mtime, size, lines
+
+class ContentIndex:
+    """Full-text index over the lines of text files known to the FileIndex.
+
+    Files are read and split into lines in a process pool, and each line is
+    stored in a table indexed by document and mirrored into an FTS5 index,
+    so a search returns BM25-ranked matching lines with their line numbers
+    and replacing one file's lines never scans the whole index. Updates are
+    incremental: only files whose mtime or size changed since the last pass
+    are re-read, and files that left the filename index are dropped.
+    """
+
+    REFRESH_INTERVAL = 300
+    SCHEMA_VERSION = 2
+    BATCH_SIZE = 64
+    MAX_FILE_SIZE = 1024 * 1024
+    TERM_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, file_index, text_extensions: Iterable[str], db_path: str = "data/content_index.db",
+                 max_workers: Optional[int] = None):
+        self.file_index = file_index
+        self.text_extensions = set(text_extensions)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.ready = False
+        self.stats = {
+            'files': 0, 'last_update_ms': None, 'files_per_second': None,
+            'searches': 0, 'last_search_ms': None
+        }
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            self._create_tables()
+            self.available = True
+        except sqlite3.OperationalError as e:
+            print(f"Warning: SQLite FTS5 unavailable, content search disabled: {e}")
+            self.available = False
+            return
+        # A previously completed index can answer queries while it catches up
+        self.ready = self.conn.execute("SELECT 1 FROM state WHERE key = 'indexed'").fetchone() is not None
+
+    def _create_tables(self):
+        """Line text lives in a plain table indexed by doc_id; the FTS5 index uses it as external content."""
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+            # The first version kept doc_id inside the FTS table, where it cannot be indexed
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS lines;
+                DROP TABLE IF EXISTS docs;
+                DROP TABLE IF EXISTS state;
+            """)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                mtime REAL,
+                size INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS line_text (
+                id INTEGER PRIMARY KEY,
+                doc_id INTEGER NOT NULL,
+                line_no INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_line_text_doc ON line_text (doc_id);
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS lines
+                USING fts5(text, content='line_text', content_rowid='id', tokenize='porter unicode61');
+            CREATE TRIGGER IF NOT EXISTS line_text_ai AFTER INSERT ON line_text BEGIN
+                INSERT INTO lines (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS line_text_ad AFTER DELETE ON line_text BEGIN
+                INSERT INTO lines (lines, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            PRAGMA user_version = {self.SCHEMA_VERSION};
+        """)
+        self.conn.commit()
+
+    def _candidates(self) -> Dict[str, tuple]:
+        """Return {relative path: (mtime, size)} for indexable files in the filename index."""
+        with self.file_index._lock:
+            paths = [row[0] for row in self.file_index.conn.execute("SELECT path FROM files WHERE is_dir = 0")]
+        candidates = {}
+        for rel_path in paths:
+            if os.path.splitext(rel_path)[1].lower() not in self.text_extensions:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.file_index.root, rel_path))
+            except OSError:
+                continue
+            if stat.st_size <= self.MAX_FILE_SIZE:
+                candidates[rel_path] = (stat.st_mtime, stat.st_size)
+        return candidates
+
+    def _store(self, results: List[tuple]):
+        """Replace the indexed lines of a batch of files in one transaction."""
+        with self._lock:
+            for rel_path, mtime, size, lines in results:
+                row = self.conn.execute("SELECT id FROM docs WHERE path = ?", (rel_path,)).fetchone()
+                if row:
+                    self.conn.execute("DELETE FROM line_text WHERE doc_id = ?", (row[0],))
+                    doc_id = row[0]
+                    self.conn.execute("UPDATE docs SET mtime = ?, size = ? WHERE id = ?", (mtime, size, doc_id))
+                else:
+                    doc_id = self.conn.execute(
+                        "INSERT INTO docs (path, mtime, size) VALUES (?, ?, ?)", (rel_path, mtime, size)
+                    ).lastrowid
+                if lines:
+                    self.conn.executemany(
+                        "INSERT INTO line_text (doc_id, line_no, text) VALUES (?, ?, ?)",
+                        [(doc_id, line_no, text) for line_no, text in lines]
+                    )
+            self.conn.commit()
+
+    def update(self):
+        """Re-read new or changed files and drop files that no longer exist."""
+        start = time.perf_counter()
+        candidates = self._candidates()
+        with self._lock:
+            indexed = {path: (doc_id, mtime, size) for doc_id, path, mtime, size
+                       in self.conn.execute("SELECT id, path, mtime, size FROM docs")}
+
+        removed = [indexed[path][0] for path in indexed if path not in candidates]
+        if removed:
+            with self._lock:
+                for doc_id in removed:
+                    self.conn.execute("DELETE FROM line_text WHERE doc_id = ?", (doc_id,))
+                    self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                self.conn.commit()
+
+        changed = [
+            (os.path.join(self.file_index.root, path), path, mtime, size)
+            for path, (mtime, size) in candidates.items()
+            if indexed.get(path, (None, None, None))[1:] != (mtime, size)
+        ]
+        if changed:
+            # The pool is created from a thread of a multi-threaded server, where
+            # forking can copy held locks into the workers, so spawn them instead
+            pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+            try:
+                batch = []
+                for result in pool.map(_read_file_lines, changed, chunksize=self.BATCH_SIZE):
+                    if self._stop.is_set():
+                        break
+                    batch.append(result)
+                    if len(batch) >= self.BATCH_SIZE:
+                        self._store(batch)
+                        batch = []
+                if batch:
+                    self._store(batch)
+            finally:
+                # Drop queued chunks so stop() does not wait for the whole pass
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if not self._stop.is_set():
+                self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('indexed', ?)", (str(time.time()),))
+                self.conn.commit()
+            self.stats['files'] = self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        self.stats['last_update_ms'] = elapsed * 1000
+        if changed:
+            self.stats['files_per_second'] = round(len(changed) / max(elapsed, 1e-9))
+            print(f"Debug: Content-indexed {len(changed)} files in {elapsed * 1000:.0f}ms "
+                  f"({self.stats['files_per_second']} files/s)")
+
+    def _run(self):
+        # File discovery comes from the filename index, so wait for it
+        while not self.file_index.ready and not self._stop.wait(1):
+            pass
+        while not self._stop.is_set():
+            try:
+                self.update()
+                if not self._stop.is_set():
+                    self.ready = True
+            except Exception as e:
+                print(f"Error updating content index: {e}")
+            self._stop.wait(self.REFRESH_INTERVAL)
+
+    def start(self):
+        if self.available and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='content-index', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def search(self, query: str, limit: int = 20, match_any: bool = False, under: str = "",
+               show_hidden: bool = False) -> List[Dict]:
+        """Return the best matching lines as {path, line, snippet}, best first.
+
+        Args:
+            query: Words to look for (stemmed, case-insensitive)
+            limit: Maximum number of lines to return
+            match_any: Match lines containing any word instead of all of them
+            under: Only search files below this directory, relative to the root
+            show_hidden: Include files inside or named like dot files/folders
+        """
+        terms = self.TERM_PATTERN.findall(query)
+        if not self.available or not terms:
+            return []
+        start = time.perf_counter()
+        self.stats['searches'] += 1
+        match = (" OR " if match_any else " ").join('"' + term.replace('"', '') + '"' for term in terms)
+
+        sql = (
+            "SELECT docs.path, line_text.line_no, snippet(lines, 0, '[', ']', '...', 16) "
+            "FROM lines JOIN line_text ON line_text.id = lines.rowid "
+            "JOIN docs ON docs.id = line_text.doc_id WHERE lines MATCH ?"
+        )
+        params: List = [match]
+        if under:
+            sql += " AND docs.path LIKE ? ESCAPE '\\'"
+            params.append(self.file_index._escape_like(under) + '/%')
+        if not show_hidden:
+            sql += " AND docs.path NOT LIKE '.%' AND docs.path NOT LIKE '%/.%'"
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        self.stats['last_search_ms'] = (time.perf_counter() - start) * 1000
+        return [{"path": path, "line": line_no, "snippet": snippet} for path, line_no, snippet in rows]
@@ -0,0 +1,105 @@
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List
+import os
+import sqlite3
+import threading
+import time
+
+class ConversationLog:
+    """Append-only, time-ordered log of conversation turns per session.
+
+    Turns are written to SQLite and the latest ones for each session are kept
+    in an in-memory ring buffer, so reading recent history needs neither a
+    database query nor an embedding call. A session's buffer is filled from
+    the database the first time it is read (e.g. after a restart), and only
+    the most recently used sessions keep a buffer.
+    """
+
+    BUFFER_SIZE = 50
+    MAX_BUFFERED_SESSIONS = 256
+
+    def __init__(self, db_path: str = "data/conversations.db", buffer_size: int = None):
+        self.db_path = db_path
+        self.buffer_size = buffer_size or self.BUFFER_SIZE
+        self._lock = threading.Lock()
+        self._buffers: "OrderedDict[str, Deque[Dict]]" = OrderedDict()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                user_message TEXT,
+                assistant_response TEXT,
+                timestamp REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_turns_session ON turns (session_id, id);
+            CREATE INDEX IF NOT EXISTS idx_turns_session_time ON turns (session_id, timestamp);
+        """)
+        self.conn.commit()
+
+    def _buffer(self, session_id: str) -> Deque[Dict]:
+        """Return the session's ring buffer, loading it on first access. Caller holds the lock."""
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            buffer = deque(reversed(self._load(session_id, self.buffer_size)), maxlen=self.buffer_size)
+            self._buffers[session_id] = buffer
+            while len(self._buffers) > self.MAX_BUFFERED_SESSIONS:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(session_id)
+        return buffer
+
+    def _load(self, session_id: str, limit: int) -> List[Dict]:
+        """Read the session's latest turns from the database, newest first. Caller holds the lock."""
+        rows = self.conn.execute(
+            "SELECT user_message, assistant_response, timestamp FROM turns "
+            "WHERE session_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (session_id, limit)
+        ).fetchall()
+        return [{'user': user, 'assistant': assistant, 'timestamp': ts} for user, assistant, ts in rows]
+
+    def append(self, session_id: str, user_message: str, assistant_response: str):
+        """Record one turn."""
+        turn = {'user': user_message, 'assistant': assistant_response, 'timestamp': time.time()}
+        with self._lock:
+            buffer = self._buffer(session_id)
+            self.conn.execute(
+                "INSERT INTO turns (session_id, user_message, assistant_response, timestamp) VALUES (?, ?, ?, ?)",
+                (session_id, user_message, assistant_response, turn['timestamp'])
+            )
+            self.conn.commit()
+            buffer.append(turn)
+
+    def recent(self, session_id: str, limit: int = 5) -> List[Dict]:
+        """Return up to limit of the session's latest turns, newest first."""
+        with self._lock:
+            buffer = self._buffer(session_id)
+            if limit <= len(buffer):
+                return [buffer[-i] for i in range(1, limit + 1)]
+            if len(buffer) < self.buffer_size:
+                # Buffer already holds the session's whole history
+                return list(reversed(buffer))
+            return self._load(session_id, limit)
+
+    def drop(self, session_id: str, delete_turns: bool = False):
+        """Release a session's buffer, and its stored turns when the session has ended for good."""
+        with self._lock:
+            self._buffers.pop(session_id, None)
+            if delete_turns:
+                self.conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+                self.conn.commit()
+
+    def import_turns(self, session_id: str, turns: Iterable[Dict]) -> int:
+        """Bulk-insert past turns ({'user', 'assistant', 'timestamp'}), e.g. when migrating history."""
+        rows = [(session_id, turn['user'], turn['assistant'], turn['timestamp']) for turn in turns]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO turns (session_id, user_message, assistant_response, timestamp) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+            # Reload on next read so imported turns take their place by timestamp
+            self._buffers.pop(session_id, None)
+        return len(rows)
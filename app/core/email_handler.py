@@ -1,8 +1,10 @@
 from .gmail_manager import GmailManager
 
 class EmailHandler:
-    def __init__(self):
-        self.gmail = GmailManager()
+    def __init__(self, services=None):
+        # Optional ServiceContainer providing the shared gmail and mail_mirror
+        self.services = services
+        self._gmail = None
         self.current_email_context = None
         self.email_knowledge = {}  # Store learned preferences/information
         self.awaiting_answer = None  # Track if waiting for user input
@@ -10,12 +12,27 @@ class EmailHandler:
         self.draft_state = None   # Track state of draft process
         self.last_email_list = []  # Store the last list of emails for number references
 
+    @property
+    def gmail(self):
+        """The Gmail client, shared through the service container when one is given."""
+        if self.services:
+            return self.services.get('gmail')
+        if self._gmail is None:
+            self._gmail = GmailManager()
+        return self._gmail
+
+    @property
+    def mirror(self):
+        """The mailbox mirror used for list commands, if available."""
+        return self.services.get('mail_mirror') if self.services else None
+
     def handle_command(self, subcommand: str, args: str = "") -> str:
         """Handle email-related commands."""
         try:
             print(f"Debug: Email command received: {subcommand} with args: {args}")  # Debug print
             if subcommand == "list":
-                unread = self.gmail.list_unread_emails()
+                source = self.mirror or self.gmail
+                unread = source.list_unread_emails()
                 print(f"Debug: Got unread emails: {unread}")  # Debug print
                 if not unread:
                     return "No unread emails found."
@@ -147,6 +164,8 @@ class EmailHandler:
             # Mark as read only if keep_unread is False
             if not keep_unread:
                 self.gmail.mark_as_read(email_id)
+                if self.mirror:
+                    self.mirror.mark_stale()
             
             # Get unsubscribe link if available
             unsubscribe_link = self.gmail.get_unsubscribe_link(email_id)
@@ -176,6 +195,8 @@ class EmailHandler:
                 return "Please provide an email ID."
             
             if self.gmail.mark_as_read(email_id.strip()):
+                if self.mirror:
+                    self.mirror.mark_stale()
                 return f"Email {email_id} marked as read."
             else:
                 return f"Failed to mark email {email_id} as read."
@@ -304,7 +325,8 @@ Or ask any questions about the draft.
                 except ValueError:
                     return "Please specify either a number or 'all'"
             
-            emails = self.gmail.get_starred_emails(max_results)
+            source = self.mirror or self.gmail
+            emails = source.get_starred_emails(max_results)
             if not emails:
                 return "No starred emails found."
 
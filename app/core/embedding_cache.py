@@ -0,0 +1,140 @@
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from array import array
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Content-addressed cache in front of a chromadb embedding function.
+
+    Embeddings are keyed by a hash of the model and the text, kept in an
+    in-memory LRU and optionally persisted to SQLite. Every collection that
+    shares an instance shares the cache, so a prompt that is queried against
+    several collections in one turn is only embedded once. The on-disk store
+    is bounded too: rows unused for MAX_DISK_AGE seconds are dropped, and the
+    least recently used rows go once it holds more than max_disk_entries.
+    """
+
+    MAX_ENTRIES = 4096
+    MAX_DISK_ENTRIES = 100000
+    MAX_DISK_AGE = 90 * 24 * 3600
+
+    def __init__(self, base: Optional[EmbeddingFunction] = None, max_entries: Optional[int] = None,
+                 db_path: Optional[str] = "data/embedding_cache.db", max_disk_entries: Optional[int] = None):
+        self.base = base or embedding_functions.DefaultEmbeddingFunction()
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.max_disk_entries = max_disk_entries or self.MAX_DISK_ENTRIES
+        self._model = type(self.base).__name__
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'embed_calls': 0, 'disk_evicted': 0}
+
+        self.conn = None
+        self._disk_rows = 0
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(embeddings)")}
+            if 'last_used' not in columns:
+                # Caches written before the size bound count as used now
+                self.conn.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL")
+                self.conn.execute("UPDATE embeddings SET last_used = ?", (time.time(),))
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            self._disk_rows = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            with self._lock:
+                self._prune_disk()
+            self.conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._model}\0{text}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]):
+        """Add to the LRU. Caller holds the lock."""
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_from_disk(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Read vectors from disk and mark them used. Caller holds the lock."""
+        if not self.conn or not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        rows = self.conn.execute(
+            f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+        ).fetchall()
+        if rows:
+            now = time.time()
+            self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key, _ in rows])
+            self.conn.commit()
+        return {key: array('f', blob).tolist() for key, blob in rows}
+
+    def _prune_disk(self):
+        """Drop expired rows, then the least recently used rows over the cap. Caller holds the lock."""
+        evicted = self.conn.execute(
+            "DELETE FROM embeddings WHERE last_used < ?", (time.time() - self.MAX_DISK_AGE,)
+        ).rowcount
+        self._disk_rows -= evicted
+        excess = self._disk_rows - self.max_disk_entries
+        if excess > 0:
+            evicted += self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used, rowid LIMIT ?)", (excess,)
+            ).rowcount
+            self._disk_rows = self.max_disk_entries
+        self.stats['disk_evicted'] += evicted
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [self._key(text) for text in input]
+        vectors: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    vectors[key] = self._entries[key]
+            self.stats['hits'] += sum(1 for key in keys if key in vectors)
+
+            missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+            for key, vector in self._load_from_disk(missing).items():
+                vectors[key] = vector
+                self._remember(key, vector)
+                self.stats['disk_hits'] += 1
+
+        # Embed whatever is left in a single call, outside the lock
+        pending = {key: text for key, text in zip(keys, input) if key not in vectors}
+        if pending:
+            embedded = self.base(list(pending.values()))
+            with self._lock:
+                self.stats['embed_calls'] += 1
+                self.stats['misses'] += len(pending)
+                for key, vector in zip(pending, embedded):
+                    vector = [float(x) for x in vector]
+                    vectors[key] = vector
+                    self._remember(key, vector)
+                if self.conn:
+                    now = time.time()
+                    inserted = self.conn.executemany(
+                        "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                        [(key, array('f', vectors[key]).tobytes(), now) for key in pending]
+                    ).rowcount
+                    self._disk_rows += inserted
+                    if self._disk_rows > self.max_disk_entries:
+                        self._prune_disk()
+                    self.conn.commit()
+
+        return [vectors[key] for key in keys]
+
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+        return (self.stats['hits'] + self.stats['disk_hits']) / lookups if lookups else 0.0
+
+    def report(self) -> Dict:
+        return {**self.stats, 'entries': len(self._entries), 'disk_entries': self._disk_rows,
+                'hit_rate': round(self.hit_rate(), 3)}
@@ -0,0 +1,289 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import os
+import sqlite3
+import threading
+import time
+
+class FileIndex:
+    """Persistent index of file and folder names under a root directory.
+
+    The tree is crawled once with os.scandir, pruning excluded directories
+    and never following symlinks, so every indexed path is already safe to
+    show. Afterwards only directories whose mtime changed are rescanned
+    (adding, removing or renaming an entry updates its parent's mtime).
+    Substring queries use an FTS5 trigram index when SQLite supports it,
+    and prefix queries use a case-insensitive name index.
+    """
+
+    REFRESH_INTERVAL = 300  # Seconds between incremental mtime scans
+    BATCH_SIZE = 1000
+
+    def __init__(self, root: Path, excluded_dirs: Iterable[str], allowed_extensions: Iterable[str],
+                 db_path: str = "data/file_index.db"):
+        self.root = Path(root)
+        self.excluded_names = {d for d in excluded_dirs if '/' not in d}
+        self.excluded_paths = {d for d in excluded_dirs if '/' in d}
+        self.allowed_extensions = set(allowed_extensions)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.ready = False
+        self.stats = {'files': 0, 'crawl_ms': None, 'last_refresh_ms': None, 'dirs_rescanned': 0, 'searches': 0}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                parent TEXT NOT NULL,
+                is_dir INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_parent ON files (parent);
+            CREATE INDEX IF NOT EXISTS idx_files_name ON files (name COLLATE NOCASE);
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime REAL
+            );
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.fts = self._create_fts()
+        self.conn.commit()
+
+    def _create_fts(self) -> bool:
+        """Set up the trigram index (SQLite 3.34+); fall back to LIKE scans without it."""
+        try:
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS file_names
+                    USING fts5(name, content='files', content_rowid='rowid', tokenize='trigram');
+                CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                    INSERT INTO file_names (rowid, name) VALUES (new.rowid, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                    INSERT INTO file_names (file_names, rowid, name) VALUES ('delete', old.rowid, old.name);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"Warning: SQLite trigram search unavailable, using LIKE: {e}")
+            return False
+
+    def _relative(self, path: str) -> str:
+        rel = os.path.relpath(path, self.root)
+        return "" if rel == "." else rel
+
+    def _excluded(self, rel_path: str, name: str) -> bool:
+        if name in self.excluded_names:
+            return True
+        return any(rel_path == d or rel_path.endswith('/' + d) for d in self.excluded_paths)
+
+    def _scan_dir(self, dir_path: str) -> tuple:
+        """List one directory: (rows for allowed entries, subdirectories to descend into, mtime)."""
+        rows, subdirs = [], []
+        parent = self._relative(dir_path)
+        try:
+            mtime = os.stat(dir_path).st_mtime
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    rel = os.path.join(parent, entry.name) if parent else entry.name
+                    if self._excluded(rel, entry.name):
+                        continue
+                    try:
+                        if entry.is_symlink():
+                            continue
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        subdirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() not in self.allowed_extensions:
+                        continue
+                    rows.append((rel, entry.name, parent, int(is_dir)))
+        except OSError:
+            return [], [], None
+        return rows, subdirs, mtime
+
+    def _write_dir(self, dir_path: str, rows: List[tuple], mtime: float):
+        """Replace a directory's direct children in the index. Caller holds the lock."""
+        parent = self._relative(dir_path)
+        self.conn.execute("DELETE FROM files WHERE parent = ?", (parent,))
+        self.conn.executemany("INSERT INTO files (path, name, parent, is_dir) VALUES (?, ?, ?, ?)", rows)
+        self.conn.execute("INSERT OR REPLACE INTO dirs (path, mtime) VALUES (?, ?)", (parent, mtime))
+
+    def _crawl(self, start_dir: str) -> int:
+        """Index a directory tree. Returns the number of directories scanned."""
+        stack = [start_dir]
+        scanned = 0
+        pending = 0
+        while stack and not self._stop.is_set():
+            dir_path = stack.pop()
+            rows, subdirs, mtime = self._scan_dir(dir_path)
+            if mtime is None:
+                continue
+            stack.extend(subdirs)
+            with self._lock:
+                self._write_dir(dir_path, rows, mtime)
+                pending += len(rows) + 1
+                if pending >= self.BATCH_SIZE:
+                    self.conn.commit()
+                    pending = 0
+            scanned += 1
+        with self._lock:
+            self.conn.commit()
+        return scanned
+
+    def _remove_tree(self, rel_dir: str):
+        """Drop a deleted directory and everything under it. Caller holds the lock."""
+        pattern = rel_dir.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%'
+        self.conn.execute("DELETE FROM files WHERE path = ? OR path LIKE ? ESCAPE '\\'", (rel_dir, pattern))
+        self.conn.execute("DELETE FROM dirs WHERE path = ? OR path LIKE ? ESCAPE '\\'", (rel_dir, pattern))
+
+    def refresh(self):
+        """Rescan only directories whose mtime changed since they were indexed."""
+        start = time.perf_counter()
+        with self._lock:
+            known: Dict[str, float] = dict(self.conn.execute("SELECT path, mtime FROM dirs").fetchall())
+
+        rescanned = 0
+        for rel_dir, indexed_mtime in known.items():
+            if self._stop.is_set():
+                break
+            dir_path = os.path.join(self.root, rel_dir) if rel_dir else str(self.root)
+            try:
+                mtime = os.stat(dir_path).st_mtime
+            except OSError:
+                with self._lock:
+                    self._remove_tree(rel_dir)
+                    self.conn.commit()
+                continue
+            if mtime == indexed_mtime:
+                continue
+
+            rows, subdirs, mtime = self._scan_dir(dir_path)
+            if mtime is None:
+                continue
+            with self._lock:
+                self._write_dir(dir_path, rows, mtime)
+                self.conn.commit()
+            rescanned += 1
+            # New subdirectories are crawled in full
+            for subdir in subdirs:
+                if self._relative(subdir) not in known:
+                    rescanned += self._crawl(subdir)
+
+        self.stats['dirs_rescanned'] += rescanned
+        self.stats['last_refresh_ms'] = (time.perf_counter() - start) * 1000
+        self._update_count()
+
+    def _update_count(self):
+        with self._lock:
+            self.stats['files'] = self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def build(self):
+        """Crawl from scratch if no full crawl has finished yet, otherwise refresh."""
+        with self._lock:
+            crawled = self.conn.execute("SELECT 1 FROM state WHERE key = 'crawled'").fetchone() is not None
+        if not crawled:
+            # Also covers a first crawl that was interrupted part way
+            start = time.perf_counter()
+            self._crawl(str(self.root))
+            if self._stop.is_set():
+                return
+            with self._lock:
+                self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('crawled', ?)", (str(time.time()),))
+                self.conn.commit()
+            self.stats['crawl_ms'] = (time.perf_counter() - start) * 1000
+            self._update_count()
+            print(f"Debug: Indexed {self.stats['files']} paths in {self.stats['crawl_ms']:.0f}ms")
+        else:
+            # An existing index can answer queries while it catches up
+            self.ready = True
+            self.refresh()
+        self.ready = True
+
+    def _run(self):
+        try:
+            self.build()
+        except Exception as e:
+            print(f"Error building file index: {e}")
+        while not self._stop.wait(self.REFRESH_INTERVAL):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing file index: {e}")
+
+    def start(self):
+        """Build and then keep refreshing the index on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='file-index', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def add_path(self, path: Path):
+        """Index a path right away, e.g. a file the app just wrote."""
+        rel = self._relative(str(path))
+        if not rel or rel.startswith('..'):
+            return
+        is_dir = path.is_dir()
+        if not is_dir and path.suffix.lower() not in self.allowed_extensions:
+            return
+        parent = os.path.dirname(rel)
+        with self._lock:
+            # A plain delete fires files_ad; INSERT OR REPLACE would not
+            # (recursive triggers are off) and leave a stale trigram row
+            self.conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+            self.conn.execute(
+                "INSERT INTO files (path, name, parent, is_dir) VALUES (?, ?, ?, ?)",
+                (rel, path.name, parent, int(is_dir))
+            )
+            self.conn.commit()
+
+    def search(self, query: str, under: str = "", prefix: bool = False,
+               show_hidden: bool = False, limit: int = 200) -> List[Dict]:
+        """Find indexed names containing (or starting with) query.
+
+        Args:
+            query: Text to look for in file and folder names (case-insensitive)
+            under: Only return paths below this directory, relative to the root
+            prefix: Match names that start with query instead of containing it
+            show_hidden: Include names starting with a dot
+            limit: Maximum number of results
+        """
+        self.stats['searches'] += 1
+        clauses, params = [], []
+        if prefix:
+            clauses.append("files.name LIKE ? ESCAPE '\\'")
+            params.append(self._escape_like(query) + '%')
+            source = "files"
+        elif self.fts and len(query) >= 3:
+            # Trigram match is a substring match; quote it as a phrase
+            clauses.append("file_names MATCH ?")
+            params.append('"' + query.replace('"', '""') + '"')
+            source = "file_names JOIN files ON files.rowid = file_names.rowid"
+        else:
+            clauses.append("files.name LIKE ? ESCAPE '\\'")
+            params.append('%' + self._escape_like(query) + '%')
+            source = "files"
+        if under:
+            clauses.append("files.path LIKE ? ESCAPE '\\'")
+            params.append(self._escape_like(under) + '/%')
+        if not show_hidden:
+            clauses.append("files.name NOT LIKE '.%'")
+
+        sql = f"SELECT files.path, files.name, files.is_dir FROM {source} WHERE {' AND '.join(clauses)} LIMIT ?"
+        with self._lock:
+            rows = self.conn.execute(sql, params + [limit]).fetchall()
+        return [
+            {"path": path, "name": name, "type": "folder" if is_dir else "file"}
+            for path, name, is_dir in rows
+        ]
+
+    @staticmethod
+    def _escape_like(text: str) -> str:
+        return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
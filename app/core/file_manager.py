@@ -4,6 +4,9 @@ import os
 import mimetypes
 import subprocess
 import platform
+import asyncio
+from .file_index import FileIndex
+from .content_index import ContentIndex
 
 class FileManager:
     # Allowed file types
@@ -36,6 +39,14 @@ class FileManager:
         """Initialize with home directory."""
         self.root_path = Path.home()
         mimetypes.init()
+        # Filename index; built in the background once start_index() is called
+        self.index = FileIndex(self.root_path, self.EXCLUDED_DIRS, self.ALLOWED_EXTENSIONS)
+        # Line-level full-text index over the text files the filename index finds
+        self.content_index = ContentIndex(self.index, self.ALLOWED_EXTENSIONS - self.VIEWABLE_EXTENSIONS - {'.env'})
+
+    def start_index(self):
+        self.index.start()
+        self.content_index.start()
 
     def _is_safe_path(self, path: Path) -> bool:
         """Check if path is safe to access."""
@@ -73,15 +84,22 @@ class FileManager:
             
         return True
 
-    async def search_files(self, query: str, path: str = "~", show_hidden: bool = False) -> List[Dict]:
-        """Search for files matching query."""
+    async def search_files(self, query: str, path: str = "~", show_hidden: bool = False,
+                           prefix: bool = False) -> List[Dict]:
+        """Search for files whose names contain (or, with prefix, start with) query."""
         results = []
         try:
             search_path = Path(path).expanduser().resolve()
             if not self._is_safe_path(search_path):
                 raise ValueError("Invalid search path")
 
-            for file_path in search_path.rglob(f"*{query}*"):
+            if self.index.ready:
+                under = "" if search_path == self.root_path else str(search_path.relative_to(self.root_path))
+                return await asyncio.to_thread(self.index.search, query, under, prefix, show_hidden)
+
+            # Index still building: walk the tree directly
+
+            for file_path in search_path.rglob(f"{query}*" if prefix else f"*{query}*"):
                 if (self._is_safe_path(file_path) and 
                     self._is_allowed_file_type(file_path) and 
                     self._should_show_item(file_path, show_hidden)):
@@ -94,6 +112,27 @@ class FileManager:
             print(f"Search error: {e}")
         return results
 
+    async def search_content(self, query: str, path: str = "~", show_hidden: bool = False,
+                             limit: int = 20, match_any: bool = False) -> Optional[List[Dict]]:
+        """Search inside text files; returns ranked {path, line, snippet} matches.
+
+        Returns None while the first content indexing pass is still running,
+        so callers can tell "still building" apart from "no matches".
+        """
+        try:
+            search_path = Path(path).expanduser().resolve()
+            if not self._is_safe_path(search_path):
+                raise ValueError("Invalid search path")
+            if not self.content_index.ready:
+                return None
+            under = "" if search_path == self.root_path else str(search_path.relative_to(self.root_path))
+            return await asyncio.to_thread(
+                self.content_index.search, query, limit, match_any, under, show_hidden
+            )
+        except Exception as e:
+            print(f"Content search error: {e}")
+            return []
+
     async def read_file(self, path: str) -> Optional[str]:
         """Read file contents safely."""
         try:
@@ -128,7 +167,8 @@ class FileManager:
             if not self._is_allowed_file_type(file_path):
                 file_path.unlink()
                 raise ValueError("Invalid file type")
-                
+            
+            self.index.add_path(file_path)
             return True
         except Exception as e:
             print(f"Error writing file {path}: {e}")
@@ -2,6 +2,9 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+import google_auth_httplib2
+import httplib2
 import base64
 import email
 from email.mime.text import MIMEText
@@ -12,6 +15,7 @@ import requests
 from urllib.parse import urlparse
 import re
 import html
+import time
 
 class GmailManager:
     SCOPES = [
@@ -20,12 +24,30 @@ class GmailManager:
         'https://www.googleapis.com/auth/gmail.send',
         'https://www.googleapis.com/auth/gmail.compose'
     ]
+    # Gmail recommends at most 50 requests per batch to avoid rate limiting
+    BATCH_SIZE = 50
+    # Retries for batch parts that fail with rate limit or server errors
+    MAX_BATCH_RETRIES = 3
+    RETRY_BASE_DELAY = 1.0
+    LIST_HEADERS = ['From', 'Subject', 'Date']
+    # How long the label ID -> name index is trusted before reloading
+    LABEL_INDEX_TTL = 300
     
     def __init__(self):
         self.creds = None
         self.service = None
         self.credentials_path = 'app/config/credentials.json'
         self.token_path = 'gmail_token.pickle'  # Separate token file
+        self.stats = {
+            'list_requests': 0,
+            'batch_requests': 0,
+            'batch_retries': 0,
+            'messages_fetched': 0,
+            'label_index_hits': 0,
+            'label_index_refreshes': 0
+        }
+        self._label_index = {}
+        self._label_index_loaded_at = 0
         self._authenticate()
 
     def _authenticate(self):
@@ -64,7 +86,13 @@ class GmailManager:
                     pickle.dump(self.creds, token)
 
             print("Debug: Building Gmail service")
-            self.service = build('gmail', 'v1', credentials=self.creds)
+            # Each request gets its own HTTP connection (see _build_request) so
+            # the service can be used from the async layer's worker threads
+            self.service = build(
+                'gmail', 'v1',
+                http=google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http()),
+                requestBuilder=self._build_request
+            )
             print("Gmail authentication successful!")
         
         except Exception as e:
@@ -74,6 +102,129 @@ class GmailManager:
             print(f"Traceback: {traceback.format_exc()}")
             raise
 
+    def _build_request(self, http, *args, **kwargs):
+        """Build an API request on a fresh authorized connection (httplib2 is not thread-safe)."""
+        new_http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http())
+        return HttpRequest(new_http, *args, **kwargs)
+
+    def refresh_label_index(self):
+        """Reload the label ID to name index from Gmail."""
+        label_list = self.service.users().labels().list(userId='me').execute()
+        self._label_index = {label['id']: label['name'] for label in label_list.get('labels', [])}
+        self._label_index_loaded_at = time.time()
+        self.stats['label_index_refreshes'] += 1
+
+    def invalidate_label_index(self):
+        """Mark the label index stale so the next lookup reloads it.
+
+        Call this whenever labels are created, renamed or deleted.
+        """
+        self._label_index_loaded_at = 0
+
+    def _label_names(self, label_ids, exclude=()):
+        """Resolve label IDs to display names using the cached label index.
+
+        Args:
+            label_ids (list): Label IDs as returned on a message
+            exclude (iterable): Label IDs to leave out of the result
+
+        Returns:
+            list: Label names, in the order of label_ids
+        """
+        age = time.time() - self._label_index_loaded_at
+        stale = age > self.LABEL_INDEX_TTL
+        # An unknown ID means labels changed since the last load; the age
+        # check stops a label that truly has no name from forcing a reload
+        # on every call.
+        missing = any(label_id not in self._label_index for label_id in label_ids)
+        if stale or (missing and age > 1):
+            self.refresh_label_index()
+        else:
+            self.stats['label_index_hits'] += 1
+
+        return [
+            self._label_index.get(label_id, label_id)
+            for label_id in label_ids
+            if label_id not in exclude
+        ]
+
+    def _list_message_ids(self, **params):
+        """Run a messages().list() call and return the response."""
+        self.stats['list_requests'] += 1
+        return self.service.users().messages().list(**params).execute()
+
+    def _batch_get_messages(self, message_ids, format='metadata', metadata_headers=None):
+        """Fetch many messages using the Gmail batch endpoint.
+
+        Parts of a batch can fail on their own, typically with 429
+        rateLimitExceeded. Those messages are retried with backoff in smaller
+        batches; if any still fail, the last error is raised.
+
+        Args:
+            message_ids (list): IDs of the messages to fetch
+            format (str): Gmail message format ('metadata' or 'full')
+            metadata_headers (list): Headers to include when format is 'metadata'
+
+        Returns:
+            list: Message resources in the same order as message_ids. Messages
+                  that no longer exist (404) are left out.
+        """
+        results = {}
+        failed = {}
+        fatal = []
+
+        def handle_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+            elif self._is_retryable(exception):
+                failed[request_id] = exception
+            elif getattr(exception, 'resp', None) is not None and exception.resp.status == 404:
+                print(f"Debug: Message {request_id} no longer exists, skipping")
+            else:
+                fatal.append(exception)
+
+        pending = list(message_ids)
+        batch_size = self.BATCH_SIZE
+        for attempt in range(self.MAX_BATCH_RETRIES + 1):
+            if attempt:
+                delay = self.RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                print(f"Debug: Retrying {len(pending)} messages in batches of {batch_size} after {delay:.1f}s")
+                self.stats['batch_retries'] += len(pending)
+                time.sleep(delay)
+            failed.clear()
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                batch = self.service.new_batch_http_request(callback=handle_response)
+                for msg_id in chunk:
+                    params = {'userId': 'me', 'id': msg_id, 'format': format}
+                    if format == 'metadata' and metadata_headers:
+                        params['metadataHeaders'] = metadata_headers
+                    batch.add(self.service.users().messages().get(**params), request_id=msg_id)
+                batch.execute()
+                self.stats['batch_requests'] += 1
+            if fatal:
+                raise fatal[0]
+            if not failed:
+                break
+            pending = [msg_id for msg_id in pending if msg_id in failed]
+            # Smaller batches put less load on the per-user rate limit
+            batch_size = max(1, batch_size // 5)
+        else:
+            raise next(iter(failed.values()))
+
+        self.stats['messages_fetched'] += len(results)
+        return [results[msg_id] for msg_id in message_ids if msg_id in results]
+
+    @staticmethod
+    def _is_retryable(exception) -> bool:
+        """Rate limit and transient server errors are worth retrying."""
+        resp = getattr(exception, 'resp', None)
+        if resp is None:
+            return False
+        if resp.status in (429, 500, 502, 503, 504):
+            return True
+        return resp.status == 403 and 'ateLimitExceeded' in str(getattr(exception, 'content', b''))
+
     def list_recent_emails(self, max_results=10, query=""):
         """List recent emails from the inbox.
         
@@ -90,25 +241,24 @@ class GmailManager:
             search_query = 'in:inbox ' + query
             
             # Get message list
-            results = self.service.users().messages().list(
+            results = self._list_message_ids(
                 userId='me',
                 maxResults=max_results,
                 q=search_query
-            ).execute()
+            )
             
             messages = results.get('messages', [])
             print(f"Debug: Found {len(messages)} messages")
             
+            # Fetch message details for the whole page in batched requests
+            details = self._batch_get_messages(
+                [msg['id'] for msg in messages],
+                format='metadata',
+                metadata_headers=self.LIST_HEADERS
+            )
+            
             emails = []
-            for msg in messages:
-                # Get full message details
-                message = self.service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='metadata',
-                    metadataHeaders=['From', 'Subject', 'Date']
-                ).execute()
-                
+            for message in details:
                 headers = message['payload']['headers']
                 email_data = {
                     'id': message['id'],
@@ -200,29 +350,20 @@ class GmailManager:
         try:
             # Query for unread emails using Gmail's search syntax
             # Only show unread emails that are in inbox and not in excluded categories
-            results = self.service.users().messages().list(
+            results = self._list_message_ids(
                 userId='me',
                 q='is:unread in:inbox -category:updates -category:promotions -category:forums',
                 maxResults=max_results
-            ).execute()
+            )
 
             messages = results.get('messages', [])
             unread_emails = []
 
-            for message in messages:
-                msg = self.service.users().messages().get(
-                    userId='me', 
-                    id=message['id'],
-                    format='full'
-                ).execute()
-
-                # Get labels first to check if we should process this email
-                labels = self.service.users().messages().get(
-                    userId='me',
-                    id=message['id'],
-                    format='metadata',
-                    metadataHeaders=['labelIds']
-                ).execute().get('labelIds', [])
+            # The full format already carries labelIds, so one batched get is enough
+            details = self._batch_get_messages([m['id'] for m in messages], format='full')
+
+            for msg in details:
+                labels = msg.get('labelIds', [])
 
                 # Skip if it's in any of the excluded categories
                 if any(label in labels for label in ['CATEGORY_UPDATES', 'CATEGORY_PROMOTIONS', 'CATEGORY_FORUMS']):
@@ -237,15 +378,8 @@ class GmailManager:
                 from_email = next(h['value'] for h in headers if h['name'] == 'From')
                 date = next(h['value'] for h in headers if h['name'] == 'Date')
 
-                # Convert label IDs to names
-                label_names = []
-                label_list = self.service.users().labels().list(userId='me').execute()
-                for label_id in labels:
-                    for label in label_list['labels']:
-                        if label['id'] == label_id:
-                            # Skip some system labels
-                            if label['id'] not in ['UNREAD', 'CATEGORY_PERSONAL', 'IMPORTANT']:
-                                label_names.append(label['name'])
+                # Convert label IDs to names, skipping some system labels
+                label_names = self._label_names(labels, exclude=['UNREAD', 'CATEGORY_PERSONAL', 'IMPORTANT'])
 
                 # Get email body
                 if 'parts' in msg['payload']:
@@ -260,7 +394,7 @@ class GmailManager:
                     text = "No content"
 
                 unread_emails.append({
-                    'id': message['id'],
+                    'id': msg['id'],
                     'subject': subject,
                     'from': from_email,
                     'date': date,
@@ -392,45 +526,31 @@ class GmailManager:
                     params['pageToken'] = page_token
 
                 # Get page of results
-                results = self.service.users().messages().list(**params).execute()
+                results = self._list_message_ids(**params)
                 messages = results.get('messages', [])
                 
+                # Fetch the whole page in batched requests
+                details = self._batch_get_messages(
+                    [m['id'] for m in messages],
+                    format='metadata',
+                    metadata_headers=self.LIST_HEADERS
+                )
+                
                 # Process messages in this page
-                for message in messages:
-                    msg = self.service.users().messages().get(
-                        userId='me', 
-                        id=message['id'],
-                        format='full'
-                    ).execute()
-
+                for msg in details:
                     headers = msg['payload']['headers']
-                    subject = next(h['value'] for h in headers if h['name'] == 'Subject')
-                    from_email = next(h['value'] for h in headers if h['name'] == 'From')
-                    date = next(h['value'] for h in headers if h['name'] == 'Date')
-
-                    # Get labels
-                    labels = self.service.users().messages().get(
-                        userId='me',
-                        id=message['id'],
-                        format='metadata',
-                        metadataHeaders=['labelIds']
-                    ).execute().get('labelIds', [])
-
-                    # Convert label IDs to names
-                    label_names = ['STARRED']  # Always include STARRED label
-                    label_list = self.service.users().labels().list(userId='me').execute()
-                    for label_id in labels:
-                        for label in label_list['labels']:
-                            if label['id'] == label_id:
-                                # Include UNREAD label if present
-                                if label['id'] == 'UNREAD':
-                                    label_names.append('UNREAD')
-                                # Include other non-system labels
-                                elif label['id'] not in ['STARRED', 'CATEGORY_PERSONAL', 'IMPORTANT']:
-                                    label_names.append(label['name'])
+                    subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
+                    from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
+                    date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+                    labels = msg.get('labelIds', [])
+
+                    # Convert label IDs to names (always include STARRED, keep UNREAD)
+                    label_names = ['STARRED'] + self._label_names(
+                        labels, exclude=['STARRED', 'CATEGORY_PERSONAL', 'IMPORTANT']
+                    )
 
                     starred_emails.append({
-                        'id': message['id'],
+                        'id': msg['id'],
                         'subject': subject,
                         'from': from_email,
                         'date': date,
@@ -474,7 +594,7 @@ class GmailManager:
                     params['pageToken'] = page_token
 
                 print(f"Debug: Requesting emails with params: {params}")
-                results = self.service.users().messages().list(**params).execute()
+                results = self._list_message_ids(**params)
                 messages = results.get('messages', [])
                 
                 if not messages:
@@ -482,39 +602,28 @@ class GmailManager:
                     break
                 
                 print(f"Debug: Found {len(messages)} messages")
+                details = self._batch_get_messages(
+                    [m['id'] for m in messages],
+                    format='metadata',
+                    metadata_headers=self.LIST_HEADERS
+                )
+                
                 # Process messages in this page
-                for message in messages:
+                for msg in details:
                     try:
-                        msg = self.service.users().messages().get(
-                            userId='me', 
-                            id=message['id'],
-                            format='full'
-                        ).execute()
-
                         headers = msg['payload']['headers']
                         subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
                         from_email = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
                         date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-
-                        # Get labels (like in starred emails)
-                        labels = self.service.users().messages().get(
-                            userId='me',
-                            id=message['id'],
-                            format='metadata',
-                            metadataHeaders=['labelIds']
-                        ).execute().get('labelIds', [])
+                        labels = msg.get('labelIds', [])
 
                         # Convert label IDs to names
-                        label_names = []
-                        label_list = self.service.users().labels().list(userId='me').execute()
-                        for label_id in labels:
-                            for label in label_list['labels']:
-                                if label['id'] == label_id:
-                                    if label['id'] not in ['STARRED', 'UNREAD', 'CATEGORY_PERSONAL', 'IMPORTANT']:
-                                        label_names.append(label['name'])
+                        label_names = self._label_names(
+                            labels, exclude=['STARRED', 'UNREAD', 'CATEGORY_PERSONAL', 'IMPORTANT']
+                        )
 
                         unread_emails.append({
-                            'id': message['id'],
+                            'id': msg['id'],
                             'subject': subject,
                             'from': from_email,
                             'date': date,
@@ -523,7 +632,7 @@ class GmailManager:
                         })
                         
                     except Exception as e:
-                        print(f"Error processing message {message['id']}: {e}")
+                        print(f"Error processing message {msg.get('id')}: {e}")
                         continue
 
                 # Check if we should stop
@@ -724,7 +833,7 @@ class GmailManager:
 
             # Get labels
             label_ids = message.get('labelIds', [])
-            label_names = [label_id for label_id in label_ids]
+            label_names = self._label_names(label_ids)
 
             # Extract body (both plain text and HTML if requested)
             plain_text = ''
@@ -0,0 +1,177 @@
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+import math
+import re
+import threading
+import time
+
+class HybridRetriever:
+    """BM25 keyword ranking fused with vector search over one collection.
+
+    An inverted index is built lazily from the collection (from a metadata
+    keywords field when given, otherwise from the document text) and kept
+    current through add()/remove(). Searches rank by BM25 and by vector
+    similarity and merge the two lists with reciprocal rank fusion. Short
+    keyword-style queries whose terms all appear in the best BM25 matches
+    are answered from the index alone, skipping the embedding call.
+    """
+
+    K1 = 1.5
+    B = 0.75
+    RRF_K = 60
+    # Queries with at most this many terms may skip the vector search
+    EXACT_MAX_TERMS = 3
+    PAGE_SIZE = 1000
+    TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9'_-]*")
+
+    def __init__(self, collection, stop_words: Callable[[], set] = set, keyword_field: Optional[str] = None):
+        self.collection = collection
+        # Resolved on first use so NLTK is not loaded at construction
+        self._stop_words_source = stop_words
+        self._stop_words: Optional[set] = None
+        self.keyword_field = keyword_field
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {doc_id: term frequency}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._built = False
+        self.stats = {
+            'searches': 0, 'keyword_only': 0, 'vector_searches': 0,
+            'build_ms': None, 'last_search_ms': None
+        }
+
+    def tokenize(self, text: str) -> List[str]:
+        if self._stop_words is None:
+            self._stop_words = set(self._stop_words_source())
+        return [token for token in self.TOKEN_PATTERN.findall(text.lower()) if token not in self._stop_words]
+
+    def _terms_for(self, document: str, metadata: Optional[Dict]) -> List[str]:
+        if self.keyword_field and metadata and metadata.get(self.keyword_field):
+            return self.tokenize(metadata[self.keyword_field].replace(',', ' '))
+        return self.tokenize(document or "")
+
+    def _add_locked(self, doc_id: str, terms: List[str]):
+        self._remove_locked(doc_id)
+        counts: Dict[str, int] = defaultdict(int)
+        for term in terms:
+            counts[term] += 1
+        self._doc_terms[doc_id] = dict(counts)
+        self._doc_lengths[doc_id] = len(terms)
+        self._total_length += len(terms)
+        for term, count in counts.items():
+            self._postings[term][doc_id] = count
+
+    def _remove_locked(self, doc_id: str):
+        counts = self._doc_terms.pop(doc_id, None)
+        if counts is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+        for term in counts:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _ensure_built(self):
+        """Build the index on first use, or after invalidate(). Caller holds the lock."""
+        if self._built:
+            return
+        start = time.perf_counter()
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._total_length = 0
+        offset = 0
+        while True:
+            results = self.collection.get(limit=self.PAGE_SIZE, offset=offset, include=['documents', 'metadatas'])
+            if not results['ids']:
+                break
+            for doc_id, document, metadata in zip(results['ids'], results['documents'], results['metadatas']):
+                self._add_locked(doc_id, self._terms_for(document, metadata))
+            offset += len(results['ids'])
+            if len(results['ids']) < self.PAGE_SIZE:
+                break
+        self._built = True
+        self.stats['build_ms'] = (time.perf_counter() - start) * 1000
+        print(f"Debug: Built keyword index for {self.collection.name} "
+              f"({len(self._doc_terms)} docs) in {self.stats['build_ms']:.0f}ms")
+
+    def add(self, doc_id: str, document: str, metadata: Optional[Dict] = None):
+        """Index a document that was just written to the collection."""
+        with self._lock:
+            if self._built:
+                self._add_locked(doc_id, self._terms_for(document, metadata))
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def invalidate(self):
+        """Rebuild on next search, e.g. after bulk deletes made elsewhere."""
+        with self._lock:
+            self._built = False
+
+    def bm25(self, terms: List[str], limit: int) -> List[tuple]:
+        """Return (doc_id, score) pairs, best first."""
+        with self._lock:
+            self._ensure_built()
+            doc_count = len(self._doc_terms)
+            if not doc_count:
+                return []
+            avg_length = self._total_length / doc_count or 1
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(terms):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    length = self._doc_lengths[doc_id]
+                    norm = tf + self.K1 * (1 - self.B + self.B * length / avg_length)
+                    scores[doc_id] += idf * tf * (self.K1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def _contains_all(self, doc_id: str, terms: List[str]) -> bool:
+        doc_terms = self._doc_terms.get(doc_id, {})
+        return all(term in doc_terms for term in terms)
+
+    def search(self, query: str, limit: int = 3) -> List[str]:
+        """Return the documents that best match query."""
+        start = time.perf_counter()
+        self.stats['searches'] += 1
+        terms = self.tokenize(query)
+        keyword_hits = self.bm25(terms, limit * 2) if terms else []
+
+        # Exact keyword lookup: a short query whose terms all occur in enough of
+        # the top hits to fill the result, so vector search would add nothing
+        exact = [doc_id for doc_id, _ in keyword_hits if self._contains_all(doc_id, terms)]
+        if exact and len(terms) <= self.EXACT_MAX_TERMS and len(exact) >= min(limit, len(keyword_hits)):
+            self.stats['keyword_only'] += 1
+            ranked = exact[:limit]
+            vector_docs = {}
+        else:
+            self.stats['vector_searches'] += 1
+            results = self.collection.query(query_texts=[query], n_results=limit * 2, include=['documents'])
+            vector_ids = results['ids'][0] if results['ids'] else []
+            vector_docs = dict(zip(vector_ids, results['documents'][0])) if vector_ids else {}
+
+            # Reciprocal rank fusion
+            fused: Dict[str, float] = defaultdict(float)
+            for rank, doc_id in enumerate(vector_ids):
+                fused[doc_id] += 1 / (self.RRF_K + rank + 1)
+            for rank, (doc_id, _) in enumerate(keyword_hits):
+                fused[doc_id] += 1 / (self.RRF_K + rank + 1)
+            ranked = sorted(fused, key=fused.get, reverse=True)[:limit]
+
+        missing = [doc_id for doc_id in ranked if doc_id not in vector_docs]
+        if missing:
+            fetched = self.collection.get(ids=missing, include=['documents'])
+            vector_docs.update(zip(fetched['ids'], fetched['documents']))
+
+        self.stats['last_search_ms'] = (time.perf_counter() - start) * 1000
+        return [vector_docs[doc_id] for doc_id in ranked if vector_docs.get(doc_id)]
+
+    def report(self) -> Dict:
+        return {**self.stats, 'documents': len(self._doc_terms), 'terms': len(self._postings)}
@@ -0,0 +1,126 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+class Intent:
+    """Result of routing a prompt: an intent name plus extracted slots."""
+
+    def __init__(self, name: str, slots: Optional[Dict] = None, confident: bool = False):
+        self.name = name
+        self.slots = slots or {}
+        # True when the prompt was fully understood and can be answered without the LLM
+        self.confident = confident
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, slots={self.slots!r}, confident={self.confident})"
+
+class IntentRouter:
+    """Rule-based intent classifier that runs ahead of the LLM.
+
+    All keyword sets are compiled into one alternation regex, so a prompt is
+    lowercased once and scanned in a single pass. Keywords match on word
+    boundaries ("at" no longer matches inside "what").
+    """
+
+    KEYWORDS = {
+        'calendar_create': [
+            "schedule", "appointment", "book", "calendar", "meeting",
+            "remind me", "set up", "plan for", "mark down"
+        ],
+        'calendar_query': [
+            "what", "when", "show", "list", "tell me", "do i have",
+            "what's", "what is", "what are", "any", "upcoming"
+        ],
+        'time': [
+            "today", "tomorrow", "tonight", "next", "on", "at",
+            "this week", "next week", "weekend", "month"
+        ],
+        'event_type': ["practice", "game"],
+    }
+    CLOCK_PATTERN = r"\d{1,2}(?::\d{2})?\s*(?:am|pm)\b"
+    DAY_WORDS = {"today", "tomorrow", "tonight", "this week", "next week", "weekend", "month"}
+    # Words that can appear in a plain "what's on tomorrow?" question without changing its meaning
+    FILLER_WORDS = {
+        "i", "my", "me", "is", "are", "there", "have", "has", "do", "does", "for", "the",
+        "a", "an", "anything", "something", "events", "event", "scheduled", "planned",
+        "going", "happening", "got", "please", "can", "you", "in", "s"
+    }
+    CONFIRM_WORDS = {"yes", "y"}
+    DENY_WORDS = {"no", "n"}
+
+    def __init__(self):
+        self._compiled: Dict[Tuple[str, ...], Tuple[re.Pattern, set]] = {}
+
+    def _compile(self, team_names: Tuple[str, ...]) -> Tuple[re.Pattern, set]:
+        """Build the combined pattern and known-word set for a set of team names."""
+        if team_names not in self._compiled:
+            # Team names go first so "Soccer Team" wins over its individual words
+            groups = [('team', [name.lower() for name in team_names])] + list(self.KEYWORDS.items())
+            alternatives = [f"(?P<clock>{self.CLOCK_PATTERN})"]
+            known_words = set(self.FILLER_WORDS)
+            for group, words in groups:
+                if not words:
+                    continue
+                # Longest first so "next week" is preferred over "next"
+                ordered = sorted(words, key=len, reverse=True)
+                alternatives.append(
+                    f"(?P<{group}>\\b(?:{'|'.join(re.escape(word) for word in ordered)})\\b)"
+                )
+                for word in words:
+                    known_words.update(re.findall(r"[a-z0-9']+", word))
+            pattern = re.compile("|".join(alternatives))
+            self._compiled[team_names] = (pattern, known_words)
+        return self._compiled[team_names]
+
+    def classify(self, prompt: str, team_names: Iterable[str] = ()) -> Intent:
+        """Classify a prompt.
+
+        Args:
+            prompt: The user's message
+            team_names: Team calendar names to recognise as search terms
+
+        Returns:
+            Intent: One of command, confirm, deny, calendar_next, calendar_query,
+                    calendar_create or chat
+        """
+        text = prompt.strip()
+        if text.startswith("/"):
+            return Intent('command', confident=True)
+
+        lowered = text.lower().replace("’", "'")
+        if lowered in self.CONFIRM_WORDS:
+            return Intent('confirm', confident=True)
+        if lowered in self.DENY_WORDS:
+            return Intent('deny', confident=True)
+
+        pattern, known_words = self._compile(tuple(team_names))
+        hits: Dict[str, List[str]] = {}
+        for match in pattern.finditer(lowered):
+            hits.setdefault(match.lastgroup, []).append(match.group(match.lastgroup))
+
+        slots = {}
+        days = [word for word in hits.get('time', []) if word in self.DAY_WORDS]
+        if days:
+            slots['day'] = days[0]
+        if 'clock' in hits:
+            slots['time'] = hits['clock'][0]
+        # Only known event types and team names are searched for; other words
+        # ("what's next on my list") would substring-match arbitrary events
+        search_terms = hits.get('event_type', []) + hits.get('team', [])
+        if search_terms:
+            slots['search_terms'] = list(dict.fromkeys(search_terms))
+
+        has_time = 'time' in hits or 'clock' in hits
+        if 'calendar_query' in hits and has_time:
+            if 'next' in hits['time'] and search_terms:
+                return Intent('calendar_next', slots, confident=True)
+            unknown = [
+                word for word in re.findall(r"[a-z0-9']+", lowered)
+                if word not in known_words
+            ]
+            confident = slots.get('day') in ("today", "tomorrow", "tonight") and not unknown
+            return Intent('calendar_query', slots, confident=confident)
+
+        if 'calendar_create' in hits and has_time:
+            return Intent('calendar_create', slots)
+
+        return Intent('chat', slots)
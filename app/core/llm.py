@@ -1,48 +1,117 @@
 from langchain_ollama import OllamaLLM
-from langchain.callbacks.manager import CallbackManager
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
+from chromadb import Client, Settings
 from .memory import MemoryManager
 from datetime import datetime, timedelta
+import asyncio
 import json
+import re
 from .calendar_manager import CalendarManager
 from .todo_manager import TodoManager
 from .gmail_manager import GmailManager
 from .email_handler import EmailHandler
+from .mail_mirror import MailMirror
+from .async_services import AsyncGoogleServices
+from .session import Session, SessionStore
+from .intent_router import IntentRouter
+from .container import ServiceContainer
+from .embedding_cache import CachedEmbeddingFunction
+from .retention import RetentionEngine
+from .reference_indexer import ReferenceIndexer
 import pytz
+import time
 from pathlib import Path
+from typing import Awaitable, Callable, Optional
 
 class LLMManager:
     def __init__(self):
-        callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
         self.llm = OllamaLLM(
             model="mistral:7b-instruct",
-            callback_manager=callback_manager,
             temperature=0.7,
         )
-        self.memory = MemoryManager()
-        self.calendar = CalendarManager()
-        self.todos = TodoManager()
-        self.gmail = GmailManager()
-        self.email_handler = EmailHandler()
-        self.file_manager = None
         
         # Set timezone and current time context
         self.timezone = 'America/Edmonton'
         self.current_time = datetime.now(pytz.timezone(self.timezone))
         
-        # Clean up any duplicate facts
-        self.memory.cleanup_duplicates()
+        # Shared clients are built on first use, not at startup
+        self.container = ServiceContainer()
+        self.container.register('chroma', lambda: Client(Settings(is_persistent=True, persist_directory="data/memory")))
+        self.container.register('embeddings', CachedEmbeddingFunction)
+        self.container.register('memory', self._build_memory)
+        self.container.register('retention', lambda: RetentionEngine(self.container.get('memory')))
+        self.container.register('reference_indexer', lambda: ReferenceIndexer(self.container.get('memory')))
+        self.container.register('todos', lambda: TodoManager(
+            client=self.container.get('chroma'),
+            embedding_function=self.container.get('embeddings')
+        ))
+        self.container.register('calendar', CalendarManager)
+        self.container.register('gmail', GmailManager)
+        self.container.register('mail_mirror', lambda: MailMirror(self.container.get('gmail')))
+        
+        # Per-connection state (pending confirmations, email drafts) lives in sessions
+        self.sessions = SessionStore(self._create_session, on_discard=self._release_session)
+        self.router = IntentRouter()
+        # Async entry points for the blocking Google clients
+        self.async_google = AsyncGoogleServices(self.container, 'gmail', 'calendar', 'mail_mirror')
+        self.file_manager = None
+        self.turn_stats = {
+            'turns': 0, 'retrieval_ms': 0.0, 'llm_ms': 0.0,
+            'streams': 0, 'ttft_ms': 0.0, 'last_ttft_ms': None  # Time to first token of streamed replies
+        }
+        self.team_calendars = self._load_calendar_config()
+
+    @property
+    def memory(self) -> MemoryManager:
+        return self.container.get('memory')
+
+    @property
+    def todos(self) -> TodoManager:
+        return self.container.get('todos')
+
+    @property
+    def calendar(self) -> CalendarManager:
+        return self.container.get('calendar')
+
+    @property
+    def gmail(self) -> GmailManager:
+        return self.container.get('gmail')
+
+    @property
+    def mail_mirror(self) -> MailMirror:
+        return self.container.get('mail_mirror')
+
+    def _build_memory(self) -> MemoryManager:
+        """Create the memory manager and add the timezone facts."""
+        memory = MemoryManager(
+            client=self.container.get('chroma'),
+            embedding_function=self.container.get('embeddings')
+        )
         
-        # Add timezone facts (add_long_term_fact will now prevent duplicates)
-        self.memory.add_long_term_fact(
+        # Facts stored under timestamp IDs are re-keyed first, so the
+        # timezone facts below are found instead of added again
+        memory.migrate_fact_ids()
+        memory.migrate_conversation_history()
+        # Duplicate cleanup runs as a background job (see main.py startup);
+        # add_long_term_fact already skips facts that are stored
+        # Add timezone facts
+        memory.add_long_term_fact(
             f"Current timezone is {self.timezone}",
             "system"
         )
-        self.memory.add_long_term_fact(
+        memory.add_long_term_fact(
             f"All times should be interpreted in {self.timezone} timezone",
             "system"
         )
-        self.team_calendars = self._load_calendar_config()
+        return memory
+
+    def _create_session(self, session_id: str) -> Session:
+        """Build a new session whose email handler uses the shared Gmail client."""
+        return Session(session_id, EmailHandler(services=self.container))
+
+    def _release_session(self, session_id: str, ended: bool):
+        """Free a dropped session's history buffer; ended sessions also lose their stored turns."""
+        if self.container.is_built('memory'):
+            self.memory.conversations.drop(session_id, delete_turns=ended)
 
     def _cleanup_timezone_facts(self):
         """Remove duplicate timezone facts."""
@@ -109,51 +178,93 @@ class LLMManager:
             print(f"Error updating calendar config: {e}")
             return False
 
-    async def generate_response(self, prompt: str, context: dict = None) -> str:
+    def _record_turn(self, retrieval_ms: float, llm_ms: float):
+        """Track where chat turn latency goes: memory retrieval vs the LLM."""
+        stats = self.turn_stats
+        stats['turns'] += 1
+        stats['retrieval_ms'] += retrieval_ms
+        stats['llm_ms'] += llm_ms
+        print(f"Debug: Retrieval {retrieval_ms:.0f}ms, LLM {llm_ms:.0f}ms")
+
+    def _record_first_token(self, ttft_ms: float):
+        """Track how long streamed replies take to show their first token."""
+        stats = self.turn_stats
+        stats['streams'] += 1
+        stats['ttft_ms'] += ttft_ms
+        stats['last_ttft_ms'] = ttft_ms
+        print(f"Debug: Time to first token {ttft_ms:.0f}ms")
+
+    FILE_KEYWORDS = {'file', 'files', 'note', 'notes', 'document', 'documents', 'wrote', 'written'}
+
+    async def _file_citations(self, prompt: str, limit: int = 5) -> str:
+        """Find lines in the user's files that match the prompt, formatted for citing as path:line."""
+        words = re.findall(r"\w+", prompt.lower())
+        if not self.file_manager or not self.FILE_KEYWORDS.intersection(words):
+            return ""
+        terms = [w for w in words if len(w) > 2 and w not in self.FILE_KEYWORDS and w not in self.memory.stop_words]
+        if not terms:
+            return ""
+        matches = await self.file_manager.search_content(" ".join(terms), limit=limit, match_any=True)
+        if matches is None:
+            return ""  # Content index still building
+        return "\n".join(f"- {m['path']}:{m['line']}: {m['snippet']}" for m in matches)
+
+    async def _complete(self, prompt: str, on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
+        """Run the LLM on a prompt, streaming tokens to on_token when given."""
+        if on_token is None:
+            response = await self.llm.agenerate([prompt])
+            return response.generations[0][0].text
+
+        start = time.perf_counter()
+        chunks = []
+        async for chunk in self.llm.astream(prompt):
+            if not chunks:
+                self._record_first_token((time.perf_counter() - start) * 1000)
+            chunks.append(chunk)
+            await on_token(chunk)
+        print(f"Debug: Streamed {len(chunks)} chunks in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return "".join(chunks)
+
+    async def generate_response(self, prompt: str, context: dict = None,
+                                on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+                                session: Optional[Session] = None) -> str:
+        """Generate a reply to a chat message.
+
+        Args:
+            prompt: The user's message
+            context: Optional extra context (e.g. the open file)
+            on_token: Optional coroutine called with each text chunk as the
+                      LLM produces it. The full reply is still returned.
+            session: The caller's session; the default session when omitted
+        """
+        session = session or self.sessions.get()
         try:
             # Update current time on each request
             self.current_time = datetime.now(pytz.timezone(self.timezone))
             
-            # Check for calendar intents
-            calendar_keywords = [
-                "schedule", "appointment", "book", "calendar", "meeting",
-                "remind me", "set up", "plan for", "mark down"
-            ]
-            calendar_query_keywords = [
-                "what", "when", "show", "list", "tell me", "do i have",
-                "what's", "what is", "what are", "any", "upcoming"
-            ]
-            time_indicators = ["today", "tomorrow", "tonight", "pm", "am", "next", "on", "at",
-                             "this week", "next week", "weekend", "month"]
+            # Route the prompt in a single pass before involving the LLM
+            intent = self.router.classify(prompt, self.team_calendars.values())
+            
+            # Command handling
+            if intent.name == "command":
+                return await self._handle_command(prompt, session)
             
             # Check if this is a calendar query
-            if any(keyword in prompt.lower() for keyword in calendar_query_keywords) and \
-               any(indicator in prompt.lower() for indicator in time_indicators):
+            if intent.name in ("calendar_next", "calendar_query"):
                 
                 # Get all upcoming events first
-                events = self.calendar.list_upcoming_events(max_results=20)  # Get enough events to search through
+                events = await self.async_google.calendar.list_upcoming_events(max_results=20)  # Get enough events to search through
                 
                 # If looking for "next" event
-                if "next" in prompt.lower():
-                    # Parse what we're looking for
-                    search_terms = []
-                    if "practice" in prompt.lower():
-                        search_terms.append("practice")
-                    if "game" in prompt.lower():
-                        search_terms.append("game")
-                    
-                    # Replace the hardcoded team checks with:
-                    prompt_lower = prompt.lower()
-                    for team_name in self.team_calendars.values():
-                        if team_name.lower() in prompt_lower:
-                            search_terms.append(team_name)
+                if intent.name == "calendar_next":
+                    search_terms = [term.lower() for term in intent.slots['search_terms']]
                     
                     # Find the next matching event
                     for event in events:
                         summary = event.get('summary', '').lower()
                         calendar = event.get('calendar', '').lower()
                         
-                        if any(term in summary.lower() or term in calendar.lower() for term in search_terms):
+                        if any(term in summary or term in calendar for term in search_terms):
                             # Convert the datetime to local timezone
                             start_time = event['start'].get('dateTime', event['start'].get('date'))
                             event_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
@@ -178,8 +289,13 @@ class LLMManager:
                     return f"No upcoming {' or '.join(search_terms)} found in the calendar."
 
                 # Determine if query is about tomorrow
-                is_tomorrow_query = "tomorrow" in prompt.lower()
+                is_tomorrow_query = intent.slots.get('day') == "tomorrow"
                 target_date = self.current_time + timedelta(days=1) if is_tomorrow_query else self.current_time
+                day_events = self._filter_events_by_date(events, target_date)
+                
+                # Plain "what's on today/tomorrow" questions don't need the LLM
+                if intent.confident:
+                    return self._format_day_events(day_events, target_date, is_tomorrow_query)
                 
                 # Ask LLM to convert natural query to calendar list command
                 query_prompt = f"""
@@ -189,7 +305,7 @@ Answer this calendar query about {"tomorrow" if is_tomorrow_query else "today"}:
 "{prompt}"
 
 Events for {"tomorrow" if is_tomorrow_query else "today"}:
-{self._filter_events_by_date(self.calendar.list_upcoming_events(), target_date)}
+{day_events}
 
 Rules:
 1. ALWAYS start by mentioning today's actual date ({self.current_time.strftime('%A, %B %d, %Y')})
@@ -204,12 +320,11 @@ Example response formats:
 For today: "Today is Tuesday, December 31, 2024. You have no events scheduled for today."
 For tomorrow: "Today is Tuesday, December 31, 2024. For tomorrow (Wednesday, January 1, 2025) you have: Meeting at 2 PM MST"
 """
-                response = await self.llm.agenerate([query_prompt])
-                return response.generations[0][0].text.strip()
+                response_text = await self._complete(query_prompt, on_token)
+                return response_text.strip()
 
             # Existing calendar creation intent check
-            elif any(keyword in prompt.lower() for keyword in calendar_keywords) and \
-                 any(indicator in prompt.lower() for indicator in time_indicators):
+            elif intent.name == "calendar_create":
                 
                 # Ask LLM to convert natural language to calendar command
                 command_prompt = f"""
@@ -231,8 +346,7 @@ Example:
 Request: "Schedule a meeting with John tomorrow at 2pm for 1 hour"
 /calendar add "Meeting with John" "2:00 PM MST tomorrow" "3:00 PM MST tomorrow" "" "One hour meeting"
 """
-                response = await self.llm.agenerate([command_prompt])
-                calendar_command = response.generations[0][0].text.strip()
+                calendar_command = (await self._complete(command_prompt)).strip()
                 
                 # Parse the command to show confirmation
                 params = self._extract_quoted_params(calendar_command)
@@ -248,30 +362,35 @@ I'll create this calendar event:
 Would you like me to add this event? (Reply with yes/no)
 """
                     # Store the command for later execution
-                    self.pending_calendar_command = calendar_command
+                    session.pending_calendar_command = calendar_command
                     return confirmation
                 
                 return "I had trouble understanding the calendar details. Please try again."
 
             # Add a new condition to handle the confirmation response
-            elif hasattr(self, 'pending_calendar_command') and prompt.lower() in ['yes', 'y']:
+            elif session.pending_calendar_command and intent.name == "confirm":
                 # Execute the stored command
-                command = self.pending_calendar_command
-                delattr(self, 'pending_calendar_command')
-                return await self._handle_command(command)
+                command = session.pending_calendar_command
+                session.pending_calendar_command = None
+                return await self._handle_command(command, session)
 
-            elif hasattr(self, 'pending_calendar_command') and prompt.lower() in ['no', 'n']:
-                delattr(self, 'pending_calendar_command')
+            elif session.pending_calendar_command and intent.name == "deny":
+                session.pending_calendar_command = None
                 return "Calendar event cancelled."
 
-            # Command handling
-            if prompt.startswith("/"):
-                return await self._handle_command(prompt)
-
             # Regular chat flow
-            conversation_history = self.memory.get_recent_history()
-            personal_info = self.memory.get_personal_info()
-            relevant_facts = self.memory.get_relevant_facts(prompt)
+            memory_context = await self.memory.gather_context(prompt, session.id)
+            conversation_history = memory_context['history']
+            personal_info = memory_context['personal_info']
+            relevant_facts = memory_context['relevant_facts']
+            reference_context = ""
+            if memory_context['reference']:
+                reference_context = f"\n\nREFERENCE MATERIAL (emails, events, files):\n{memory_context['reference']}"
+            file_matches = await self._file_citations(prompt)
+            if file_matches:
+                reference_context += (
+                    "\n\nFILE MATCHES (cite as path:line when you use them):\n" + file_matches
+                )
             
             # Add file context if provided
             file_context = ""
@@ -286,7 +405,7 @@ PERSONAL INFORMATION ABOUT THE USER:
 {personal_info}
 
 RELEVANT FACTS AND HISTORY:
-{relevant_facts}
+{relevant_facts}{reference_context}
 
 RECENT CONVERSATION HISTORY:
 {conversation_history}{file_context}
@@ -296,21 +415,43 @@ Current message: {prompt}
 Please respond to the current message while taking into account all available context.
 If you learn any new personal information, remember it for future reference.
 """
-            response = await self.llm.agenerate([context_prompt])
-            response_text = response.generations[0][0].text
+            llm_start = time.perf_counter()
+            response_text = await self._complete(context_prompt, on_token)
+            self._record_turn(memory_context['timings']['total'], (time.perf_counter() - llm_start) * 1000)
             
             # Store the interaction
             self.memory.add_interaction(prompt, response_text)
             
             # Store the conversation
-            self.memory.add_conversation(prompt, response_text)
+            self.memory.add_conversation(prompt, response_text, session_id=session.id)
             
             return response_text
         except Exception as e:
             print(f"Error generating response: {e}")
             return str(e)
 
-    async def _handle_command(self, prompt: str) -> str:
+    @staticmethod
+    def _parse_todo_targets(args: list) -> tuple:
+        """Split /todo batch arguments into IDs and --category/--priority/--status filters."""
+        ids, filters = [], {}
+        i = 0
+        while i < len(args):
+            if args[i].startswith("--") and i + 1 < len(args):
+                filters[args[i][2:]] = args[i + 1]
+                i += 2
+            else:
+                ids.append(args[i])
+                i += 1
+        return ids, filters
+
+    @staticmethod
+    def _no_todos_matched(ids: list) -> str:
+        if ids:
+            return f"Could not find todo with ID: {', '.join(ids)}"
+        return "No todos matched the filter"
+
+    async def _handle_command(self, prompt: str, session: Optional[Session] = None) -> str:
+        session = session or self.sessions.get()
         parts = prompt.split()
         command = parts[0].lower()
 
@@ -352,6 +493,32 @@ If you learn any new personal information, remember it for future reference.
                 return f"Deleted fact with ID: {fact_id}"
             return f"Could not find fact with ID: {fact_id}"
 
+        elif command == "/reference":
+            # Format: /reference index [path]
+            if len(parts) < 2 or parts[1].lower() != "index":
+                return "Usage: /reference index [path]"
+            indexer = await asyncio.to_thread(self.container.get, 'reference_indexer')
+
+            if len(parts) > 2:
+                if not self.file_manager:
+                    return "File access is not available"
+                path = " ".join(parts[2:])
+                try:
+                    count = await asyncio.to_thread(indexer.index_files, self.file_manager, path)
+                except ValueError as e:
+                    return f"Error indexing {path}: {e}"
+                return f"Indexed {count} new or changed files from {path}"
+
+            # Without a path, index recent email and upcoming events
+            emails = await self.async_google.mail_mirror.list_recent_emails(max_results=50)
+            email_count = await self.async_google.run(
+                'reference.index_emails', indexer.index_emails, emails,
+                lambda email_id: self.container.get('gmail').get_email(email_id)
+            )
+            events = await self.async_google.calendar.list_upcoming_events(100)
+            event_count = await asyncio.to_thread(indexer.index_events, events)
+            return f"Indexed {email_count} new emails and {event_count} new or changed events"
+
         elif command == "/help":
             return "Press the Help (?) button in the bottom right or press 'h' to see all available commands and examples."
 
@@ -374,7 +541,7 @@ If you learn any new personal information, remember it for future reference.
                         description = params[4] if len(params) > 4 else None
                         
                         # Create the event directly
-                        event_id = self.calendar.create_event(
+                        event_id = await self.async_google.calendar.create_event(
                             summary=summary,
                             start_time=start_time,
                             end_time=end_time,
@@ -395,7 +562,7 @@ If you learn any new personal information, remember it for future reference.
                         except ValueError:
                             return "Please provide a valid number for the amount of events to show"
                     
-                    events = self.calendar.list_upcoming_events(max_results)
+                    events = await self.async_google.calendar.list_upcoming_events(max_results)
                     if not events:
                         return "No upcoming events found."
                     
@@ -411,6 +578,8 @@ If you learn any new personal information, remember it for future reference.
 
         elif command == "/todo":
             subcommand = parts[1] if len(parts) > 1 else "list"
+            # SQLite calls (and building the manager on first use) run off the event loop
+            todos_manager = await asyncio.to_thread(self.container.get, 'todos')
             
             if subcommand == "add":
                 # Format: /todo add "Task description" --priority high --category work --due "next friday"
@@ -441,9 +610,9 @@ If you learn any new personal information, remember it for future reference.
                         due_start = prompt.find("--due") + 5
                         due_end = prompt.find("--", due_start) if "--" in prompt[due_start:] else None
                         due_str = prompt[due_start:due_end].strip() if due_end else prompt[due_start:].strip()
-                        due_date = self.calendar.parse_time(due_str).isoformat()
+                        due_date = CalendarManager.parse_time(due_str).isoformat()  # No auth needed to parse
                     
-                    todo_id = self.todos.add_todo(task, priority, category, due_date, notes)
+                    todo_id = await asyncio.to_thread(todos_manager.add_todo, task, priority, category, due_date, notes)
                     return f"Added todo: {task} (ID: {todo_id})"
                 
                 except Exception as e:
@@ -459,7 +628,7 @@ If you learn any new personal information, remember it for future reference.
                             priority = p
                             break
                 
-                todos = self.todos.list_todos(category=category, priority=priority)
+                todos = await asyncio.to_thread(todos_manager.list_todos, category=category, priority=priority)
                 if not todos:
                     return "No todos found."
                 
@@ -470,23 +639,34 @@ If you learn any new personal information, remember it for future reference.
                     for todo in todos
                 )
             
-            elif subcommand == "done":
-                # Format: /todo done <todo_id>
-                if len(parts) < 3:
-                    return "Please provide a todo ID"
-                todo_id = parts[2]
-                if self.todos.complete_todo(todo_id):
-                    return f"Marked todo {todo_id} as completed"
-                return f"Could not find todo with ID: {todo_id}"
-            
-            elif subcommand == "delete":
-                # Format: /todo delete <todo_id>
-                if len(parts) < 3:
-                    return "Please provide a todo ID"
-                todo_id = parts[2]
-                if self.todos.delete_todo(todo_id):
-                    return f"Deleted todo {todo_id}"
-                return f"Could not find todo with ID: {todo_id}"
+            elif subcommand in ("done", "delete"):
+                # Format: /todo done|delete <todo_id> [<todo_id> ...] | [--category name] [--priority p] [--status s]
+                try:
+                    ids, filters = self._parse_todo_targets(parts[2:])
+                    if subcommand == "done":
+                        count = await asyncio.to_thread(todos_manager.complete_todos, ids, filters)
+                    else:
+                        count = await asyncio.to_thread(todos_manager.delete_todos, ids, filters)
+                    if not count:
+                        return self._no_todos_matched(ids)
+                    if subcommand == "done":
+                        return f"Marked {count} todo(s) as completed"
+                    return f"Deleted {count} todo(s)"
+                except ValueError as e:
+                    return str(e)
+
+            elif subcommand == "priority":
+                # Format: /todo priority <high|medium|low> <todo_id> [<todo_id> ...] | [--category name] ...
+                if len(parts) < 4:
+                    return "Usage: /todo priority <high|medium|low> <todo_id> [<todo_id> ...] or a filter such as --category work"
+                try:
+                    ids, filters = self._parse_todo_targets(parts[3:])
+                    count = await asyncio.to_thread(todos_manager.set_priority, parts[2], ids, filters)
+                    if not count:
+                        return self._no_todos_matched(ids)
+                    return f"Set priority of {count} todo(s) to {parts[2].lower()}"
+                except ValueError as e:
+                    return f"Error updating priority: {e}"
 
         elif command == "/email":
             if len(parts) < 2:
@@ -494,7 +674,9 @@ If you learn any new personal information, remember it for future reference.
             
             subcommand = parts[1]
             args = " ".join(parts[2:]) if len(parts) > 2 else ""
-            response = self.email_handler.handle_command(subcommand, args)
+            response = await self.async_google.run(
+                'email.handle_command', session.email_handler.handle_command, subcommand, args
+            )
             
             # Handle different types of responses
             if subcommand in ["draft", "answer", "revise"]:
@@ -503,8 +685,8 @@ If you learn any new personal information, remember it for future reference.
                 if "What would you like to do?" in response:
                     return response  # Return the review options
                 # Generate new draft
-                draft_response = await self.generate_response(response, {"type": "email_draft"})
-                return self.email_handler.set_current_draft(draft_response)
+                draft_response = await self.generate_response(response, {"type": "email_draft"}, session=session)
+                return session.email_handler.set_current_draft(draft_response)
             
             return response
 
@@ -554,6 +736,27 @@ If you learn any new personal information, remember it for future reference.
         
         return filtered 
 
+    def _format_day_events(self, events, target_date, is_tomorrow: bool) -> str:
+        """Describe one day's events without a round trip to the LLM."""
+        response = f"Today is {self.current_time.strftime('%A, %B %d, %Y')}."
+        day_label = f"tomorrow ({target_date.strftime('%A, %B %d, %Y')})" if is_tomorrow else "today"
+        if not events:
+            return f"{response} You have no events scheduled for {day_label}."
+
+        lines = []
+        for event in events:
+            start = event['start']
+            if 'dateTime' in start:
+                event_dt = datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00'))
+                local_dt = event_dt.astimezone(pytz.timezone(self.timezone))
+                time_str = local_dt.strftime('%I:%M %p').lstrip('0')
+            else:
+                time_str = "All day"
+            location = f" at {event['location']}" if event.get('location') else ""
+            lines.append(f"- {time_str}: {event['summary']}{location} [{event.get('calendar', 'Primary')}]")
+
+        return f"{response} For {day_label} you have:\n" + "\n".join(lines)
+
     def register_file_manager(self, file_manager):
         self.file_manager = file_manager
 
@@ -563,19 +766,32 @@ If you learn any new personal information, remember it for future reference.
             return "File operations not available"
 
         try:
-            # Parse --show-hidden flag
+            # Parse --show-hidden, --content and --prefix flags
             show_hidden = False
+            content_search = False
+            prefix = False
             filtered_args = []
             for arg in args:
                 if arg == "--show-hidden":
                     show_hidden = True
+                elif arg == "--content":
+                    content_search = True
+                elif arg == "--prefix":
+                    prefix = True
                 else:
                     filtered_args.append(arg)
             args = filtered_args
 
             if command == "search":
                 query = " ".join(args)
-                results = await self.file_manager.search_files(query, show_hidden=show_hidden)
+                if content_search:
+                    matches = await self.file_manager.search_content(query, show_hidden=show_hidden)
+                    if matches is None:
+                        return "The content index is still building; try again in a few minutes"
+                    if not matches:
+                        return "No matching lines found"
+                    return "\n".join(f"📄 {m['path']}:{m['line']}: {m['snippet']}" for m in matches)
+                results = await self.file_manager.search_files(query, show_hidden=show_hidden, prefix=prefix)
                 return self._format_file_results(results)
 
             elif command == "list":
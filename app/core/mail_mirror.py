@@ -0,0 +1,308 @@
+from googleapiclient.errors import HttpError
+from typing import List, Dict, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class MailMirror:
+    """Local SQLite copy of inbox and starred message metadata.
+
+    The mirror is seeded with a full listing once and then kept current with
+    Gmail's history API, so list calls are answered from disk instead of
+    re-listing the mailbox on every refresh.
+    """
+
+    # Messages outside these labels are dropped from the mirror
+    MIRRORED_LABELS = ('INBOX', 'STARRED')
+    # The full sync mirrors the newest inbox messages and every starred one,
+    # since starred lists are served from the mirror without a limit
+    FULL_SYNC_LIMIT = 500
+    # Minimum seconds between history syncs triggered by reads
+    SYNC_INTERVAL = 30
+
+    def __init__(self, gmail, db_path: str = "data/mail_mirror.db"):
+        self.gmail = gmail
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Held for a whole sync so concurrent readers don't replay the same history
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0
+        self.stats = {'full_syncs': 0, 'incremental_syncs': 0, 'history_expired': 0}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                thread_id TEXT,
+                internal_date INTEGER,
+                sender TEXT,
+                subject TEXT,
+                date TEXT,
+                snippet TEXT,
+                label_ids TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_date ON messages (internal_date);
+            CREATE TABLE IF NOT EXISTS message_labels (
+                message_id TEXT,
+                label_id TEXT,
+                PRIMARY KEY (label_id, message_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_message_labels_message ON message_labels (message_id);
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.conn.commit()
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            (key, value)
+        )
+
+    def _store_messages(self, messages: List[Dict]):
+        """Insert or replace message rows from Gmail metadata resources."""
+        for message in messages:
+            headers = message.get('payload', {}).get('headers', [])
+            label_ids = message.get('labelIds', [])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    message['id'],
+                    message.get('threadId'),
+                    int(message.get('internalDate', 0)),
+                    next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown'),
+                    next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject'),
+                    next((h['value'] for h in headers if h['name'] == 'Date'), ''),
+                    message.get('snippet', ''),
+                    json.dumps(label_ids)
+                )
+            )
+            self._store_labels(message['id'], label_ids)
+
+    def _store_labels(self, message_id: str, label_ids: List[str]):
+        if not any(label in self.MIRRORED_LABELS for label in label_ids):
+            self._delete_messages([message_id])
+            return
+        self.conn.execute("UPDATE messages SET label_ids = ? WHERE id = ?", (json.dumps(label_ids), message_id))
+        self.conn.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+        self.conn.executemany(
+            "INSERT INTO message_labels (message_id, label_id) VALUES (?, ?)",
+            [(message_id, label_id) for label_id in label_ids]
+        )
+
+    def _delete_messages(self, message_ids):
+        for message_id in message_ids:
+            self.conn.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+            self.conn.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+
+    def _has_message(self, message_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM messages WHERE id = ?", (message_id,)).fetchone() is not None
+
+    def _list_ids(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Page through message IDs matching query, up to limit (all when None)."""
+        message_ids = []
+        page_token = None
+        while limit is None or len(message_ids) < limit:
+            params = {
+                'userId': 'me',
+                'q': query,
+                'maxResults': 500 if limit is None else min(500, limit - len(message_ids))
+            }
+            if page_token:
+                params['pageToken'] = page_token
+            results = self.gmail._list_message_ids(**params)
+            message_ids.extend(m['id'] for m in results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        return message_ids
+
+    def full_resync(self):
+        """Rebuild the mirror from a fresh mailbox listing."""
+        print("Debug: Mail mirror full resync")
+        service = self.gmail.service
+        # Take the history ID first so changes made during the listing are replayed later
+        history_id = service.users().getProfile(userId='me').execute()['historyId']
+
+        message_ids = self._list_ids('in:inbox', self.FULL_SYNC_LIMIT)
+        seen = set(message_ids)
+        message_ids.extend(message_id for message_id in self._list_ids('is:starred') if message_id not in seen)
+
+        messages = self.gmail._batch_get_messages(
+            message_ids,
+            format='metadata',
+            metadata_headers=self.gmail.LIST_HEADERS
+        )
+
+        with self.conn:
+            self.conn.execute("DELETE FROM messages")
+            self.conn.execute("DELETE FROM message_labels")
+            self._store_messages(messages)
+            self._set_state('history_id', str(history_id))
+        self.stats['full_syncs'] += 1
+
+    def _incremental_sync(self, history_id: str):
+        """Apply changes recorded since history_id."""
+        service = self.gmail.service
+        to_fetch = set()
+        deleted = set()
+        label_updates = {}
+        new_history_id = history_id
+        page_token = None
+
+        while True:
+            params = {'userId': 'me', 'startHistoryId': history_id}
+            if page_token:
+                params['pageToken'] = page_token
+            response = service.users().history().list(**params).execute()
+
+            for record in response.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message_id = added['message']['id']
+                    to_fetch.add(message_id)
+                    deleted.discard(message_id)
+                for removed in record.get('messagesDeleted', []):
+                    message_id = removed['message']['id']
+                    deleted.add(message_id)
+                    to_fetch.discard(message_id)
+                    label_updates.pop(message_id, None)
+                for key in ('labelsAdded', 'labelsRemoved'):
+                    for change in record.get(key, []):
+                        message = change['message']
+                        label_updates[message['id']] = message.get('labelIds', [])
+
+            new_history_id = response.get('historyId', new_history_id)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        with self._lock:
+            known = {message_id for message_id in label_updates if self._has_message(message_id)}
+        for message_id, label_ids in label_updates.items():
+            # Messages that just gained a mirrored label need their metadata
+            if message_id not in known and message_id not in deleted and \
+               any(label in self.MIRRORED_LABELS for label in label_ids):
+                to_fetch.add(message_id)
+
+        messages = []
+        if to_fetch:
+            messages = self.gmail._batch_get_messages(
+                sorted(to_fetch),
+                format='metadata',
+                metadata_headers=self.gmail.LIST_HEADERS
+            )
+        fetched = {message['id'] for message in messages}
+
+        with self._lock, self.conn:
+            for message_id in known:
+                if message_id not in fetched and message_id not in deleted:
+                    self._store_labels(message_id, label_updates[message_id])
+            self._store_messages(messages)
+            self._delete_messages(deleted)
+            self._set_state('history_id', str(new_history_id))
+        self.stats['incremental_syncs'] += 1
+
+    def sync(self, force: bool = False):
+        """Bring the mirror up to date, at most once per SYNC_INTERVAL unless forced."""
+        if not force and time.time() - self._last_sync < self.SYNC_INTERVAL:
+            return
+
+        with self._sync_lock:
+            # Another reader may have synced while this one waited
+            if not force and time.time() - self._last_sync < self.SYNC_INTERVAL:
+                return
+
+            with self._lock:
+                history_id = self._get_state('history_id')
+
+            if not history_id:
+                with self._lock:
+                    self.full_resync()
+            else:
+                try:
+                    self._incremental_sync(history_id)
+                except HttpError as e:
+                    # Gmail answers 404 once the start history ID is too old
+                    if e.resp.status != 404:
+                        raise
+                    print("Debug: Mail mirror history ID expired, resyncing")
+                    self.stats['history_expired'] += 1
+                    with self._lock:
+                        self.full_resync()
+            self._last_sync = time.time()
+
+    def mark_stale(self):
+        """Force the next read to sync, e.g. after changing a message's labels."""
+        self._last_sync = 0
+
+    def _query(self, label_ids: List[str], max_results: Optional[int]) -> List[Dict]:
+        """Return mirrored messages carrying all of label_ids, newest first."""
+        sql = "SELECT id, sender, subject, date, snippet, label_ids FROM messages m WHERE 1 = 1"
+        params = []
+        for label_id in label_ids:
+            sql += " AND EXISTS (SELECT 1 FROM message_labels l WHERE l.label_id = ? AND l.message_id = m.id)"
+            params.append(label_id)
+        sql += " ORDER BY internal_date DESC"
+        if max_results:
+            sql += " LIMIT ?"
+            params.append(max_results)
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [
+            {
+                'id': row[0],
+                'from': row[1],
+                'subject': row[2],
+                'date': row[3],
+                'snippet': row[4],
+                'labels': json.loads(row[5])
+            }
+            for row in rows
+        ]
+
+    def list_recent_emails(self, max_results=10) -> List[Dict]:
+        """Mirror-backed equivalent of GmailManager.list_recent_emails."""
+        try:
+            self.sync()
+            return self._query(['INBOX'], max_results)
+        except Exception as e:
+            print(f"Mail mirror unavailable, listing live: {e}")
+            return self.gmail.list_recent_emails(max_results=max_results)
+
+    def get_starred_emails(self, max_results=None) -> List[Dict]:
+        """Mirror-backed equivalent of GmailManager.get_starred_emails."""
+        try:
+            self.sync()
+            emails = self._query(['STARRED'], max_results)
+            for email in emails:
+                email['labels'] = ['STARRED'] + self.gmail._label_names(
+                    email['labels'], exclude=['STARRED', 'CATEGORY_PERSONAL', 'IMPORTANT']
+                )
+            return emails
+        except Exception as e:
+            print(f"Mail mirror unavailable, listing live: {e}")
+            return self.gmail.get_starred_emails(max_results=max_results)
+
+    def list_unread_emails(self, max_results=5) -> List[Dict]:
+        """Mirror-backed equivalent of GmailManager.list_unread_emails."""
+        try:
+            self.sync()
+            emails = self._query(['INBOX', 'UNREAD'], max_results)
+            for email in emails:
+                email['labels'] = self.gmail._label_names(
+                    email['labels'], exclude=['STARRED', 'UNREAD', 'CATEGORY_PERSONAL', 'IMPORTANT']
+                )
+            return emails
+        except Exception as e:
+            print(f"Mail mirror unavailable, listing live: {e}")
+            return self.gmail.list_unread_emails(max_results=max_results)
@@ -1,66 +1,111 @@
 from chromadb import Client, Settings
 from datetime import datetime, timedelta
 import math
-import nltk
 from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.corpus import stopwords
 from typing import List, Dict, Any
+import asyncio
+import hashlib
 import json
+import re
+import time
+from .nltk_resources import ensure_resource
+from .conversation_log import ConversationLog
+from .hybrid_retriever import HybridRetriever
 
 class MemoryManager:
-    def __init__(self):
-        # Initialize ChromaDB
-        self.client = Client(Settings(is_persistent=True, persist_directory="data/memory"))
+    # Terms that make an interaction worth remembering (matched as substrings)
+    KEY_TERMS = ['remember', 'important', 'note', 'save', 'schedule', 'meeting',
+                 'family', 'work', 'deadline', 'appointment']
+    KEY_TERM_PATTERN = re.compile("|".join(re.escape(term) for term in KEY_TERMS))
+    FACT_ID_PATTERN = re.compile(r"^fact_[0-9a-f]{32}$")
+    TYPE_WEIGHTS = {
+        'command': 0.3,
+        'question': 0.5,
+        'statement': 0.4,
+        'email': 0.6,
+        'calendar': 0.7
+    }
+
+    def __init__(self, client=None, conversation_log: ConversationLog = None, embedding_function=None):
+        # Initialize ChromaDB (a shared client can be passed in)
+        self.client = client or Client(Settings(is_persistent=True, persist_directory="data/memory"))
+        # Shared (cached) embedding function; None uses chromadb's default
+        self.embedding_function = embedding_function
+        
+        # Time-ordered turns for recent history (no embedding lookups)
+        self.conversations = conversation_log or ConversationLog()
         
         # Initialize collections
-        self.system_config = self.client.get_or_create_collection("system_config")
-        self.user_facts = self.client.get_or_create_collection("user_facts")
-        self.contextual = self.client.get_or_create_collection("contextual")
-        self.reference = self.client.get_or_create_collection("reference")
+        self.system_config = self.client.get_or_create_collection("system_config", embedding_function=embedding_function)
+        self.user_facts = self.client.get_or_create_collection("user_facts", embedding_function=embedding_function)
+        self.contextual = self.client.get_or_create_collection("contextual", embedding_function=embedding_function)
+        self.reference = self.client.get_or_create_collection("reference", embedding_function=embedding_function)
         
-        # Initialize NLTK resources
-        self._initialize_nltk()
+        # NLTK resources are loaded on first tokenizer use
+        self._nltk_ready = False
+        
+        # Keyword (BM25) + vector search; indexes are built on first search
+        self.fact_retriever = HybridRetriever(self.user_facts, lambda: self.stop_words)
+        self.interaction_retriever = HybridRetriever(self.contextual, lambda: self.stop_words, keyword_field='keywords')
         
         # Memory constants
         self.MEMORY_THRESHOLD = 0.3
         self.RECENCY_WEIGHT = 0.5
         self.MAX_CONTEXT_ITEMS = 5
+        self.CLEANUP_PAGE_SIZE = 500
+        self.cleanup_stats = {'runs': 0, 'scanned': 0, 'deleted': 0, 'last_run_ms': None}
 
     def _initialize_nltk(self):
-        """Initialize all required NLTK resources with better error handling."""
-        try:
-            # First try to download all required resources
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            nltk.download('averaged_perceptron_tagger', quiet=True)
-            nltk.download('wordnet', quiet=True)
-            
-            # Verify the downloads worked
-            self.stop_words = set(stopwords.words('english'))
-            
+        """Load the pre-cached NLTK resources, falling back to basic tokenization."""
+        start = time.perf_counter()
+        has_punkt = ensure_resource('punkt_tab')
+        has_stopwords = ensure_resource('stopwords')
+
+        if has_stopwords:
+            self._stop_words = set(stopwords.words('english'))
+        else:
+            self._stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to'}
+
+        if has_punkt:
             # Set up tokenizers with error handling
             def safe_word_tokenize(text):
                 try:
                     return word_tokenize(text)
                 except LookupError:
                     return text.split()
-                    
+
             def safe_sent_tokenize(text):
                 try:
                     return sent_tokenize(text)
                 except LookupError:
                     return [s.strip() for s in text.split('.') if s.strip()]
-            
-            # Store the safe tokenizers
-            self.word_tokenize = safe_word_tokenize
-            self.sent_tokenize = safe_sent_tokenize
-            
-        except Exception as e:
-            print(f"Warning: NLTK initialization using basic tokenization: {e}")
-            # Define fallback tokenizers
-            self.word_tokenize = str.split
-            self.sent_tokenize = lambda x: [s.strip() for s in x.split('.') if s.strip()]
-            self.stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to'}
+
+            self._word_tokenize = safe_word_tokenize
+            self._sent_tokenize = safe_sent_tokenize
+        else:
+            print("Warning: NLTK initialization using basic tokenization")
+            self._word_tokenize = str.split
+            self._sent_tokenize = lambda x: [s.strip() for s in x.split('.') if s.strip()]
+
+        self._nltk_ready = True
+        print(f"Debug: NLTK ready in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def word_tokenize(self, text: str) -> List[str]:
+        if not self._nltk_ready:
+            self._initialize_nltk()
+        return self._word_tokenize(text)
+
+    def sent_tokenize(self, text: str) -> List[str]:
+        if not self._nltk_ready:
+            self._initialize_nltk()
+        return self._sent_tokenize(text)
+
+    @property
+    def stop_words(self) -> set:
+        if not self._nltk_ready:
+            self._initialize_nltk()
+        return self._stop_words
 
     def add_system_config(self, key: str, value: Any):
         """Store system configuration."""
@@ -72,46 +117,78 @@ class MemoryManager:
 
     def add_user_fact(self, fact: str, category: str = "general"):
         """Store important user information."""
-        fact_id = f"fact_{datetime.now().isoformat()}"
-        self.user_facts.add(
+        fact_id = self._fact_id(fact)
+        self.user_facts.upsert(
             documents=[fact],
             metadatas=[{
                 'category': category,
                 'timestamp': datetime.now().isoformat(),
-                'type': 'user_fact'
+                'type': 'user_fact',
+                'content_hash': self._content_hash(fact),
+                'added_at': time.time()
             }],
             ids=[fact_id]
         )
+        self.fact_retriever.add(fact_id, fact)
 
-    def add_interaction(self, user_message: str, assistant_response: str = None):
-        """Store an interaction with proper type detection."""
+    def _normalize_interaction(self, user_message, assistant_response: str = None) -> Dict:
         # Handle both old and new formats
         if isinstance(user_message, dict):
             # Old format where first argument is a dict
-            interaction = user_message
-        else:
-            # New format with separate user message and assistant response
-            interaction = {
-                'type': 'conversation',
-                'content': f"User: {user_message}\nAssistant: {assistant_response}",
-                'timestamp': datetime.now().isoformat()
-            }
-        
-        # Calculate significance and store
-        significance = self._calculate_significance(interaction)
-        if significance > self.MEMORY_THRESHOLD:
+            return user_message
+        # New format with separate user message and assistant response
+        return {
+            'type': 'conversation',
+            'content': f"User: {user_message}\nAssistant: {assistant_response}",
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def add_interaction(self, user_message: str, assistant_response: str = None):
+        """Store an interaction with proper type detection."""
+        self.add_interactions([self._normalize_interaction(user_message, assistant_response)])
+
+    def add_interactions(self, interactions: List[Dict]) -> int:
+        """Score many interactions and store the significant ones in one write.
+
+        Meant for bulk backfills such as importing old chat logs; the
+        collection embeds the whole batch in a single call.
+
+        Returns:
+            int: Number of interactions stored
+        """
+        start = time.perf_counter()
+        interactions = [self._normalize_interaction(item) for item in interactions]
+        scores = self.score_interactions(interactions)
+
+        documents, metadatas, ids = [], [], []
+        for interaction, (significance, keywords) in zip(interactions, scores):
+            if significance <= self.MEMORY_THRESHOLD:
+                continue
             metadata = {
                 'timestamp': interaction.get('timestamp', datetime.now().isoformat()),
                 'type': interaction.get('type', 'conversation'),
                 'significance': significance,
-                'keywords': ','.join(self._extract_keywords(interaction['content']))
+                'keywords': ','.join(keywords),
+                'content_hash': self._content_hash(interaction['content']),
+                'added_at': time.time()
             }
-            
-            self.contextual.add(
-                documents=[interaction['content']],
-                metadatas=[metadata],
-                ids=[f"interaction_{metadata['timestamp']}"]
-            )
+            interaction_id = f"interaction_{metadata['timestamp']}"
+            if interaction_id in ids:
+                interaction_id = f"{interaction_id}_{len(ids)}"
+            documents.append(interaction['content'])
+            metadatas.append(metadata)
+            ids.append(interaction_id)
+
+        if documents:
+            self.contextual.add(documents=documents, metadatas=metadatas, ids=ids)
+            for interaction_id, document, metadata in zip(ids, documents, metadatas):
+                self.interaction_retriever.add(interaction_id, document, metadata)
+
+        if len(interactions) > 1:
+            elapsed = time.perf_counter() - start
+            print(f"Debug: Stored {len(documents)}/{len(interactions)} interactions in "
+                  f"{elapsed * 1000:.0f}ms ({len(interactions) / max(elapsed, 1e-9):.0f} items/s)")
+        return len(documents)
 
     def get_context(self, query: str) -> Dict:
         """Assemble relevant context for a query."""
@@ -128,35 +205,39 @@ class MemoryManager:
         
         return context
 
-    def _calculate_significance(self, interaction: Dict) -> float:
-        """Calculate how important an interaction is to remember."""
-        content = interaction['content']
+    def _analyze(self, content: str, interaction_type: str = None):
+        """Tokenize once and derive significance and keywords from the same tokens.
+
+        Returns:
+            Tuple[float, List[str]]: (significance, keywords)
+        """
+        lowered = content.lower()
+        words = self.word_tokenize(lowered)
         
         # Factor 1: Length and complexity
-        words = self.word_tokenize(content)
         length_score = min(len(words) / 100, 0.5)  # Cap at 0.5
         
-        # Factor 2: Key terms presence
-        key_terms = ['remember', 'important', 'note', 'save', 'schedule', 'meeting', 
-                    'family', 'work', 'deadline', 'appointment']
-        term_score = sum(term in content.lower() for term in key_terms) * 0.2
+        # Factor 2: Key terms presence (each term counts once)
+        term_score = len(set(self.KEY_TERM_PATTERN.findall(lowered))) * 0.2
         
         # Factor 3: Interaction type weight
-        type_weights = {
-            'command': 0.3,
-            'question': 0.5,
-            'statement': 0.4,
-            'email': 0.6,
-            'calendar': 0.7
-        }
-        type_score = type_weights.get(interaction['type'], 0.3)
+        type_score = self.TYPE_WEIGHTS.get(interaction_type, 0.3)
         
-        return min(1.0, length_score + term_score + type_score)
+        stop_words = self.stop_words
+        keywords = [word for word in words if word not in stop_words]
+        return min(1.0, length_score + term_score + type_score), keywords
+
+    def score_interactions(self, interactions: List[Dict]) -> List[tuple]:
+        """Return (significance, keywords) for each interaction."""
+        return [self._analyze(item['content'], item.get('type')) for item in interactions]
+
+    def _calculate_significance(self, interaction: Dict) -> float:
+        """Calculate how important an interaction is to remember."""
+        return self._analyze(interaction['content'], interaction['type'])[0]
 
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract key terms from text."""
-        words = self.word_tokenize(text.lower())
-        return [word for word in words if word not in self.stop_words]
+        return self._analyze(text)[1]
 
     def _summarize_content(self, text: str) -> str:
         """Create a concise summary using first two sentences."""
@@ -178,15 +259,11 @@ class MemoryManager:
 
     def _get_relevant_interactions(self, query: str) -> List[str]:
         """Get recent relevant interactions."""
-        results = self.contextual.query(
-            query_texts=[query],
-            n_results=self.MAX_CONTEXT_ITEMS
-        )
-        return results['documents'][0] if results['documents'] else []
+        return self.interaction_retriever.search(query, self.MAX_CONTEXT_ITEMS)
 
     def _needs_reference_context(self, query: str) -> bool:
         """Determine if query needs reference material."""
-        reference_keywords = ['email', 'message', 'sent', 'received', 'calendar', 'event']
+        reference_keywords = ['email', 'message', 'sent', 'received', 'calendar', 'event', 'file', 'document']
         return any(keyword in query.lower() for keyword in reference_keywords)
 
     def _get_reference_material(self, query: str, limit: int = 2) -> List[str]:
@@ -197,144 +274,348 @@ class MemoryManager:
         )
         return results['documents'][0] if results['documents'] else []
 
-    def cleanup_duplicates(self):
-        """Remove duplicate entries while keeping the most significant ones."""
-        for collection in [self.contextual, self.reference, self.user_facts]:
-            try:
-                # Get all documents from collection
-                results = collection.get()
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _fact_id(self, fact: str) -> str:
+        """Facts are keyed by content, so a duplicate maps to an existing ID."""
+        return f"fact_{self._content_hash(fact)[:32]}"
+
+    def _get_system_config(self, key: str, default: Any = None) -> Any:
+        results = self.system_config.get(ids=[key], include=['documents'])
+        return json.loads(results['documents'][0]) if results['ids'] else default
+
+    def migrate_fact_ids(self, page_size: int = None):
+        """Re-key facts stored under timestamp IDs (fact_<isoformat>) by content hash.
+
+        Runs once; afterwards add_long_term_fact finds every existing fact by
+        ID. Legacy copies of the same fact collapse into one entry, and
+        stored embeddings are reused so nothing is re-embedded.
+        """
+        if self._get_system_config('fact_ids_migrated'):
+            return
+        page_size = page_size or self.CLEANUP_PAGE_SIZE
+        migrated = removed = offset = 0
+        try:
+            while True:
+                results = self.user_facts.get(limit=page_size, offset=offset,
+                                              include=['documents', 'metadatas', 'embeddings'])
                 if not results['ids']:
-                    continue
-                    
-                seen_content = {}
-                to_delete = []
-                
-                # Check for duplicates
-                for doc_id, content, metadata in zip(
-                    results['ids'], 
-                    results['documents'], 
-                    results['metadatas']
-                ):
-                    if content in seen_content:
-                        # Compare significance if available
-                        old_sig = seen_content[content].get('significance', 0)
-                        new_sig = metadata.get('significance', 0)
-                        
-                        if new_sig > old_sig:
-                            # Keep new, delete old
-                            to_delete.append(seen_content[content]['id'])
-                            seen_content[content] = {
-                                'id': doc_id,
-                                'significance': new_sig
-                            }
-                        else:
-                            # Keep old, delete new
-                            to_delete.append(doc_id)
-                    else:
-                        seen_content[content] = {
-                            'id': doc_id,
-                            'significance': metadata.get('significance', 0)
-                        }
-                
-                # Delete duplicates
-                if to_delete:
-                    collection.delete(ids=to_delete)
-                    
+                    break
+                legacy = [
+                    (doc_id, document, metadata, embedding)
+                    for doc_id, document, metadata, embedding in zip(
+                        results['ids'], results['documents'], results['metadatas'], results['embeddings']
+                    )
+                    if not self.FACT_ID_PATTERN.match(doc_id) and document
+                ]
+                if legacy:
+                    new_ids = {self._fact_id(document) for _, document, _, _ in legacy}
+                    existing = set(self.user_facts.get(ids=list(new_ids), include=[])['ids'])
+                    ids, documents, metadatas, embeddings = [], [], [], []
+                    for doc_id, document, metadata, embedding in legacy:
+                        new_id = self._fact_id(document)
+                        if new_id in existing or new_id in ids:
+                            continue
+                        ids.append(new_id)
+                        documents.append(document)
+                        metadatas.append({**(metadata or {}), 'content_hash': self._content_hash(document)})
+                        embeddings.append(embedding)
+                    if ids:
+                        self.user_facts.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+                    self.user_facts.delete(ids=[doc_id for doc_id, _, _, _ in legacy])
+                    migrated += len(ids)
+                    removed += len(legacy) - len(ids)
+                # Re-keyed facts are appended after the scan position
+                offset += len(results['ids']) - len(legacy)
+                if len(results['ids']) < page_size:
+                    break
+        except Exception as e:
+            print(f"Error migrating fact IDs: {e}")
+            return
+
+        self.add_system_config('fact_ids_migrated', {'migrated': migrated, 'duplicates_removed': removed})
+        if migrated or removed:
+            self.fact_retriever.invalidate()
+            print(f"Debug: Re-keyed {migrated} facts by content hash, dropped {removed} duplicates")
+
+    def migrate_conversation_history(self, session_id: str = "default", page_size: int = None):
+        """Copy conversation turns stored in the contextual collection into the conversation log.
+
+        Before the log existed, recent history was read from 'conversation'
+        entries in contextual, all belonging to the single shared session.
+        Runs once; the entries stay in contextual for relevance search.
+        """
+        if self._get_system_config('conversations_migrated'):
+            return
+        page_size = page_size or self.CLEANUP_PAGE_SIZE
+        turns = []
+        try:
+            offset = 0
+            while True:
+                results = self.contextual.get(where={'type': 'conversation'}, limit=page_size, offset=offset,
+                                              include=['documents', 'metadatas'])
+                for document, metadata in zip(results['documents'], results['metadatas']):
+                    user, separator, assistant = (document or "").partition("\nAssistant: ")
+                    if not separator or not user.startswith("User: "):
+                        continue
+                    try:
+                        timestamp = datetime.fromisoformat((metadata or {}).get('timestamp', '')).timestamp()
+                    except ValueError:
+                        continue
+                    turns.append({'user': user[len("User: "):], 'assistant': assistant, 'timestamp': timestamp})
+                if len(results['ids']) < page_size:
+                    break
+                offset += page_size
+            turns.sort(key=lambda turn: turn['timestamp'])
+            migrated = self.conversations.import_turns(session_id, turns)
+        except Exception as e:
+            print(f"Error migrating conversation history: {e}")
+            return
+        self.add_system_config('conversations_migrated', {'turns': migrated})
+        if migrated:
+            print(f"Debug: Migrated {migrated} conversation turns into the conversation log")
+
+    def cleanup_duplicates(self, page_size: int = None, pause: float = 0.0):
+        """Remove duplicate entries while keeping the most significant ones.
+
+        The first run scans each collection a page at a time and stamps
+        content hashes onto entries that lack them. Later runs only look at
+        entries added since the stored watermark and find their duplicates
+        with a content-hash lookup, so the cost follows the number of new
+        entries rather than the collection size.
+
+        Args:
+            page_size: Entries fetched per page (defaults to CLEANUP_PAGE_SIZE)
+            pause: Seconds to sleep between pages to yield to foreground work
+        """
+        page_size = page_size or self.CLEANUP_PAGE_SIZE
+        start = time.perf_counter()
+        deleted_before = self.cleanup_stats['deleted']
+        watermarks = self._get_system_config('cleanup_watermarks', {})
+        for name, collection in [('contextual', self.contextual), ('reference', self.reference),
+                                 ('user_facts', self.user_facts)]:
+            # Entries added while this pass runs are picked up by the next one
+            run_started = time.time()
+            try:
+                if name in watermarks:
+                    self._cleanup_since(collection, watermarks[name], page_size, pause)
+                else:
+                    self._cleanup_full(collection, page_size, pause)
+                watermarks[name] = run_started
             except Exception as e:
                 print(f"Error cleaning up duplicates in collection: {e}")
                 continue
+        self.add_system_config('cleanup_watermarks', watermarks)
+
+        if self.cleanup_stats['deleted'] > deleted_before:
+            self.fact_retriever.invalidate()
+            self.interaction_retriever.invalidate()
+        self.cleanup_stats['runs'] += 1
+        self.cleanup_stats['last_run_ms'] = (time.perf_counter() - start) * 1000
+        print(f"Debug: Duplicate cleanup took {self.cleanup_stats['last_run_ms']:.0f}ms")
+
+    def _cleanup_full(self, collection, page_size: int, pause: float):
+        """Scan a whole collection, keeping only content hashes of already-seen entries between pages."""
+        seen_content = {}  # Content hash -> {'id', 'significance'}
+        offset = 0
+        while True:
+            results = collection.get(limit=page_size, offset=offset, include=['documents', 'metadatas'])
+            if not results['ids']:
+                break
+
+            to_delete = []
+            backfill_ids, backfill_metadatas = [], []
+            for doc_id, content, metadata in zip(
+                results['ids'],
+                results['documents'],
+                results['metadatas']
+            ):
+                metadata = metadata or {}
+                key = metadata.get('content_hash') or self._content_hash(content or "")
+                significance = metadata.get('significance', 0)
+                if 'content_hash' not in metadata:
+                    # Lets later incremental runs find this entry by hash
+                    backfill_ids.append(doc_id)
+                    backfill_metadatas.append({**metadata, 'content_hash': key})
+                if key in seen_content:
+                    if significance > seen_content[key]['significance']:
+                        # Keep new, delete old
+                        to_delete.append(seen_content[key]['id'])
+                        seen_content[key] = {'id': doc_id, 'significance': significance}
+                    else:
+                        # Keep old, delete new
+                        to_delete.append(doc_id)
+                else:
+                    seen_content[key] = {'id': doc_id, 'significance': significance}
+
+            backfill = [(i, m) for i, m in zip(backfill_ids, backfill_metadatas) if i not in to_delete]
+            if backfill:
+                collection.update(ids=[i for i, _ in backfill], metadatas=[m for _, m in backfill])
+            if to_delete:
+                collection.delete(ids=to_delete)
+            self.cleanup_stats['scanned'] += len(results['ids'])
+            self.cleanup_stats['deleted'] += len(to_delete)
+
+            # Every deleted entry sat at or before this page, so the
+            # remaining entries shift down by that many positions
+            offset += len(results['ids']) - len(to_delete)
+            if len(results['ids']) < page_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+    def _cleanup_since(self, collection, watermark: float, page_size: int, pause: float):
+        """Deduplicate entries added after the watermark against the whole collection."""
+        offset = 0
+        checked = set()
+        while True:
+            results = collection.get(where={'added_at': {'$gt': watermark}}, limit=page_size, offset=offset,
+                                     include=['documents', 'metadatas'])
+            if not results['ids']:
+                break
+
+            deleted = 0
+            for doc_id, content, metadata in zip(results['ids'], results['documents'], results['metadatas']):
+                key = (metadata or {}).get('content_hash') or self._content_hash(content or "")
+                if key in checked:
+                    continue
+                checked.add(key)
+                matches = collection.get(where={'content_hash': key}, include=['metadatas'])
+                if len(matches['ids']) < 2:
+                    continue
+                # Keep the most significant copy, the earliest one on ties
+                entries = sorted(
+                    zip(matches['ids'], matches['metadatas']),
+                    key=lambda entry: (-(entry[1].get('significance') or 0), entry[1].get('added_at') or 0)
+                )
+                to_delete = [entry_id for entry_id, _ in entries[1:]]
+                collection.delete(ids=to_delete)
+                self.cleanup_stats['deleted'] += len(to_delete)
+                deleted += sum(1 for entry_id in to_delete if entry_id in results['ids'])
+            self.cleanup_stats['scanned'] += len(results['ids'])
+
+            offset += len(results['ids']) - deleted
+            if len(results['ids']) < page_size:
+                break
+            if pause:
+                time.sleep(pause)
 
     def add_long_term_fact(self, fact: str, category: str = "general") -> None:
         """Add a fact to long-term memory, preventing duplicates."""
         try:
-            # First check if this exact fact already exists
-            results = self.user_facts.get()
-            if results['documents']:
-                for existing_fact in results['documents']:
-                    if fact == existing_fact:
-                        return  # Fact already exists
+            # The ID is derived from the content, so the duplicate check is a
+            # single lookup by ID instead of a scan of every stored fact
+            fact_id = self._fact_id(fact)
+            if self.user_facts.get(ids=[fact_id], include=[])['ids']:
+                return  # Fact already exists
             
-            # If we get here, fact doesn't exist, so add it
-            fact_id = f"fact_{datetime.now().isoformat()}"
             self.user_facts.add(
                 documents=[fact],
                 metadatas=[{
                     'category': category,
                     'timestamp': datetime.now().isoformat(),
                     'type': 'long_term_fact',
-                    'significance': 1.0  # Long-term facts are always significant
+                    'significance': 1.0,  # Long-term facts are always significant
+                    'content_hash': self._content_hash(fact),
+                    'added_at': time.time()
                 }],
                 ids=[fact_id]
             )
+            self.fact_retriever.add(fact_id, fact)
         except Exception as e:
             print(f"Error adding long-term fact: {e}")
     
-    def get_recent_history(self, limit: int = 5) -> str:
-        """Get recent conversation history."""
+    def get_recent_history(self, limit: int = 5, session_id: str = "default") -> str:
+        """Get the session's latest conversation turns, newest first."""
         try:
-            # Query recent interactions from contextual memory
-            results = self.contextual.query(
-                query_texts=[""],  # Empty query to get all
-                n_results=limit,
-                where={"type": "conversation"}  # Only get conversation type interactions
+            turns = self.conversations.recent(session_id, limit)
+            return "\n\n".join(
+                f"User: {turn['user']}\nAssistant: {turn['assistant']}" for turn in turns
             )
-            
-            if results and results['documents'] and results['documents'][0]:
-                # Sort by timestamp if available
-                interactions = list(zip(results['documents'][0], results['metadatas'][0]))
-                interactions.sort(key=lambda x: x[1].get('timestamp', ''), reverse=True)
-                
-                # Format the history
-                history = []
-                for content, metadata in interactions:
-                    history.append(content)
-                
-                return "\n\n".join(history)
-            
-            return ""
-            
         except Exception as e:
             print(f"Error getting recent history: {e}")
         return ""
     
-    def add_conversation(self, user_message: str, assistant_response: str):
-        """Add a conversation interaction."""
-        interaction = {
-            'type': 'conversation',
-            'content': f"User: {user_message}\nAssistant: {assistant_response}"
-        }
-        self.add_interaction(interaction)
+    def add_conversation(self, user_message: str, assistant_response: str, session_id: str = "default"):
+        """Append a turn to the session's conversation log."""
+        try:
+            self.conversations.append(session_id, user_message, assistant_response)
+        except Exception as e:
+            print(f"Error adding conversation: {e}")
     
     def get_personal_info(self, category: str = None) -> str:
         """Get stored personal information about the user."""
         try:
-            where = {"type": "user_fact"}
-            if category:
-                where["category"] = category
-            
-            results = self.user_facts.query(
-                query_texts=[""],
-                n_results=10,
-                where=where
-            )
-            
-            if results and results['documents'] and results['documents'][0]:
-                return "\n".join(results['documents'][0])
-            return ""
+            return self._get_personal_facts(category)
         except Exception as e:
             print(f"Error getting personal info: {e}")
             return ""
     
+    def _get_personal_facts(self, category: str = None, limit: int = 10) -> str:
+        """Personal info is filtered by metadata only, so no embedding is needed."""
+        where = {"type": "user_fact"}
+        if category:
+            where = {"$and": [where, {"category": category}]}
+        results = self.user_facts.get(where=where, limit=limit, include=['documents'])
+        return "\n".join(results['documents']) if results and results['documents'] else ""
+
+    def _query_facts(self, query: str, limit: int) -> str:
+        return "\n".join(self.fact_retriever.search(query, limit))
+
+    async def gather_context(self, prompt: str, session_id: str = "default",
+                             history_limit: int = 5, facts_limit: int = 3) -> Dict[str, Any]:
+        """Gather everything a chat turn needs from memory in one call.
+
+        The lookups run concurrently in worker threads, and a failed lookup
+        only empties its own part of the bundle.
+
+        Args:
+            prompt: The user's message, used for the relevance search
+            session_id: Session whose conversation history to include
+            history_limit: Number of recent turns to include
+            facts_limit: Number of relevant facts to include
+
+        Returns:
+            Dict: history, personal_info, relevant_facts and reference
+                  (only searched for email/calendar/file questions) strings,
+                  plus per-lookup and total timings in ms
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        def timed(name, func, *args):
+            lookup_start = time.perf_counter()
+            try:
+                return func(*args)
+            except Exception as e:
+                print(f"Error gathering {name}: {e}")
+                return ""
+            finally:
+                timings[name] = (time.perf_counter() - lookup_start) * 1000
+
+        lookups = [
+            asyncio.to_thread(timed, 'history', self.get_recent_history, history_limit, session_id),
+            asyncio.to_thread(timed, 'personal_info', self._get_personal_facts),
+            asyncio.to_thread(timed, 'relevant_facts', self._query_facts, prompt, facts_limit),
+        ]
+        if self._needs_reference_context(prompt):
+            lookups.append(asyncio.to_thread(timed, 'reference', self._get_reference_material, prompt))
+        history, personal_info, relevant_facts, *reference = await asyncio.gather(*lookups)
+        timings['total'] = (time.perf_counter() - start) * 1000
+        return {
+            'history': history,
+            'personal_info': personal_info,
+            'relevant_facts': relevant_facts,
+            'reference': "\n---\n".join(reference[0]) if reference and reference[0] else "",
+            'timings': timings
+        }
+
     def get_relevant_facts(self, query: str, limit: int = 3) -> str:
         """Get facts relevant to the current query."""
         try:
-            results = self.user_facts.query(
-                query_texts=[query],
-                n_results=limit
-            )
-            if results and results['documents'] and results['documents'][0]:
-                return "\n".join(results['documents'][0])
-            return ""
+            return self._query_facts(query, limit)
         except Exception as e:
             print(f"Error getting relevant facts: {e}")
             return ""
@@ -368,6 +649,7 @@ class MemoryManager:
         """Delete a fact by its ID."""
         try:
             self.user_facts.delete(ids=[fact_id])
+            self.fact_retriever.remove(fact_id)
             return True
         except Exception as e:
             print(f"Error deleting fact: {e}")
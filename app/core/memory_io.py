@@ -0,0 +1,206 @@
+from typing import Dict, Iterator, List, Optional
+import json
+import os
+import time
+
+CHUNK_SIZE = 500
+
+def _last_exported_id(path: str) -> Optional[str]:
+    """Return the ID of the last complete record in an export file, if any.
+
+    A trailing partial line (from an interrupted export) is truncated so
+    the export can continue after the last complete record.
+    """
+    if not os.path.exists(path):
+        return None
+    last = None
+    last_newline = 0
+    position = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            position += len(line)
+            if line.endswith(b'\n'):
+                last_newline = position
+                if line.strip():
+                    last = line
+    if last_newline != position:
+        with open(path, 'r+b') as f:
+            f.truncate(last_newline)
+    return json.loads(last)['id'] if last else None
+
+def _load_cursor(path: str) -> Dict:
+    """Return the saved position of an interrupted or finished export.
+
+    The cursor file next to the export records how many collection entries
+    were written, the last ID among them and the file size at that point.
+    Anything written after the cursor was saved (a partial chunk or line) is
+    truncated, so the export continues from a clean record boundary. An
+    export without a cursor is started over.
+    """
+    cursor = {'offset': 0, 'last_id': None, 'size': 0}
+    if os.path.exists(path + '.cursor'):
+        with open(path + '.cursor', encoding='utf-8') as f:
+            cursor = json.load(f)
+    if os.path.exists(path):
+        with open(path, 'r+b') as f:
+            f.truncate(cursor['size'])
+    return cursor
+
+def _save_cursor(path: str, cursor: Dict):
+    with open(path + '.cursor.tmp', 'w', encoding='utf-8') as f:
+        json.dump(cursor, f)
+    os.replace(path + '.cursor.tmp', path + '.cursor')
+
+def _resume_offset(collection, cursor: Dict, chunk_size: int) -> int:
+    """Find where to continue scanning, allowing for entries deleted since the cursor was saved."""
+    offset, last_id = cursor['offset'], cursor['last_id']
+    if last_id is None:
+        return 0
+    if collection.get(include=[], limit=1, offset=offset - 1)['ids'] == [last_id]:
+        return offset
+    # Entries before the cursor were deleted; page forward to the last exported ID
+    position = 0
+    while True:
+        page = collection.get(include=[], limit=chunk_size, offset=position)['ids']
+        if last_id in page:
+            return position + page.index(last_id) + 1
+        if len(page) < chunk_size:
+            # The last exported entry is gone too. Start over; import
+            # upserts, so records exported twice are harmless.
+            return 0
+        position += len(page)
+
+def export_collection(collection, path: str, chunk_size: int = CHUNK_SIZE,
+                      include_embeddings: bool = True) -> int:
+    """Stream a collection to a JSONL file, one record per line, in insertion order.
+
+    IDs are scanned a page at a time (get with limit/offset and no payload)
+    and each page's records are then fetched by ID, so memory use is one
+    chunk regardless of collection size. A cursor saved after every chunk
+    lets a re-run resume an interrupted export, or append entries added
+    since a finished one.
+
+    Returns:
+        int: Number of records written by this call
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    cursor = _load_cursor(path)
+    offset = _resume_offset(collection, cursor, chunk_size)
+    include = ['documents', 'metadatas'] + (['embeddings'] if include_embeddings else [])
+    written = 0
+    start = time.perf_counter()
+
+    with open(path, 'a', encoding='utf-8') as f:
+        while True:
+            chunk = collection.get(include=[], limit=chunk_size, offset=offset)['ids']
+            if not chunk:
+                break
+            results = collection.get(ids=chunk, include=include)
+            embeddings = results.get('embeddings') if include_embeddings else None
+            records = {}
+            for i, record_id in enumerate(results['ids']):
+                record = {
+                    'id': record_id,
+                    'document': results['documents'][i],
+                    'metadata': results['metadatas'][i]
+                }
+                if embeddings is not None and len(embeddings) > i:
+                    record['embedding'] = [float(x) for x in embeddings[i]]
+                records[record_id] = record
+            # get() does not return records in request order; keep the scan order
+            for record_id in chunk:
+                if record_id in records:
+                    f.write(json.dumps(records[record_id]) + '\n')
+                    written += 1
+            f.flush()
+            offset += len(chunk)
+            _save_cursor(path, {'offset': offset, 'last_id': chunk[-1], 'size': f.tell()})
+            if len(chunk) < chunk_size:
+                break
+
+    print(f"Debug: Exported {written} records from {collection.name} in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return written
+
+def _read_records(path: str) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def _upsert_chunk(collection, chunk: List[Dict], use_embeddings: bool):
+    # Precomputed embeddings are passed through for records that have one;
+    # the collection's embedding function runs once for the rest
+    with_embeddings = [record for record in chunk if use_embeddings and record.get('embedding')]
+    without_embeddings = [record for record in chunk if not (use_embeddings and record.get('embedding'))]
+    for records in (with_embeddings, without_embeddings):
+        if not records:
+            continue
+        kwargs = {
+            'ids': [record['id'] for record in records],
+            'documents': [record.get('document') for record in records],
+            # chromadb rejects empty metadata dicts, so a missing one is None
+            'metadatas': [record.get('metadata') or None for record in records]
+        }
+        if records is with_embeddings:
+            kwargs['embeddings'] = [record['embedding'] for record in records]
+        collection.upsert(**kwargs)
+
+def import_collection(collection, path: str, chunk_size: int = CHUNK_SIZE,
+                      use_embeddings: bool = True) -> int:
+    """Load a JSONL export into a collection with chunked upserts.
+
+    Upserting makes the import safe to re-run after an interruption.
+
+    Returns:
+        int: Number of records imported
+    """
+    imported = 0
+    chunk: List[Dict] = []
+    start = time.perf_counter()
+    for record in _read_records(path):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            _upsert_chunk(collection, chunk, use_embeddings)
+            imported += len(chunk)
+            chunk = []
+    if chunk:
+        _upsert_chunk(collection, chunk, use_embeddings)
+        imported += len(chunk)
+
+    print(f"Debug: Imported {imported} records into {collection.name} in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return imported
+
+def export_todos(todos, path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """Stream the todo table to JSONL in ID order, resuming like export_collection."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    last_id = _last_exported_id(path)
+    written = 0
+    with open(path, 'a', encoding='utf-8') as f:
+        while True:
+            page = todos.iter_todos(after_id=last_id, limit=chunk_size)
+            if not page:
+                break
+            for todo in page:
+                f.write(json.dumps(todo) + '\n')
+            f.flush()
+            last_id = page[-1]['id']
+            written += len(page)
+            if len(page) < chunk_size:
+                break
+    return written
+
+def import_todos(todos, path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """Load a todo JSONL export with one transaction per chunk."""
+    imported = 0
+    chunk: List[Dict] = []
+    for record in _read_records(path):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            todos.upsert_todos(chunk)
+            imported += len(chunk)
+            chunk = []
+    if chunk:
+        todos.upsert_todos(chunk)
+        imported += len(chunk)
+    return imported
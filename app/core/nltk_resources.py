@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+import nltk
+
+NLTK_DATA_DIR = os.path.join("data", "nltk_data")
+MANIFEST_NAME = "manifest.json"
+
+# NLTK package name -> resource path as used by nltk.data.find
+RESOURCES = {
+    'punkt_tab': 'tokenizers/punkt_tab',  # word_tokenize / sent_tokenize
+    'stopwords': 'corpora/stopwords',
+}
+
+_verified: Dict[str, bool] = {}
+
+def _checksum(path: str) -> str:
+    """SHA-256 over every file under path, in a stable order."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode())
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+def _load_manifest(data_dir: str) -> Dict[str, str]:
+    manifest_path = os.path.join(data_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def bootstrap(packages: Optional[Iterable[str]] = None, data_dir: str = NLTK_DATA_DIR) -> Dict[str, str]:
+    """Download resources into data_dir and record their checksums.
+
+    Run this once on a machine with network access (see
+    scripts/bootstrap_nltk.py); the data dir can then be copied to offline hosts.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    manifest = _load_manifest(data_dir)
+    for package in packages or RESOURCES:
+        if not nltk.download(package, download_dir=data_dir, quiet=True):
+            raise RuntimeError(f"Failed to download NLTK package: {package}")
+        manifest[package] = _checksum(os.path.join(data_dir, RESOURCES[package]))
+        _verified.pop(package, None)
+
+    with open(os.path.join(data_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+def ensure_resource(package: str, data_dir: str = NLTK_DATA_DIR) -> bool:
+    """Make a pre-cached resource loadable, verifying it against the manifest.
+
+    Never touches the network. A resource missing from data_dir is looked up
+    on NLTK's default search paths (e.g. ~/nltk_data on existing installs)
+    and used unverified. Returns False only when no usable copy exists, so
+    callers can fall back to basic tokenization. The result is cached for
+    the life of the process.
+    """
+    if package in _verified:
+        return _verified[package]
+
+    start = time.perf_counter()
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+    resource_path = os.path.join(data_dir, RESOURCES[package])
+    expected = _load_manifest(data_dir).get(package)
+    if os.path.isdir(resource_path) and expected:
+        ok = _checksum(resource_path) == expected
+        if not ok:
+            print(f"Warning: NLTK resource {package} in {data_dir} failed checksum verification; "
+                  f"re-run scripts/bootstrap_nltk.py")
+    else:
+        ok = _find_installed(package)
+
+    if not ok:
+        print(f"WARNING: NLTK resource {package} is unavailable. Falling back to basic text processing, "
+              f"which degrades significance scoring, keyword extraction and keyword search. "
+              f"Run scripts/bootstrap_nltk.py to fix this.")
+    _verified[package] = ok
+    print(f"Debug: Checked NLTK resource {package} in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return ok
+
+def _find_installed(package: str) -> bool:
+    """Look for a resource on NLTK's default search paths."""
+    try:
+        location = nltk.data.find(RESOURCES[package])
+    except LookupError:
+        return False
+    print(f"WARNING: NLTK resource {package} is not cached in {NLTK_DATA_DIR}; using the unverified copy at "
+          f"{location}. Run scripts/bootstrap_nltk.py to cache a verified copy.")
+    return True
@@ -0,0 +1,217 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+class ReferenceIndexer:
+    """Fills the memory `reference` collection with chunked source material.
+
+    Emails, calendar events and text files are split into overlapping
+    sentence windows and upserted in batches with source metadata. A
+    manifest of source content hashes makes re-runs incremental: unchanged
+    sources are skipped, changed ones are re-chunked and their stale chunks
+    removed. Emails never change once sent, so they are skipped by ID alone
+    without fetching their bodies again.
+    """
+
+    SENTENCES_PER_CHUNK = 5
+    SENTENCE_OVERLAP = 1
+    MAX_CHUNK_CHARS = 1500
+    BATCH_SIZE = 64
+    # Text files worth indexing (no secrets such as .env, no binaries)
+    TEXT_EXTENSIONS = {'.txt', '.md', '.csv', '.json', '.html', '.py', '.js', '.css', '.yaml', '.yml'}
+    MAX_FILES = 2000
+
+    def __init__(self, memory, manifest_path: str = "data/reference_manifest.json"):
+        self.memory = memory
+        self.collection = memory.reference
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+        self.stats = {'indexed': 0, 'skipped': 0, 'chunks_written': 0, 'last_run_ms': None}
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading reference manifest: {e}")
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def chunk_text(self, text: str) -> List[str]:
+        """Split text into overlapping windows of sentences."""
+        sentences = [s.strip() for s in self.memory.sent_tokenize(text) if s.strip()]
+        chunks = []
+        step = max(1, self.SENTENCES_PER_CHUNK - self.SENTENCE_OVERLAP)
+        for start in range(0, len(sentences), step):
+            chunk = " ".join(sentences[start:start + self.SENTENCES_PER_CHUNK])
+            # Very long "sentences" (code, tables) are split on length instead
+            while len(chunk) > self.MAX_CHUNK_CHARS:
+                chunks.append(chunk[:self.MAX_CHUNK_CHARS])
+                chunk = chunk[self.MAX_CHUNK_CHARS:]
+            if chunk:
+                chunks.append(chunk)
+            if start + self.SENTENCES_PER_CHUNK >= len(sentences):
+                break
+        return chunks
+
+    def _pending_chunks(self, source_id: str, source_type: str, title: str, text: str) -> Optional[Dict]:
+        """Chunk a source unless its content hash matches the manifest."""
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        previous = self.manifest.get(source_id)
+        if previous and previous['hash'] == content_hash:
+            self.stats['skipped'] += 1
+            return None
+
+        chunks = self.chunk_text(text)
+        return {
+            'source_id': source_id,
+            'hash': content_hash,
+            'previous_chunks': previous['chunks'] if previous else 0,
+            'ids': [f"{source_id}#{i}" for i in range(len(chunks))],
+            'documents': chunks,
+            'metadatas': [{
+                'source': source_id,
+                'source_type': source_type,
+                'title': title[:200],
+                'chunk': i,
+                'source_hash': content_hash,
+                # Per-chunk hash, which duplicate cleanup compares
+                'content_hash': hashlib.sha256(chunk.encode('utf-8')).hexdigest(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'added_at': time.time()
+            } for i, chunk in enumerate(chunks)]
+        }
+
+    def _write(self, pending: List[Dict]):
+        """Upsert chunks in batches, drop chunks a source no longer has, update the manifest."""
+        ids, documents, metadatas = [], [], []
+        for source in pending:
+            ids.extend(source['ids'])
+            documents.extend(source['documents'])
+            metadatas.extend(source['metadatas'])
+
+        # The collection embeds each batch in one call
+        for i in range(0, len(ids), self.BATCH_SIZE):
+            self.collection.upsert(
+                ids=ids[i:i + self.BATCH_SIZE],
+                documents=documents[i:i + self.BATCH_SIZE],
+                metadatas=metadatas[i:i + self.BATCH_SIZE]
+            )
+        self.stats['chunks_written'] += len(ids)
+
+        stale = [
+            f"{source['source_id']}#{i}"
+            for source in pending
+            for i in range(len(source['ids']), source['previous_chunks'])
+        ]
+        if stale:
+            self.collection.delete(ids=stale)
+
+        for source in pending:
+            self.manifest[source['source_id']] = {'hash': source['hash'], 'chunks': len(source['ids'])}
+        self.stats['indexed'] += len(pending)
+        self._save_manifest()
+
+    def _index(self, sources: Iterable[tuple]) -> int:
+        """Index (source_id, source_type, title, text) tuples. Returns sources (re)indexed."""
+        with self._lock:
+            start = time.perf_counter()
+            pending = []
+            for source_id, source_type, title, text in sources:
+                if not text or not text.strip():
+                    continue
+                chunks = self._pending_chunks(source_id, source_type, title, text)
+                if chunks:
+                    pending.append(chunks)
+            if pending:
+                self._write(pending)
+            self.stats['last_run_ms'] = (time.perf_counter() - start) * 1000
+            print(f"Debug: Indexed {len(pending)} reference sources in {self.stats['last_run_ms']:.0f}ms")
+            return len(pending)
+
+    def index_emails(self, emails: List[Dict], fetch_email) -> int:
+        """Index email bodies.
+
+        Args:
+            emails: Email summaries (with 'id'), e.g. from the mail mirror
+            fetch_email: Callable returning a full email (with 'body') by ID;
+                         only called for emails not indexed before
+        """
+        def sources():
+            for summary in emails:
+                source_id = f"email:{summary['id']}"
+                if source_id in self.manifest:
+                    self.stats['skipped'] += 1
+                    continue
+                email = fetch_email(summary['id'])
+                if not email:
+                    continue
+                text = f"From: {email.get('from', '')}\nSubject: {email.get('subject', '')}\n\n{email.get('body') or email.get('snippet', '')}"
+                yield source_id, 'email', email.get('subject', ''), text
+
+        return self._index(sources())
+
+    def index_events(self, events: List[Dict]) -> int:
+        """Index calendar events that have a description or location."""
+        def sources():
+            for event in events:
+                if not event.get('description') and not event.get('location'):
+                    continue
+                start = event.get('start', {})
+                text = "\n".join(filter(None, [
+                    event.get('summary', ''),
+                    f"When: {start.get('dateTime') or start.get('date', '')}",
+                    f"Where: {event['location']}" if event.get('location') else '',
+                    event.get('description', '')
+                ]))
+                yield f"event:{event.get('calendar', '')}:{event['id']}", 'event', event.get('summary', ''), text
+
+        return self._index(sources())
+
+    def index_files(self, file_manager, path: str) -> int:
+        """Index text files under path (a file or a directory) that FileManager allows."""
+        root = Path(path).expanduser().resolve()
+        if not file_manager._is_safe_path(root):
+            raise ValueError("Invalid path")
+
+        def candidates():
+            if root.is_file():
+                yield root
+                return
+            count = 0
+            for dirpath, dirnames, filenames in os.walk(root):
+                # Prune hidden and excluded directories instead of descending into them
+                dirnames[:] = [d for d in dirnames if file_manager._should_show_item(Path(d))]
+                for name in filenames:
+                    file_path = Path(dirpath) / name
+                    if file_path.suffix.lower() in self.TEXT_EXTENSIONS and file_manager._should_show_item(file_path):
+                        yield file_path
+                        count += 1
+                        if count >= self.MAX_FILES:
+                            return
+
+        def sources():
+            for file_path in candidates():
+                try:
+                    if (file_path.suffix.lower() not in self.TEXT_EXTENSIONS or
+                            file_path.stat().st_size > file_manager.MAX_READ_SIZE):
+                        continue
+                    text = file_path.read_text(errors='ignore')
+                except OSError:
+                    continue
+                yield f"file:{file_path}", 'file', file_path.name, text
+
+        return self._index(sources())
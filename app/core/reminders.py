@@ -0,0 +1,88 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import time
+
+class ReminderScheduler:
+    """Pushes "due soon" notifications for todos without polling.
+
+    The scheduler sleeps until the earliest pending deadline (minus the lead
+    time), as found by TodoManager's due-time index, or until it is woken
+    because todos changed or a client connected. Idle cost is one sleeping
+    task regardless of how many todos are pending.
+
+    Only todos whose due time falls inside the lead window around now
+    (now - lead < due <= now + lead) are announced. Anything further past
+    due (long-overdue todos on first start, or ones that expired while
+    nobody was connected) is marked reminded silently.
+    """
+
+    LEAD_TIME = 15 * 60  # Remind this many seconds before the due time
+
+    def __init__(self, get_todos: Callable[[], Any],
+                 notify: Callable[[Dict[str, Any]], Awaitable[int]],
+                 lead_time: Optional[float] = None):
+        """
+        Args:
+            get_todos: Returns the TodoManager (called off the event loop)
+            notify: Coroutine that delivers a message and returns how many
+                    clients received it
+            lead_time: Seconds before the due time to send the reminder
+        """
+        self.get_todos = get_todos
+        self.notify = notify
+        self.lead_time = self.LEAD_TIME if lead_time is None else lead_time
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {'wakeups': 0, 'reminders_sent': 0, 'overdue_skipped': 0, 'next_due': None}
+
+    def wake(self):
+        """Re-check deadlines now. Safe to call from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _format(self, todos: List[Dict]) -> Dict[str, Any]:
+        lines = [f"- {todo['task']} (due {todo['due_date']})" for todo in todos]
+        return {
+            "type": "reminder",
+            "content": "Due soon:\n" + "\n".join(lines),
+            "todos": [{"id": todo['id'], "task": todo['task'], "due_date": todo['due_date']} for todo in todos]
+        }
+
+    async def run(self):
+        """Run until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        todos = await asyncio.to_thread(self.get_todos)
+        todos.add_listener(self.wake)
+
+        while True:
+            self._wakeup.clear()
+            self.stats['wakeups'] += 1
+            timeout = None
+            try:
+                now = time.time()
+                skipped = await asyncio.to_thread(todos.skip_overdue, now - self.lead_time)
+                if skipped:
+                    print(f"Debug: Skipped reminders for {skipped} long-overdue todos")
+                    self.stats['overdue_skipped'] += skipped
+                due = await asyncio.to_thread(todos.due_before, now + self.lead_time)
+                delivered = await self.notify(self._format(due)) if due else 0
+                if due and delivered:
+                    await asyncio.to_thread(todos.mark_reminded, [todo['id'] for todo in due])
+                    self.stats['reminders_sent'] += len(due)
+
+                # With nobody connected, undelivered reminders wait for the
+                # next connection (or todo change) instead of retrying
+                if not due or delivered:
+                    next_due = await asyncio.to_thread(todos.next_due_time)
+                    self.stats['next_due'] = next_due
+                    if next_due is not None:
+                        timeout = max(0.0, next_due - self.lead_time - time.time())
+            except Exception as e:
+                print(f"Error checking todo reminders: {e}")
+                timeout = 60
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,150 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+import asyncio
+import hashlib
+import time
+
+class RetentionEngine:
+    """Keeps the contextual collection from growing without bound.
+
+    Each stored interaction's significance decays with age (halving every
+    HALF_LIFE_DAYS). A run does two things:
+      1. Compaction: old interactions whose decayed significance has dropped
+         below MIN_SIGNIFICANCE are merged into one digest entry per day,
+         built from their first sentences via _summarize_content.
+      2. Capping: if the collection is still above MAX_ENTRIES, the entries
+         with the lowest decayed significance are removed.
+    """
+
+    HALF_LIFE_DAYS = 30
+    MIN_SIGNIFICANCE = 0.35
+    COMPACT_AFTER_DAYS = 14
+    MAX_ENTRIES = 5000
+    PAGE_SIZE = 500
+    # Seconds between scheduled runs
+    INTERVAL = 6 * 60 * 60
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.collection = memory.contextual
+        self.stats = {
+            'runs': 0, 'scanned': 0, 'compacted': 0, 'digests_created': 0,
+            'evicted': 0, 'last_run_ms': None, 'last_size': None
+        }
+
+    def decayed_significance(self, metadata: Dict, now: float) -> float:
+        """Return the entry's significance after age decay."""
+        significance = metadata.get('significance', 0) or 0
+        try:
+            stored_at = datetime.fromisoformat(metadata['timestamp']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return significance
+        age_days = max(0.0, (now - stored_at) / 86400)
+        return significance * 0.5 ** (age_days / self.HALF_LIFE_DAYS)
+
+    def _scan(self, now: float) -> List[Dict]:
+        """Page through the collection's metadata (documents are not loaded)."""
+        entries = []
+        offset = 0
+        while True:
+            results = self.collection.get(limit=self.PAGE_SIZE, offset=offset, include=['metadatas'])
+            if not results['ids']:
+                break
+            for entry_id, metadata in zip(results['ids'], results['metadatas']):
+                metadata = metadata or {}
+                entries.append({
+                    'id': entry_id,
+                    'metadata': metadata,
+                    'timestamp': metadata.get('timestamp', ''),
+                    'score': self.decayed_significance(metadata, now)
+                })
+            offset += len(results['ids'])
+            if len(results['ids']) < self.PAGE_SIZE:
+                break
+        return entries
+
+    def _compact(self, entries: List[Dict], now: float) -> List[str]:
+        """Merge faded old interactions into per-day digests. Returns the removed IDs."""
+        cutoff = now - self.COMPACT_AFTER_DAYS * 86400
+        by_day = defaultdict(list)
+        for entry in entries:
+            if entry['metadata'].get('type') == 'digest' or entry['score'] >= self.MIN_SIGNIFICANCE:
+                continue
+            try:
+                stored_at = datetime.fromisoformat(entry['timestamp']).timestamp()
+            except (TypeError, ValueError):
+                continue
+            if stored_at < cutoff:
+                by_day[entry['timestamp'][:10]].append(entry)
+
+        removed = []
+        for day, group in sorted(by_day.items()):
+            group.sort(key=lambda entry: entry['timestamp'])
+            ids = [entry['id'] for entry in group]
+            documents = self.collection.get(ids=ids, include=['documents'])
+            docs_by_id = dict(zip(documents['ids'], documents['documents']))
+            summaries = [
+                self.memory._summarize_content(docs_by_id[entry_id])
+                for entry_id in ids if docs_by_id.get(entry_id)
+            ]
+            if not summaries:
+                continue
+
+            digest = f"Digest of {len(summaries)} conversations on {day}:\n" + "\n".join(summaries)
+            digest_id = f"digest_{day}_{hashlib.sha256(''.join(ids).encode()).hexdigest()[:12]}"
+            self.collection.upsert(
+                documents=[digest],
+                metadatas=[{
+                    'timestamp': group[-1]['timestamp'],
+                    'type': 'digest',
+                    'significance': max(entry['metadata'].get('significance', 0) or 0 for entry in group),
+                    'merged': len(group),
+                    'keywords': ','.join(self.memory._extract_keywords(digest)[:50]),
+                    'content_hash': self.memory._content_hash(digest),
+                    'added_at': time.time()
+                }],
+                ids=[digest_id]
+            )
+            self.collection.delete(ids=ids)
+            removed.extend(ids)
+            self.stats['digests_created'] += 1
+            self.stats['compacted'] += len(ids)
+        return removed
+
+    def run_once(self):
+        """Run one compaction and capping pass."""
+        start = time.perf_counter()
+        now = time.time()
+
+        entries = self._scan(now)
+        self.stats['scanned'] += len(entries)
+        digests_before = self.stats['digests_created']
+        removed = set(self._compact(entries, now))
+        remaining = [entry for entry in entries if entry['id'] not in removed]
+        # New digests count toward the cap but are never evicted in the pass that made them
+        new_digests = self.stats['digests_created'] - digests_before
+        overflow = len(remaining) + new_digests - self.MAX_ENTRIES
+        if overflow > 0:
+            remaining.sort(key=lambda entry: entry['score'])
+            evict = [entry['id'] for entry in remaining[:overflow]]
+            for i in range(0, len(evict), self.PAGE_SIZE):
+                self.collection.delete(ids=evict[i:i + self.PAGE_SIZE])
+            self.stats['evicted'] += len(evict)
+
+        if removed or overflow > 0:
+            self.memory.interaction_retriever.invalidate()
+        self.stats['runs'] += 1
+        self.stats['last_size'] = self.collection.count()
+        self.stats['last_run_ms'] = (time.perf_counter() - start) * 1000
+        print(f"Debug: Retention pass took {self.stats['last_run_ms']:.0f}ms, "
+              f"{self.stats['last_size']} contextual entries remain")
+
+    async def run_periodically(self, interval: float = None):
+        """Run a pass now and then every interval seconds, off the event loop."""
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                print(f"Error running retention pass: {e}")
+            await asyncio.sleep(interval or self.INTERVAL)
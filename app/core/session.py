@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from typing import Callable, Optional
+import asyncio
+import time
+
+class Session:
+    """Conversation state that belongs to a single connection or user."""
+
+    def __init__(self, session_id: str, email_handler):
+        self.id = session_id
+        self.email_handler = email_handler  # Holds draft/read/list state for /email
+        self.pending_calendar_command: Optional[str] = None
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        # Serializes messages within a session; different sessions run concurrently
+        self.lock = asyncio.Lock()
+
+    def touch(self):
+        self.last_active = time.time()
+
+class SessionStore:
+    """Bounded LRU store of sessions with idle eviction.
+
+    Sessions are created on first use through the factory. The least recently
+    used session is dropped once max_sessions is reached, and sessions idle for
+    longer than idle_timeout seconds are dropped on the next access.
+    on_discard(session_id, ended) is called for every dropped session; ended
+    is True when the session was discarded explicitly and will not return.
+    """
+
+    DEFAULT_SESSION = "default"
+
+    def __init__(self, factory: Callable[[str], Session], max_sessions: int = 256, idle_timeout: float = 3600,
+                 on_discard: Optional[Callable[[str, bool], None]] = None):
+        self.factory = factory
+        self.on_discard = on_discard
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.stats = {'created': 0, 'evicted_idle': 0, 'evicted_lru': 0}
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """Return the session for session_id, creating it if needed."""
+        session_id = session_id or self.DEFAULT_SESSION
+        self._evict_idle()
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self.factory(session_id)
+            self._sessions[session_id] = session
+            self.stats['created'] += 1
+            while len(self._sessions) > self.max_sessions:
+                evicted_id, _ = self._sessions.popitem(last=False)
+                self.stats['evicted_lru'] += 1
+                self._notify(evicted_id, False)
+        else:
+            self._sessions.move_to_end(session_id)
+
+        session.touch()
+        return session
+
+    def discard(self, session_id: str):
+        """Drop a session, e.g. when its connection closes."""
+        self._sessions.pop(session_id, None)
+        self._notify(session_id, True)
+
+    def _notify(self, session_id: str, ended: bool):
+        if self.on_discard:
+            try:
+                self.on_discard(session_id, ended)
+            except Exception as e:
+                print(f"Error releasing session {session_id}: {e}")
+
+    def _evict_idle(self):
+        cutoff = time.time() - self.idle_timeout
+        # Oldest entries are at the front, so stop at the first active one
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_active >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self.stats['evicted_idle'] += 1
+            self._notify(session_id, False)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -1,7 +1,9 @@
-from chromadb import Client, Settings
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 from enum import Enum
+import os
+import sqlite3
+import threading
 
 class Priority(Enum):
     LOW = "low"
@@ -9,12 +11,158 @@ class Priority(Enum):
     HIGH = "high"
 
 class TodoManager:
-    def __init__(self):
-        self.client = Client(Settings(is_persistent=True, persist_directory="data/memory"))
-        self.todos = self.client.get_or_create_collection("todos")
+    """Todo storage in SQLite with indexes on the columns lists filter by.
 
-    def add_todo(self, 
-                task: str, 
+    Listing and filtering are plain indexed queries, so they never embed
+    text and are never truncated. When a chromadb client is given, todos
+    stored in the `todos` collection by older versions are migrated on
+    first start.
+    """
+
+    COLUMNS = ('id', 'task', 'priority', 'category', 'due_date', 'notes', 'status', 'created_at', 'completed_at',
+               'due_ts')
+    MIGRATION_PAGE_SIZE = 500
+
+    def __init__(self, client=None, embedding_function=None, db_path: str = "data/todos.db"):
+        self.client = client
+        self.embedding_function = embedding_function
+        self._collection = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS todos (
+                id TEXT PRIMARY KEY,
+                task TEXT NOT NULL,
+                priority TEXT NOT NULL DEFAULT 'medium',
+                category TEXT NOT NULL DEFAULT 'general',
+                due_date TEXT,
+                notes TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                created_at TEXT,
+                completed_at TEXT
+            );
+            -- Each filter index ends in list_todos' ORDER BY columns, so a filtered
+            -- list is read in order straight off one index with no sort
+            DROP INDEX IF EXISTS idx_todos_status;
+            DROP INDEX IF EXISTS idx_todos_priority;
+            DROP INDEX IF EXISTS idx_todos_category;
+            CREATE INDEX IF NOT EXISTS idx_todos_status_due ON todos (status, due_date IS NULL, due_date, created_at);
+            CREATE INDEX IF NOT EXISTS idx_todos_priority_due
+                ON todos (priority, status, due_date IS NULL, due_date, created_at);
+            CREATE INDEX IF NOT EXISTS idx_todos_category_due
+                ON todos (category, status, due_date IS NULL, due_date, created_at);
+            CREATE INDEX IF NOT EXISTS idx_todos_due_date ON todos (due_date);
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._add_reminder_columns()
+        self.conn.commit()
+
+        if self.client is not None:
+            self._migrate_from_collection()
+
+    def _add_reminder_columns(self):
+        """Add the due-time index columns to databases created before reminders."""
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(todos)")}
+        if 'due_ts' not in columns:
+            self.conn.execute("ALTER TABLE todos ADD COLUMN due_ts REAL")
+            rows = self.conn.execute("SELECT id, due_date FROM todos WHERE due_date IS NOT NULL").fetchall()
+            self.conn.executemany(
+                "UPDATE todos SET due_ts = ? WHERE id = ?",
+                [(self._due_timestamp(row['due_date']), row['id']) for row in rows]
+            )
+        if 'reminded_at' not in columns:
+            self.conn.execute("ALTER TABLE todos ADD COLUMN reminded_at TEXT")
+        # Only pending, not yet reminded todos with a due time are indexed, so
+        # finding the next deadline is a single index seek. Queries name the
+        # index with INDEXED BY, since the planner otherwise picks the status index
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_todos_due_ts ON todos (due_ts) "
+            "WHERE status = 'pending' AND reminded_at IS NULL AND due_ts IS NOT NULL"
+        )
+
+    @staticmethod
+    def _due_timestamp(due_date: Optional[str]) -> Optional[float]:
+        """Convert an ISO due date to a POSIX timestamp (naive values are local time)."""
+        if not due_date:
+            return None
+        try:
+            return datetime.fromisoformat(due_date).timestamp()
+        except ValueError:
+            return None
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback run after any change that can move the next deadline.
+
+        Callbacks run on the thread that made the change.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error notifying todo listener: {e}")
+
+    @property
+    def collection(self):
+        """The legacy chromadb collection, read only for migration (None without a client)."""
+        if self._collection is None and self.client is not None:
+            self._collection = self.client.get_or_create_collection(
+                "todos", embedding_function=self.embedding_function
+            )
+        return self._collection
+
+    def _migrate_from_collection(self):
+        """Copy todos from the chromadb collection used by earlier versions, once."""
+        done = self.conn.execute("SELECT value FROM state WHERE key = 'migrated'").fetchone()
+        if done:
+            return
+        try:
+            migrated = 0
+            offset = 0
+            while True:
+                results = self.collection.get(
+                    limit=self.MIGRATION_PAGE_SIZE, offset=offset, include=['documents', 'metadatas']
+                )
+                if not results['ids']:
+                    break
+                self.upsert_todos([
+                    {'id': todo_id, 'task': task, **(metadata or {})}
+                    for todo_id, task, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+                ])
+                migrated += len(results['ids'])
+                offset += len(results['ids'])
+            with self._lock:
+                self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('migrated', ?)",
+                                  (datetime.now().isoformat(),))
+                self.conn.commit()
+            if migrated:
+                print(f"Debug: Migrated {migrated} todos to SQLite")
+        except Exception as e:
+            print(f"Error migrating todos: {e}")
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict:
+        todo = dict(row)
+        # Callers expect empty strings rather than None for optional fields
+        for key in ('due_date', 'notes'):
+            todo[key] = todo[key] or ""
+        if not todo['completed_at']:
+            del todo['completed_at']
+        # Reminder bookkeeping is internal
+        todo.pop('due_ts', None)
+        todo.pop('reminded_at', None)
+        return todo
+
+    def add_todo(self,
+                task: str,
                 priority: str = "medium",
                 category: str = "general",
                 due_date: Optional[str] = None,
@@ -22,81 +170,191 @@ class TodoManager:
         """Add a new todo item."""
         timestamp = datetime.now().isoformat()
         todo_id = f"todo_{timestamp}"
-        
-        # Ensure all metadata values are strings
-        metadata = {
-            "priority": priority.lower(),
-            "category": category,
-            "due_date": due_date if due_date else "",  # Convert None to empty string
-            "notes": notes if notes else "",  # Convert None to empty string
-            "status": "pending",
-            "created_at": timestamp
-        }
-        
-        self.todos.add(
-            documents=[task],
-            metadatas=[metadata],
-            ids=[todo_id]
-        )
+
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO todos (id, task, priority, category, due_date, notes, status, created_at, due_ts) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?)",
+                (todo_id, task, priority.lower(), category, due_date or None, notes or None, timestamp,
+                 self._due_timestamp(due_date))
+            )
+            self.conn.commit()
+        if due_date:
+            self._notify()
         return todo_id
 
-    def list_todos(self, 
-                  status: str = "pending", 
-                  category: Optional[str] = None, 
-                  priority: Optional[str] = None) -> List[Dict]:
-        """List todos with optional filters."""
-        where = {"status": status}
+    def upsert_todos(self, todos: List[Dict]):
+        """Insert or replace todos in one transaction (used by migration and bulk import)."""
+        rows = []
+        for todo in todos:
+            rows.append((
+                todo['id'],
+                todo['task'],
+                (todo.get('priority') or 'medium').lower(),
+                todo.get('category') or 'general',
+                todo.get('due_date') or None,
+                todo.get('notes') or None,
+                todo.get('status') or 'pending',
+                todo.get('created_at'),
+                todo.get('completed_at'),
+                self._due_timestamp(todo.get('due_date'))
+            ))
+        with self._lock:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO todos ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                rows
+            )
+            self.conn.commit()
+        self._notify()
+
+    def iter_todos(self, after_id: Optional[str] = None, limit: int = 500) -> List[Dict]:
+        """Return the next page of all todos in ID order after after_id (used by bulk export)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM todos WHERE id > ? ORDER BY id LIMIT ?", (after_id or "", limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def list_todos(self,
+                  status: str = "pending",
+                  category: Optional[str] = None,
+                  priority: Optional[str] = None,
+                  limit: Optional[int] = None) -> List[Dict]:
+        """List todos with optional filters, soonest due first."""
+        clauses = ["status = ?"]
+        params: List = [status]
         if category:
-            where["category"] = category
+            clauses.append("category = ?")
+            params.append(category)
         if priority:
-            where["priority"] = priority.lower()
+            clauses.append("priority = ?")
+            params.append(priority.lower())
 
-        results = self.todos.query(
-            query_texts=[""],
-            where=where
+        query = (
+            f"SELECT * FROM todos WHERE {' AND '.join(clauses)} "
+            "ORDER BY due_date IS NULL, due_date, created_at"
         )
-        
-        todos = []
-        if results and results['documents']:
-            for i, doc in enumerate(results['documents'][0]):
-                todo = {
-                    'id': results['ids'][0][i],
-                    'task': doc,
-                    **results['metadatas'][0][i]
-                }
-                todos.append(todo)
-        return todos
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [self._to_dict(row) for row in rows]
 
     def complete_todo(self, todo_id: str) -> bool:
         """Mark a todo as completed."""
         try:
-            # Get existing metadata
-            results = self.todos.query(
-                query_texts=[""],
-                where={"status": "pending"},
-                ids=[todo_id]
-            )
-            
-            if not results['metadatas']:
-                return False
-                
-            metadata = results['metadatas'][0][0]
-            metadata['status'] = 'completed'
-            metadata['completed_at'] = datetime.now().isoformat()
-            
-            # Update the todo
-            self.todos.update(
-                ids=[todo_id],
-                metadatas=[metadata]
-            )
-            return True
+            return self.complete_todos([todo_id]) > 0
         except Exception:
             return False
 
     def delete_todo(self, todo_id: str) -> bool:
         """Delete a todo item."""
         try:
-            self.todos.delete(ids=[todo_id])
-            return True
+            return self.delete_todos([todo_id]) > 0
         except Exception:
-            return False 
\ No newline at end of file
+            return False
+
+    FILTER_COLUMNS = ('status', 'category', 'priority')
+    ID_CHUNK_SIZE = 500
+
+    def _batch_targets(self, ids: Optional[List[str]], filters: Optional[Dict[str, str]]) -> List[tuple]:
+        """Build (where clause, params) pairs for a batch, chunking long ID lists."""
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        unknown = set(filters) - set(self.FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        if not ids and not filters:
+            raise ValueError("Provide todo IDs or at least one filter")
+
+        clauses = [f"{key} = ?" for key in filters]
+        params = [value.lower() if key != 'category' else value for key, value in filters.items()]
+        if not ids:
+            return [(" AND ".join(clauses), params)]
+
+        targets = []
+        for i in range(0, len(ids), self.ID_CHUNK_SIZE):
+            chunk = list(ids[i:i + self.ID_CHUNK_SIZE])
+            id_clause = f"id IN ({', '.join('?' * len(chunk))})"
+            targets.append((" AND ".join(clauses + [id_clause]), params + chunk))
+        return targets
+
+    def _run_batch(self, statement: str, statement_params: List, ids, filters) -> int:
+        """Run an UPDATE/DELETE over every target in a single transaction."""
+        targets = self._batch_targets(ids, filters)
+        changed = 0
+        with self._lock:
+            try:
+                for where, params in targets:
+                    changed += self.conn.execute(f"{statement} WHERE {where}", statement_params + params).rowcount
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        if changed:
+            self._notify()
+        return changed
+
+    def complete_todos(self, ids: Optional[List[str]] = None, filters: Optional[Dict[str, str]] = None) -> int:
+        """Mark many pending todos as completed, by ID and/or filter. Returns the number changed."""
+        if not ids and not any((filters or {}).values()):
+            raise ValueError("Provide todo IDs or at least one filter")
+        filters = {**(filters or {}), 'status': 'pending'}
+        return self._run_batch(
+            "UPDATE todos SET status = 'completed', completed_at = ?",
+            [datetime.now().isoformat()], ids, filters
+        )
+
+    def delete_todos(self, ids: Optional[List[str]] = None, filters: Optional[Dict[str, str]] = None) -> int:
+        """Delete many todos, by ID and/or filter. Returns the number deleted."""
+        return self._run_batch("DELETE FROM todos", [], ids, filters)
+
+    def set_priority(self, priority: str, ids: Optional[List[str]] = None,
+                     filters: Optional[Dict[str, str]] = None) -> int:
+        """Re-prioritize many todos, by ID and/or filter. Returns the number changed."""
+        priority = priority.lower()
+        if priority not in {p.value for p in Priority}:
+            raise ValueError(f"Invalid priority: {priority}")
+        return self._run_batch("UPDATE todos SET priority = ?", [priority], ids, filters)
+
+    def next_due_time(self) -> Optional[float]:
+        """Return the earliest due time among pending todos not yet reminded."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(due_ts) FROM todos INDEXED BY idx_todos_due_ts "
+                "WHERE status = 'pending' AND reminded_at IS NULL AND due_ts IS NOT NULL"
+            ).fetchone()
+        return row[0]
+
+    def due_before(self, timestamp: float) -> List[Dict]:
+        """Return pending, not yet reminded todos due at or before timestamp."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM todos INDEXED BY idx_todos_due_ts WHERE status = 'pending' "
+                "AND reminded_at IS NULL AND due_ts IS NOT NULL AND due_ts <= ? ORDER BY due_ts",
+                (timestamp,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def skip_overdue(self, timestamp: float) -> int:
+        """Mark pending todos due at or before timestamp as reminded without sending anything.
+
+        Returns the number of todos skipped.
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE todos INDEXED BY idx_todos_due_ts SET reminded_at = ? WHERE status = 'pending' "
+                "AND reminded_at IS NULL AND due_ts IS NOT NULL AND due_ts <= ?",
+                (datetime.now().isoformat(), timestamp)
+            )
+            self.conn.commit()
+        return cursor.rowcount
+
+    def mark_reminded(self, todo_ids: List[str]):
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE todos SET reminded_at = ? WHERE id = ?",
+                [(datetime.now().isoformat(), todo_id) for todo_id in todo_ids]
+            )
+            self.conn.commit()
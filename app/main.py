@@ -2,9 +2,12 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query, HTTPExceptio
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
+import asyncio
 import json
+import uuid
 from .core.llm import LLMManager
 from .core.file_manager import FileManager
+from .core.reminders import ReminderScheduler
 
 app = FastAPI()
 
@@ -20,10 +23,18 @@ app.add_middleware(
 class Message(BaseModel):
     message: str
     context: Optional[Dict[str, Any]] = None
+    session_id: Optional[str] = None
 
 class Command(BaseModel):
     command: str
     args: Optional[Dict[str, Any]] = None
+    session_id: Optional[str] = None
+
+class TodoBatch(BaseModel):
+    action: str  # complete, delete or priority
+    ids: Optional[List[str]] = None
+    filters: Optional[Dict[str, str]] = None  # status, category and/or priority
+    priority: Optional[str] = None
 
 class CalendarEvent(BaseModel):
     id: str
@@ -46,6 +57,8 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        # Deliver reminders that came due while nobody was connected
+        reminders.wake()
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
@@ -53,14 +66,106 @@ class ConnectionManager:
     async def send_message(self, message: Dict[str, Any], websocket: WebSocket):
         await websocket.send_json(message)
 
+    async def broadcast(self, message: Dict[str, Any]) -> int:
+        """Send a message to every connected client; returns how many received it."""
+        delivered = 0
+        for websocket in list(self.active_connections):
+            try:
+                await websocket.send_json(message)
+                delivered += 1
+            except Exception as e:
+                print(f"Error broadcasting to client: {e}")
+        return delivered
+
 manager = ConnectionManager()
+reminders = ReminderScheduler(lambda: llm_manager.container.get('todos'), manager.broadcast)
+# Keeps references to background jobs so they are not garbage collected
+background_tasks: set = set()
+
+@app.on_event("startup")
+async def start_background_jobs():
+    """Start housekeeping that should not delay the first request."""
+    file_manager.start_index()
+
+    async def memory_housekeeping():
+        try:
+            # llm_manager.memory is resolved in the worker: building it loads
+            # the chroma client and embedding model, which must stay off the loop
+            await asyncio.to_thread(lambda: llm_manager.memory.cleanup_duplicates(pause=0.01))
+            retention = await asyncio.to_thread(llm_manager.container.get, 'retention')
+        except Exception as e:
+            print(f"Error running memory cleanup: {e}")
+            return
+        # Compaction and capping of the contextual collection, on a schedule
+        await retention.run_periodically()
+
+    for job in (memory_housekeeping(), reminders.run()):
+        task = asyncio.create_task(job)
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+async def stream_reply(websocket: WebSocket, message: str, context: Dict[str, Any], session,
+                       backlog: List[Dict[str, Any]]):
+    """Stream a chat reply as "delta" frames followed by the final "message" frame.
+
+    Generation runs as a separate task raced against the socket: if the
+    client disconnects mid-reply, the task (and so the LLM call) is cancelled
+    and WebSocketDisconnect is raised. Messages that arrive while the reply
+    is streaming are appended to backlog for the caller to handle next.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_token(chunk: str):
+        await queue.put(chunk)
+
+    task = asyncio.create_task(
+        llm_manager.generate_response(message, context, on_token=on_token, session=session)
+    )
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    async def watch_socket() -> int:
+        while True:
+            event = await websocket.receive()
+            if event["type"] == "websocket.disconnect":
+                task.cancel()
+                return event.get("code", 1000)
+            backlog.append(json.loads(event.get("text") or event.get("bytes", b"").decode("utf-8")))
+
+    watcher = asyncio.create_task(watch_socket())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            await manager.send_message({"type": "delta", "content": chunk}, websocket)
+        if watcher.done():
+            raise WebSocketDisconnect(watcher.result())
+        response = await task
+    except BaseException:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    await manager.send_message({
+        "type": "message",
+        "content": response
+    }, websocket)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
+    # Clients may pass ?session_id= to keep state across reconnects;
+    # otherwise the session lives as long as this connection
+    session_id = websocket.query_params.get("session_id")
+    owns_session = session_id is None
+    session_id = session_id or uuid.uuid4().hex
+    # Messages received while a reply was streaming, handled before reading more
+    backlog: List[Dict[str, Any]] = []
     try:
         while True:
-            data = await websocket.receive_json()
+            data = backlog.pop(0) if backlog else await websocket.receive_json()
+            session = llm_manager.sessions.get(session_id)
             
             if data.get("type") == "calendar":
                 # Handle calendar-specific actions
@@ -75,7 +180,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     # Handle adding a new event
                     event_data = data.get("event", {})
                     try:
-                        event_id = llm_manager.calendar.create_event(
+                        event_id = await llm_manager.async_google.calendar.create_event(
                             summary=event_data.get("title"),
                             start_time=event_data.get("startTime"),
                             end_time=event_data.get("endTime"),
@@ -100,14 +205,22 @@ async def websocket_endpoint(websocket: WebSocket):
             
             elif "command" in data:
                 # Handle command
-                response = await llm_manager._handle_command(data["command"])
+                async with session.lock:
+                    response = await llm_manager._handle_command(data["command"], session)
                 await manager.send_message({
                     "type": "message",
                     "content": response
                 }, websocket)
+            elif data.get("stream"):
+                # Handle regular message, streaming tokens as they arrive
+                async with session.lock:
+                    await stream_reply(websocket, data["message"], data.get("context", {}), session, backlog)
             else:
                 # Handle regular message
-                response = await llm_manager.generate_response(data["message"], data.get("context", {}))
+                async with session.lock:
+                    response = await llm_manager.generate_response(
+                        data["message"], data.get("context", {}), session=session
+                    )
                 await manager.send_message({
                     "type": "message",
                     "content": response
@@ -123,24 +236,93 @@ async def websocket_endpoint(websocket: WebSocket):
             }, websocket)
         except:
             pass
+        if websocket in manager.active_connections:
+            manager.disconnect(websocket)
+    finally:
+        if owns_session:
+            llm_manager.sessions.discard(session_id)
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Report component startup times and runtime counters."""
+    container = llm_manager.container
+    turn_stats = llm_manager.turn_stats
+    metrics = {
+        "components": container.report(),
+        "async_google": llm_manager.async_google.stats,
+        "sessions": {"active": len(llm_manager.sessions), **llm_manager.sessions.stats},
+        "chat_turns": {
+            **turn_stats,
+            "avg_ttft_ms": turn_stats['ttft_ms'] / turn_stats['streams'] if turn_stats['streams'] else None
+        },
+        "reminders": reminders.stats,
+        "file_index": {"ready": file_manager.index.ready, **file_manager.index.stats},
+        "content_index": {"ready": file_manager.content_index.ready, **file_manager.content_index.stats}
+    }
+    if container.is_built('embeddings'):
+        metrics["embeddings"] = container.get('embeddings').report()
+    if container.is_built('memory'):
+        memory = container.get('memory')
+        metrics["memory"] = {
+            "cleanup": memory.cleanup_stats,
+            "fact_retriever": memory.fact_retriever.report(),
+            "interaction_retriever": memory.interaction_retriever.report()
+        }
+    if container.is_built('retention'):
+        metrics["retention"] = container.get('retention').stats
+    if container.is_built('gmail'):
+        metrics["gmail"] = llm_manager.gmail.stats
+    if container.is_built('mail_mirror'):
+        metrics["mail_mirror"] = llm_manager.mail_mirror.stats
+    if container.is_built('calendar'):
+        metrics["calendar"] = {
+            "store": llm_manager.calendar.store.stats,
+            "fetch": llm_manager.calendar.get_fetch_stats()
+        }
+    return metrics
 
 @app.post("/chat")
 async def chat(message: Message):
-    response = await llm_manager.generate_response(message.message, message.context or {})
+    session = llm_manager.sessions.get(message.session_id)
+    async with session.lock:
+        response = await llm_manager.generate_response(message.message, message.context or {}, session=session)
     return {"response": response}
 
 @app.post("/command")
 async def execute_command(command: Command):
-    response = await llm_manager._handle_command(command.command)
+    session = llm_manager.sessions.get(command.session_id)
+    async with session.lock:
+        response = await llm_manager._handle_command(command.command, session)
     return {
         "status": "success",
         "data": response
     }
 
+@app.post("/api/todos/batch")
+async def batch_todos(batch: TodoBatch):
+    """Complete, delete or re-prioritize many todos in one transaction."""
+    try:
+        todos = await asyncio.to_thread(llm_manager.container.get, 'todos')
+        if batch.action == "complete":
+            count = await asyncio.to_thread(todos.complete_todos, batch.ids, batch.filters)
+        elif batch.action == "delete":
+            count = await asyncio.to_thread(todos.delete_todos, batch.ids, batch.filters)
+        elif batch.action == "priority":
+            if not batch.priority:
+                raise ValueError("priority is required for the priority action")
+            count = await asyncio.to_thread(todos.set_priority, batch.priority, batch.ids, batch.filters)
+        else:
+            raise ValueError(f"Unknown action: {batch.action}")
+        return {"status": "success", "action": batch.action, "count": count}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/calendar/events")
 async def list_events(max_results: int = Query(default=10, ge=1, le=50)):
     try:
-        events = llm_manager.calendar.list_upcoming_events(max_results)
+        events = await llm_manager.async_google.calendar.list_upcoming_events(max_results)
         formatted_events = []
         
         for event in events:
@@ -164,7 +346,7 @@ async def get_recent_emails():
     """Get recent emails from Gmail."""
     try:
         print("Debug: Fetching recent emails from Gmail")
-        emails = llm_manager.gmail.list_recent_emails(max_results=30)
+        emails = await llm_manager.async_google.mail_mirror.list_recent_emails(max_results=30)
         print(f"Debug: Found {len(emails)} emails")
         return {"emails": emails}
     except Exception as e:
@@ -178,7 +360,7 @@ async def get_starred_emails(max_results: int = 10):
     """Get starred emails from Gmail."""
     try:
         print("Debug: Fetching starred emails from Gmail")
-        emails = llm_manager.gmail.get_starred_emails(max_results=max_results)
+        emails = await llm_manager.async_google.mail_mirror.get_starred_emails(max_results=max_results)
         print(f"Debug: Found {len(emails)} starred emails")
         return {"emails": emails}
     except Exception as e:
@@ -201,8 +383,9 @@ async def open_email(email_id: str):
 async def mark_email_as_read(email_id: str):
     """Mark an email as read."""
     try:
-        success = llm_manager.gmail.mark_as_read(email_id)
+        success = await llm_manager.async_google.gmail.mark_as_read(email_id)
         if success:
+            llm_manager.mail_mirror.mark_stale()
             return {"status": "success"}
         else:
             raise HTTPException(status_code=500, detail="Failed to mark email as read")
@@ -213,8 +396,9 @@ async def mark_email_as_read(email_id: str):
 async def star_email(email_id: str):
     """Star an email."""
     try:
-        success = llm_manager.gmail.star_email(email_id)
+        success = await llm_manager.async_google.gmail.star_email(email_id)
         if success:
+            llm_manager.mail_mirror.mark_stale()
             return {"status": "success"}
         else:
             raise HTTPException(status_code=500, detail="Failed to star email")
@@ -225,8 +409,9 @@ async def star_email(email_id: str):
 async def unstar_email(email_id: str):
     """Unstar an email."""
     try:
-        success = llm_manager.gmail.unstar_email(email_id)
+        success = await llm_manager.async_google.gmail.unstar_email(email_id)
         if success:
+            llm_manager.mail_mirror.mark_stale()
             return {"status": "success"}
         else:
             raise HTTPException(status_code=500, detail="Failed to unstar email")
@@ -238,14 +423,15 @@ async def read_email(email_id: str):
     """Read an email and mark it as read."""
     try:
         # Get the email content
-        email = llm_manager.gmail.get_email(email_id)
+        email = await llm_manager.async_google.gmail.get_email(email_id)
         if not email:
             raise HTTPException(status_code=404, detail="Email not found")
         
         # Mark it as read
-        success = llm_manager.gmail.mark_as_read(email_id)
+        success = await llm_manager.async_google.gmail.mark_as_read(email_id)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to mark email as read")
+        llm_manager.mail_mirror.mark_stale()
         
         return {"email": email}
     except Exception as e:
@@ -255,7 +441,7 @@ async def read_email(email_id: str):
 async def get_email_content(email_id: str):
     """Get the full content of an email, including HTML."""
     try:
-        email = llm_manager.gmail.get_email(email_id, include_html=True)
+        email = await llm_manager.async_google.gmail.get_email(email_id, include_html=True)
         if not email:
             raise HTTPException(status_code=404, detail="Email not found")
         return email
@@ -4,7 +4,7 @@ import { RootState } from '../../store';
 import { getCommandSuggestions, Command } from '../../utils/commands';
 import { wsService } from '../../services/websocket';
 import { ApiService } from '../../services/api';
-import { addMessage, setTyping, setError } from '../../store/slices/chatSlice';
+import { addMessage, appendToMessage, setMessageText, setTyping, setError } from '../../store/slices/chatSlice';
 import ReactMarkdown from 'react-markdown';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
 import { tomorrow } from 'react-syntax-highlighter/dist/esm/styles/prism';
@@ -24,6 +24,8 @@ const Chat: React.FC = () => {
   const [selectedSuggestion, setSelectedSuggestion] = useState(-1);
   const suggestionsRef = useRef<HTMLDivElement>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // ID of the assistant message that streamed "delta" frames are appended to
+  const streamingIdRef = useRef<string | null>(null);
   const dispatch = useAppDispatch();
   const { messages, isTyping } = useAppSelector((state: RootState) => state.chat);
   const apiService = new ApiService();
@@ -39,9 +41,48 @@ const Chat: React.FC = () => {
     const handleWebSocketMessage = (event: MessageEvent) => {
       try {
         const data = JSON.parse(event.data);
+        if (data.type === 'delta') {
+          // Streamed chat reply: the first chunk starts the message, later ones extend it
+          if (streamingIdRef.current) {
+            dispatch(appendToMessage({ id: streamingIdRef.current, text: data.content }));
+          } else {
+            streamingIdRef.current = uuidv4();
+            dispatch(setTyping(false));
+            dispatch(addMessage({
+              id: streamingIdRef.current,
+              text: data.content,
+              sender: 'assistant',
+              timestamp: Date.now()
+            }));
+          }
+          return;
+        }
+        if (data.type === 'message' && streamingIdRef.current) {
+          // The final frame carries the whole reply; it replaces the streamed text
+          dispatch(setMessageText({ id: streamingIdRef.current, text: data.content }));
+          streamingIdRef.current = null;
+          dispatch(setTyping(false));
+          return;
+        }
+        if (data.type === 'message' || data.type === 'error') {
+          streamingIdRef.current = null;
+          dispatch(setTyping(false));
+        }
+        let text: string;
+        if (typeof data === 'string') {
+          text = data;
+        } else if (data.type === 'message') {
+          // Replies that needed no LLM call arrive without deltas
+          text = data.content;
+        } else if (data.type === 'reminder') {
+          // Server-pushed "Due soon" notification; content is already markdown
+          text = `⏰ ${data.content}`;
+        } else {
+          text = JSON.stringify(data, null, 2);
+        }
         const response = {
           id: uuidv4(),
-          text: typeof data === 'string' ? data : JSON.stringify(data, null, 2),
+          text,
           sender: 'assistant' as const,
           timestamp: Date.now()
         };
@@ -74,6 +115,10 @@ const Chat: React.FC = () => {
     if (message.startsWith('/')) {
       // Send command via WebSocket
       wsService.sendMessage({ command: message });
+    } else if (wsService.isConnected()) {
+      // Stream the reply over the socket; handleWebSocketMessage renders the deltas
+      dispatch(setTyping(true));
+      wsService.sendMessage({ message, stream: true });
     } else {
       try {
         dispatch(setTyping(true));
@@ -1,3 +1,5 @@
+import { sessionId } from './session';
+
 const API_BASE_URL = `http://${window.location.hostname}:8000`;
 
 interface ApiResponse<T> {
@@ -34,7 +36,7 @@ export class ApiService {
 
   public async sendMessage(message: string): Promise<any> {
     return this.post('/chat', {
-      body: JSON.stringify({ message }),
+      body: JSON.stringify({ message, session_id: sessionId }),
     });
   }
 } 
\ No newline at end of file
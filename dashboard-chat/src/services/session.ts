@@ -0,0 +1,16 @@
+import { v4 as uuidv4 } from 'uuid';
+
+const STORAGE_KEY = 'chatSessionId';
+
+// One server-side session per browser tab, kept across reloads and
+// WebSocket reconnects so pending confirmations and email drafts survive
+const loadSessionId = (): string => {
+  let id = sessionStorage.getItem(STORAGE_KEY);
+  if (!id) {
+    id = uuidv4();
+    sessionStorage.setItem(STORAGE_KEY, id);
+  }
+  return id;
+};
+
+export const sessionId = loadSessionId();
@@ -2,6 +2,7 @@ import { store } from '../store';
 import { addEvent, updateEvent, deleteEvent } from '../store/slices/calendarSlice';
 import { addMessage, setTyping } from '../store/slices/chatSlice';
 import { v4 as uuidv4 } from 'uuid';
+import { sessionId } from './session';
 
 export class WebSocketService {
   private ws: WebSocket | null = null;
@@ -12,7 +13,7 @@ export class WebSocketService {
   }
 
   private connect() {
-    this.ws = new WebSocket(`ws://${window.location.hostname}:8000/ws`);
+    this.ws = new WebSocket(`ws://${window.location.hostname}:8000/ws?session_id=${encodeURIComponent(sessionId)}`);
     
     this.ws.onopen = () => {
       console.log('WebSocket connected');
@@ -28,6 +29,10 @@ export class WebSocketService {
     };
   }
 
+  public isConnected(): boolean {
+    return this.ws?.readyState === WebSocket.OPEN;
+  }
+
   public sendMessage(message: any) {
     if (this.ws?.readyState === WebSocket.OPEN) {
       this.ws.send(JSON.stringify(message));
@@ -26,6 +26,18 @@ const chatSlice = createSlice({
     addMessage: (state, action: PayloadAction<Message>) => {
       state.messages.push(action.payload);
     },
+    appendToMessage: (state, action: PayloadAction<{ id: string; text: string }>) => {
+      const message = state.messages.find(m => m.id === action.payload.id);
+      if (message) {
+        message.text += action.payload.text;
+      }
+    },
+    setMessageText: (state, action: PayloadAction<{ id: string; text: string }>) => {
+      const message = state.messages.find(m => m.id === action.payload.id);
+      if (message) {
+        message.text = action.payload.text;
+      }
+    },
     setTyping: (state, action: PayloadAction<boolean>) => {
       state.isTyping = action.payload;
     },
@@ -38,6 +50,6 @@ const chatSlice = createSlice({
   },
 });
 
-export const { addMessage, setTyping, setError, clearMessages } = chatSlice.actions;
+export const { addMessage, appendToMessage, setMessageText, setTyping, setError, clearMessages } = chatSlice.actions;
 
 export default chatSlice.reducer; 
\ No newline at end of file
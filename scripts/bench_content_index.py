@@ -0,0 +1,81 @@
+import sys
+import os
+import argparse
+import random
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.file_index import FileIndex
+from app.core.content_index import ContentIndex
+
+WORDS = [
+    'budget', 'meeting', 'project', 'deadline', 'review', 'invoice', 'travel', 'notes', 'draft',
+    'report', 'quarterly', 'planning', 'family', 'doctor', 'recipe', 'garden', 'server', 'python',
+    'schedule', 'contract', 'client', 'summary', 'agenda', 'design', 'launch', 'hiring', 'migration'
+]
+# Filler vocabulary with Zipf-like frequencies, so common words are common
+# and most words are rare, as in real notes
+VOCABULARY = WORDS + [f"term{i}" for i in range(20000)]
+CUM_WEIGHTS = []
+for rank, _ in enumerate(VOCABULARY, start=1):
+    CUM_WEIGHTS.append((CUM_WEIGHTS[-1] if CUM_WEIGHTS else 0) + 1 / rank)
+
+def make_tree(root: str, files: int, lines: int, per_dir: int = 100):
+    rng = random.Random(42)
+    for i in range(files):
+        directory = os.path.join(root, f"dir{i // per_dir:05d}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"note{i:06d}.md"), 'w') as f:
+            for _ in range(lines):
+                f.write(" ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=10)) + "\n")
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed * 1000:.0f}ms")
+    return elapsed, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark content indexing and search on a synthetic tree")
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--lines', type=int, default=20, help="Lines per file")
+    parser.add_argument('--changed', type=int, default=100, help="Files modified before the incremental pass")
+    parser.add_argument('--queries', type=int, default=200,
+                        help="Queries pair a common word with a mid-frequency one")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'home')
+        timed(f"Generated {args.files} files x {args.lines} lines", lambda: make_tree(root, args.files, args.lines))
+
+        file_index = FileIndex(root, set(), {'.md'}, db_path=os.path.join(tmp, 'file_index.db'))
+        timed("Filename index build", file_index.build)
+        content_index = ContentIndex(file_index, {'.md'}, db_path=os.path.join(tmp, 'content_index.db'),
+                                     max_workers=args.workers)
+
+        elapsed, _ = timed("Full content index", content_index.update)
+        print(f"  {args.files / elapsed:.0f} files/s, {args.files * args.lines / elapsed:.0f} lines/s")
+        timed("Incremental pass, nothing changed", content_index.update)
+
+        rng = random.Random(7)
+        for i in rng.sample(range(args.files), min(args.changed, args.files)):
+            path = os.path.join(root, f"dir{i // 100:05d}", f"note{i:06d}.md")
+            with open(path, 'a') as f:
+                f.write("zeppelin appended line\n")
+        timed(f"Incremental pass, {args.changed} files changed", content_index.update)
+
+        latencies = []
+        for _ in range(args.queries):
+            query = f"{rng.choice(WORDS)} {rng.choice(VOCABULARY[100:2000])}"
+            start = time.perf_counter()
+            content_index.search(query, limit=20)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"Search ({args.queries} two-word queries): p50 {statistics.median(latencies):.1f}ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms")
+        hits = content_index.search("zeppelin", limit=args.changed + 10)
+        print(f"Changed-file lookup returned {len(hits)} lines (expected {args.changed})")
@@ -0,0 +1,124 @@
+import sys
+import os
+import argparse
+import random
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromadb import Client, Settings
+
+from app.core.conversation_log import ConversationLog
+from app.core.embedding_cache import CachedEmbeddingFunction
+from app.core.memory import MemoryManager
+from scripts.bench_retrieval import HashEmbedding, sentence
+
+SEED_BATCH = 5000  # Below chromadb's maximum batch size
+
+def timed(label: str, fn, repeat: int = 1):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    if repeat == 1:
+        print(f"{label}: {latencies[0]:.1f}ms")
+    else:
+        latencies.sort()
+        print(f"{label}: p50 {statistics.median(latencies):.2f}ms, "
+              f"p95 {latencies[max(int(len(latencies) * 0.95) - 1, 0)]:.2f}ms")
+    return result
+
+def fact_metadata(memory: MemoryManager, fact: str, added_at: float) -> dict:
+    return {'category': 'general', 'type': 'long_term_fact', 'significance': 1.0,
+            'content_hash': memory._content_hash(fact), 'added_at': added_at}
+
+def seed(memory: MemoryManager, facts, duplicate_rate: float, rng: random.Random):
+    """Store facts under content-hash IDs, plus copies under other IDs as older versions left behind."""
+    added_at = time.time() - 3600
+    entries = [(memory._fact_id(fact), fact) for fact in facts]
+    entries += [(f"fact_copy_{i}", fact) for i, fact in enumerate(rng.sample(facts, int(len(facts) * duplicate_rate)))]
+    for i in range(0, len(entries), SEED_BATCH):
+        batch = entries[i:i + SEED_BATCH]
+        memory.user_facts.add(ids=[entry_id for entry_id, _ in batch], documents=[fact for _, fact in batch],
+                              metadatas=[fact_metadata(memory, fact, added_at) for _, fact in batch])
+
+def add_copies(memory: MemoryManager, facts, prefix: str):
+    memory.user_facts.add(ids=[f"{prefix}_{i}" for i in range(len(facts))], documents=list(facts),
+                          metadatas=[fact_metadata(memory, fact, time.time()) for fact in facts])
+
+def legacy_add(memory: MemoryManager, fact: str):
+    """add_long_term_fact before facts were keyed by content: fetch every fact and compare."""
+    results = memory.user_facts.get()
+    if any(fact == existing for existing in results['documents']):
+        return
+    memory.user_facts.add(ids=[f"fact_legacy_{time.perf_counter_ns()}"], documents=[fact],
+                          metadatas=[fact_metadata(memory, fact, time.time())])
+
+def legacy_cleanup(memory: MemoryManager) -> int:
+    """cleanup_duplicates before paging: fetch each whole collection and compare contents."""
+    deleted = 0
+    for collection in [memory.contextual, memory.reference, memory.user_facts]:
+        results = collection.get()
+        seen_content = {}
+        to_delete = []
+        for doc_id, content, metadata in zip(results['ids'], results['documents'], results['metadatas']):
+            significance = (metadata or {}).get('significance', 0)
+            if content in seen_content:
+                if significance > seen_content[content]['significance']:
+                    to_delete.append(seen_content[content]['id'])
+                    seen_content[content] = {'id': doc_id, 'significance': significance}
+                else:
+                    to_delete.append(doc_id)
+            else:
+                seen_content[content] = {'id': doc_id, 'significance': significance}
+        if to_delete:
+            collection.delete(ids=to_delete)
+            deleted += len(to_delete)
+    return deleted
+
+def run(size: int, args):
+    rng = random.Random(42)
+    facts = list(dict.fromkeys(f"{sentence(rng)} #{i}" for i in range(size)))
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = MemoryManager(
+            client=Client(Settings(is_persistent=True, persist_directory=os.path.join(tmp, 'memory'),
+                                   anonymized_telemetry=False)),
+            conversation_log=ConversationLog(db_path=os.path.join(tmp, 'conversations.db')),
+            embedding_function=CachedEmbeddingFunction(HashEmbedding(), db_path=None)
+        )
+        print(f"\n== {size:,} facts ({args.duplicates:.0%} stored twice) ==")
+        timed("Seed", lambda: seed(memory, facts, args.duplicates, rng))
+
+        new_facts = iter(f"{sentence(rng)} new #{i}" for i in range(args.repeat * 2))
+        timed("Insert, hash ID (add_long_term_fact)", lambda: memory.add_long_term_fact(next(new_facts)),
+              args.repeat)
+        timed("Insert, get() + linear compare (previous)", lambda: legacy_add(memory, next(new_facts)),
+              args.repeat)
+        existing = iter(rng.sample(facts, args.repeat * 2))
+        timed("Dedup hit, hash ID (add_long_term_fact)", lambda: memory.add_long_term_fact(next(existing)),
+              args.repeat)
+        timed("Dedup hit, get() + linear compare (previous)", lambda: legacy_add(memory, next(existing)),
+              args.repeat)
+
+        timed("Cleanup, first paged pass (stamps the watermark)", lambda: memory.cleanup_duplicates())
+        add_copies(memory, rng.sample(facts, args.new_duplicates), "fact_late")
+        deleted = memory.cleanup_stats['deleted']
+        timed(f"Cleanup, incremental pass over {args.new_duplicates} new copies",
+              lambda: memory.cleanup_duplicates())
+        print(f"  removed {memory.cleanup_stats['deleted'] - deleted}")
+        add_copies(memory, rng.sample(facts, args.new_duplicates), "fact_later")
+        removed = timed("Cleanup, full get() + compare (previous)", lambda: legacy_cleanup(memory))
+        print(f"  removed {removed}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fact insert/dedup and duplicate cleanup")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="Stored facts per run")
+    parser.add_argument('--repeat', type=int, default=5, help="Inserts timed per method")
+    parser.add_argument('--duplicates', type=float, default=0.05, help="Share of seeded facts stored twice")
+    parser.add_argument('--new-duplicates', type=int, default=50, help="Copies added before an incremental pass")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args)
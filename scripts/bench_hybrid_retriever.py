@@ -0,0 +1,118 @@
+import sys
+import os
+import argparse
+import random
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromadb import Client, Settings
+
+from app.core.embedding_cache import CachedEmbeddingFunction
+from app.core.hybrid_retriever import HybridRetriever
+from scripts.bench_retrieval import HashEmbedding
+
+STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'is', 'my', 'of', 'for'}
+TOPICS = ['dentist', 'soccer', 'piano', 'insurance', 'birthday', 'passport', 'garden', 'invoice', 'flight', 'school']
+# Filler vocabulary with Zipf-like frequencies
+VOCABULARY = [f"word{i}" for i in range(5000)]
+CUM_WEIGHTS = []
+for rank, _ in enumerate(VOCABULARY, start=1):
+    CUM_WEIGHTS.append((CUM_WEIGHTS[-1] if CUM_WEIGHTS else 0) + 1 / rank)
+
+def make_corpus(count: int):
+    """Facts with a unique name each, a topic and Zipf filler."""
+    rng = random.Random(42)
+    corpus = {}
+    for i in range(count):
+        words = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=12)
+        words.insert(rng.randrange(len(words)), f"name{i}")
+        words.insert(rng.randrange(len(words)), rng.choice(TOPICS))
+        corpus[f"fact_{i:06d}"] = "The " + " ".join(words)
+    return corpus
+
+def make_queries(corpus, count: int):
+    """(kind, query, relevant id) triples.
+
+    exact: the fact's unique name alone (keyword lookup)
+    partial: three of the fact's words plus two unrelated ones
+    """
+    rng = random.Random(7)
+    ids = list(corpus)
+    queries = []
+    for i in range(count):
+        doc_id = rng.choice(ids)
+        words = [w for w in corpus[doc_id].split()[1:] if not w.startswith('name')]
+        if i % 2 == 0:
+            name = next(w for w in corpus[doc_id].split() if w.startswith('name'))
+            queries.append(('exact', name, doc_id))
+        else:
+            noise = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=2)
+            queries.append(('partial', " ".join(rng.sample(words, 3) + noise), doc_id))
+    return queries
+
+def evaluate(label: str, queries, search, k: int):
+    by_kind = {}
+    for kind, query, relevant in queries:
+        start = time.perf_counter()
+        ranked = search(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        rank = ranked.index(relevant) + 1 if relevant in ranked[:k] else None
+        stats = by_kind.setdefault(kind, {'hits': 0, 'rr': 0.0, 'latency': []})
+        stats['hits'] += rank is not None
+        stats['rr'] += 1 / rank if rank else 0.0
+        stats['latency'].append(elapsed)
+    for kind, stats in by_kind.items():
+        n = len(stats['latency'])
+        latencies = sorted(stats['latency'])
+        print(f"{label:8} {kind:8} recall@{k} {stats['hits'] / n:.2f}  MRR {stats['rr'] / n:.2f}  "
+              f"p50 {statistics.median(latencies):.1f}ms  p95 {latencies[int(n * 0.95) - 1]:.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relevance and latency of vector, BM25 and hybrid fact retrieval")
+    parser.add_argument('--docs', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--model', action='store_true',
+                        help="Use chromadb's default embedding model instead of hashing embeddings")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = Client(Settings(is_persistent=True, persist_directory=tmp, anonymized_telemetry=False))
+        embeddings = CachedEmbeddingFunction(None if args.model else HashEmbedding(), db_path=None)
+        collection = client.create_collection("bench_facts", embedding_function=embeddings)
+        corpus = make_corpus(args.docs)
+        start = time.perf_counter()
+        ids = list(corpus)
+        for i in range(0, len(ids), 1000):
+            chunk = ids[i:i + 1000]
+            collection.add(ids=chunk, documents=[corpus[doc_id] for doc_id in chunk])
+        print(f"Loaded {args.docs} facts in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        retriever = HybridRetriever(collection, lambda: STOP_WORDS)
+        start = time.perf_counter()
+        retriever.bm25(['warmup'], 1)
+        print(f"Keyword index built in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        doc_ids = {document: doc_id for doc_id, document in corpus.items()}
+        queries = make_queries(corpus, args.queries)
+
+        def vector(query):
+            return collection.query(query_texts=[query], n_results=args.k, include=[])['ids'][0]
+
+        def keyword(query):
+            return [doc_id for doc_id, _ in retriever.bm25(retriever.tokenize(query), args.k)]
+
+        def hybrid(query):
+            return [doc_ids[document] for document in retriever.search(query, args.k)]
+
+        # Warm the embedding cache equally for every mode, so latency compares search work
+        for _, query, _ in queries:
+            embeddings([query])
+
+        evaluate("vector", queries, vector, args.k)
+        evaluate("bm25", queries, keyword, args.k)
+        evaluate("hybrid", queries, hybrid, args.k)
+        print(f"Hybrid searches answered from the keyword index alone: "
+              f"{retriever.stats['keyword_only']} of {retriever.stats['searches']}")
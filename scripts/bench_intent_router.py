@@ -0,0 +1,94 @@
+import sys
+import os
+import argparse
+import json
+import statistics
+import time
+from collections import Counter, defaultdict
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.intent_router import Intent, IntentRouter
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'intents.jsonl')
+TEAMS = ["Soccer Team"]
+
+# Keyword lists from generate_response before the router existed
+CALENDAR_KEYWORDS = [
+    "schedule", "appointment", "book", "calendar", "meeting",
+    "remind me", "set up", "plan for", "mark down"
+]
+CALENDAR_QUERY_KEYWORDS = [
+    "what", "when", "show", "list", "tell me", "do i have",
+    "what's", "what is", "what are", "any", "upcoming"
+]
+TIME_INDICATORS = ["today", "tomorrow", "tonight", "pm", "am", "next", "on", "at",
+                   "this week", "next week", "weekend", "month"]
+
+def keyword_scan(prompt: str, team_names=TEAMS) -> Intent:
+    """The previous routing: repeated substring scans of the lowercased prompt."""
+    if prompt.strip().startswith("/"):
+        return Intent('command', confident=True)
+    if any(keyword in prompt.lower() for keyword in CALENDAR_QUERY_KEYWORDS) and \
+       any(indicator in prompt.lower() for indicator in TIME_INDICATORS):
+        if "next" in prompt.lower():
+            search_terms = [term for term in ("practice", "game") if term in prompt.lower()]
+            search_terms += [name for name in team_names if name.lower() in prompt.lower()]
+            return Intent('calendar_next', {'search_terms': search_terms}, confident=True)
+        return Intent('calendar_query')
+    if any(keyword in prompt.lower() for keyword in CALENDAR_KEYWORDS) and \
+       any(indicator in prompt.lower() for indicator in TIME_INDICATORS):
+        return Intent('calendar_create')
+    # Checked last, and only while a calendar confirmation was pending
+    if prompt.lower() in ['yes', 'y']:
+        return Intent('confirm', confident=True)
+    if prompt.lower() in ['no', 'n']:
+        return Intent('deny', confident=True)
+    return Intent('chat')
+
+def skips_llm(intent: Intent) -> bool:
+    """Commands, confirmations, next-event lookups and confident day queries are answered without the LLM."""
+    return intent.confident
+
+def evaluate(label: str, classify, corpus, repeat: int, verbose: bool = False):
+    correct = defaultdict(int)
+    totals = Counter(row['intent'] for row in corpus)
+    latencies = []
+    skipped = 0
+    misses = []
+    for row in corpus:
+        intent = classify(row['prompt'])
+        for _ in range(repeat):
+            start = time.perf_counter()
+            classify(row['prompt'])
+            latencies.append((time.perf_counter() - start) * 1e6)
+        correct[row['intent']] += intent.name == row['intent']
+        if intent.name != row['intent']:
+            misses.append(f"{row['prompt']!r}: expected {row['intent']}, got {intent.name}")
+        skipped += skips_llm(intent)
+
+    latencies.sort()
+    print(f"\n{label}")
+    print(f"  accuracy {sum(correct.values()) / len(corpus):.1%}, LLM skipped for {skipped / len(corpus):.1%} "
+          f"of prompts, classify p50 {statistics.median(latencies):.1f}us, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}us")
+    for name in sorted(totals):
+        print(f"    {name:16} {correct[name]:3}/{totals[name]:<3} {correct[name] / totals[name]:.0%}")
+    if verbose:
+        for miss in misses:
+            print(f"    miss {miss}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark intent routing accuracy and latency on a labelled corpus")
+    parser.add_argument('--corpus', default=CORPUS, help="JSON lines of {prompt, intent}")
+    parser.add_argument('--repeat', type=int, default=200, help="Timed classifications per prompt")
+    parser.add_argument('--verbose', action='store_true', help="List misclassified prompts")
+    args = parser.parse_args()
+
+    with open(args.corpus) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    print(f"{len(corpus)} labelled prompts")
+
+    router = IntentRouter()
+    router.classify("warm up", TEAMS)  # Compile the pattern before timing
+    evaluate("Keyword scans (previous)", keyword_scan, corpus, args.repeat, args.verbose)
+    evaluate("IntentRouter", lambda prompt: router.classify(prompt, TEAMS), corpus, args.repeat, args.verbose)
@@ -0,0 +1,131 @@
+import sys
+import os
+import argparse
+import asyncio
+import hashlib
+import random
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromadb import Client, Documents, EmbeddingFunction, Embeddings, Settings
+
+from app.core.conversation_log import ConversationLog
+from app.core.embedding_cache import CachedEmbeddingFunction
+from app.core.llm import LLMManager
+from app.core.memory import MemoryManager
+
+WORDS = [
+    'budget', 'meeting', 'project', 'deadline', 'review', 'invoice', 'travel', 'soccer', 'practice',
+    'doctor', 'recipe', 'garden', 'server', 'python', 'contract', 'client', 'agenda', 'design',
+    'launch', 'hiring', 'migration', 'birthday', 'vacation', 'school', 'dentist', 'piano', 'hockey'
+]
+
+class HashEmbedding(EmbeddingFunction[Documents]):
+    """Deterministic bag-of-words hashing embedding, so the benchmark needs no model download."""
+
+    DIMENSIONS = 384
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = []
+        for text in input:
+            vector = [0.0] * self.DIMENSIONS
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.DIMENSIONS] += 1.0
+            norm = sum(x * x for x in vector) ** 0.5 or 1.0
+            vectors.append([x / norm for x in vector])
+        return vectors
+
+def sentence(rng: random.Random, words: int = 8) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def populate(memory: MemoryManager, facts: int, interactions: int, turns: int):
+    rng = random.Random(42)
+    for i in range(facts):
+        if i % 10 == 0:
+            memory.add_user_fact(f"User fact {i}: {sentence(rng)}", "personal")
+        else:
+            memory.add_long_term_fact(f"Fact {i}: {sentence(rng)}", "general")
+    for i in range(0, interactions, 500):
+        memory.add_interactions([
+            {'type': 'conversation', 'content': f"User: {sentence(rng, 12)} important\nAssistant: {sentence(rng, 20)}",
+             'timestamp': f"2024-01-01T00:00:{j:08d}"}
+            for j in range(i, min(i + 500, interactions))
+        ])
+    for i in range(turns):
+        memory.add_conversation(sentence(rng), sentence(rng, 15), session_id="bench")
+
+def percentiles(values):
+    values = sorted(values)
+    return f"p50 {statistics.median(values):.1f}ms, p95 {values[int(len(values) * 0.95) - 1]:.1f}ms"
+
+async def bench_retrieval(memory: MemoryManager, prompts):
+    """Time the old sequential lookups against the concurrent gather_context."""
+    sequential, gathered = [], []
+    for prompt in prompts:
+        start = time.perf_counter()
+        memory.get_recent_history(5, "bench")
+        memory.get_personal_info()
+        memory.get_relevant_facts(prompt, 3)
+        sequential.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await memory.gather_context(prompt, "bench")
+        gathered.append((time.perf_counter() - start) * 1000)
+    print(f"Sequential lookups: {percentiles(sequential)}")
+    print(f"gather_context:     {percentiles(gathered)}")
+
+async def bench_turns(memory: MemoryManager, prompts, llm_ms: float, use_ollama: bool):
+    """Run full chat turns and report the retrieval/LLM split recorded by LLMManager."""
+    llm = LLMManager()
+    llm.container.register('memory', lambda: memory)
+    if not use_ollama:
+        async def complete(prompt, on_token=None):
+            await asyncio.sleep(llm_ms / 1000)
+            return "Simulated reply about " + " ".join(prompt.split()[-4:])
+        llm._complete = complete
+
+    start = time.perf_counter()
+    for prompt in prompts:
+        await llm.generate_response(prompt, session=llm.sessions.get("bench"))
+    total_ms = (time.perf_counter() - start) * 1000
+
+    stats = llm.turn_stats
+    turns = stats['turns'] or 1
+    retrieval = stats['retrieval_ms'] / turns
+    generation = stats['llm_ms'] / turns
+    print(f"Chat turns ({stats['turns']}, {'Ollama' if use_ollama else f'simulated {llm_ms:.0f}ms'} LLM): "
+          f"retrieval {retrieval:.1f}ms, LLM {generation:.1f}ms, "
+          f"other {total_ms / turns - retrieval - generation:.1f}ms per turn")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-turn memory retrieval, split from LLM time")
+    parser.add_argument('--facts', type=int, default=2000)
+    parser.add_argument('--interactions', type=int, default=5000)
+    parser.add_argument('--turns', type=int, default=200, help="Stored conversation turns")
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--llm-ms', type=float, default=800, help="Simulated LLM latency")
+    parser.add_argument('--ollama', action='store_true', help="Call the real LLM instead of simulating it")
+    parser.add_argument('--model', action='store_true',
+                        help="Use chromadb's default embedding model instead of hashing embeddings")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = None if args.model else HashEmbedding()
+        embeddings = CachedEmbeddingFunction(base, db_path=None)
+        memory = MemoryManager(
+            client=Client(Settings(is_persistent=True, persist_directory=os.path.join(tmp, 'memory'),
+                                   anonymized_telemetry=False)),
+            conversation_log=ConversationLog(db_path=os.path.join(tmp, 'conversations.db')),
+            embedding_function=embeddings
+        )
+        start = time.perf_counter()
+        populate(memory, args.facts, args.interactions, args.turns)
+        print(f"Loaded {args.facts} facts, {memory.contextual.count()} interactions and {args.turns} turns "
+              f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        rng = random.Random(7)
+        prompts = [f"How is the {rng.choice(WORDS)} {rng.choice(WORDS)} going" for _ in range(args.queries)]
+        asyncio.run(bench_retrieval(memory, prompts))
+        asyncio.run(bench_turns(memory, prompts[:10], args.llm_ms, args.ollama))
@@ -0,0 +1,84 @@
+import sys
+import os
+import argparse
+import random
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromadb import Client, Settings
+
+from app.core.conversation_log import ConversationLog
+from app.core.embedding_cache import CachedEmbeddingFunction
+from app.core.memory import MemoryManager
+from scripts.bench_retrieval import HashEmbedding
+
+WORDS = [
+    'remember', 'the', 'soccer', 'practice', 'is', 'moved', 'to', 'thursday', 'please', 'note', 'that',
+    'my', 'sister', 'birthday', 'party', 'was', 'great', 'and', 'we', 'should', 'schedule', 'dinner',
+    'what', 'about', 'work', 'deadline', 'next', 'week', 'a', 'meeting', 'with', 'client', 'went', 'well'
+]
+TYPES = ['conversation', 'command', 'question', 'statement', 'email', 'calendar']
+
+def make_interactions(count: int):
+    rng = random.Random(42)
+    return [
+        {
+            'type': rng.choice(TYPES),
+            'content': f"User: {' '.join(rng.choices(WORDS, k=rng.randint(5, 40)))}.\n"
+                       f"Assistant: {' '.join(rng.choices(WORDS, k=rng.randint(10, 80)))}.",
+            'timestamp': f"2024-01-01T00:00:{i:08d}"
+        }
+        for i in range(count)
+    ]
+
+def two_pass(memory: MemoryManager, interaction):
+    """The scoring used before the single-pass pipeline: two tokenizations and ten substring scans."""
+    content = interaction['content']
+    words = memory.word_tokenize(content)
+    length_score = min(len(words) / 100, 0.5)
+    term_score = sum(term in content.lower() for term in memory.KEY_TERMS) * 0.2
+    type_score = memory.TYPE_WEIGHTS.get(interaction['type'], 0.3)
+    keywords = [word for word in memory.word_tokenize(content.lower()) if word not in memory.stop_words]
+    return min(1.0, length_score + term_score + type_score), keywords
+
+def throughput(label: str, items: int, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {items / elapsed:,.0f} items/s ({elapsed * 1000:.0f}ms for {items})")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark interaction scoring and bulk storing throughput")
+    parser.add_argument('--items', type=int, default=20000, help="Interactions to score")
+    parser.add_argument('--store-items', type=int, default=2000, help="Interactions to store")
+    parser.add_argument('--batch', type=int, default=500, help="Batch size for add_interactions")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = MemoryManager(
+            client=Client(Settings(is_persistent=True, persist_directory=os.path.join(tmp, 'memory'),
+                                   anonymized_telemetry=False)),
+            conversation_log=ConversationLog(db_path=os.path.join(tmp, 'conversations.db')),
+            embedding_function=CachedEmbeddingFunction(HashEmbedding(), db_path=None)
+        )
+        memory.word_tokenize("warm up")  # Load NLTK before timing
+        tokenizer = getattr(memory._word_tokenize, '__name__', 'unknown')
+        print(f"Tokenizer: {tokenizer}")
+
+        interactions = make_interactions(args.items)
+        before = throughput("Two-pass scoring (previous)", args.items,
+                            lambda: [two_pass(memory, item) for item in interactions])
+        after = throughput("score_interactions (single pass)", args.items,
+                           lambda: memory.score_interactions(interactions))
+        mismatches = sum(1 for a, b in zip(before, after) if abs(a[0] - b[0]) > 1e-9 or a[1] != b[1])
+        print(f"  {mismatches} of {args.items} results differ from the two-pass scoring")
+
+        stored = interactions[:args.store_items]
+        throughput("add_interaction, one at a time", len(stored), lambda: [
+            memory.add_interaction(dict(item, timestamp=f"single_{item['timestamp']}")) for item in stored
+        ])
+        throughput(f"add_interactions, batches of {args.batch}", len(stored), lambda: [
+            memory.add_interactions(stored[i:i + args.batch]) for i in range(0, len(stored), args.batch)
+        ])
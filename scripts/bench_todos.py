@@ -0,0 +1,92 @@
+import sys
+import os
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.todo_manager import TodoManager
+
+CATEGORIES = [f"category{i}" for i in range(50)]
+PRIORITIES = ["low", "medium", "high"]
+
+def make_todos(count: int):
+    rng = random.Random(42)
+    now = datetime.now()
+    for i in range(count):
+        yield {
+            'id': f"todo_{i:08d}",
+            'task': f"Task number {i}",
+            'priority': rng.choice(PRIORITIES),
+            'category': rng.choice(CATEGORIES),
+            'due_date': (now + timedelta(hours=rng.randint(-24 * 30, 24 * 90))).isoformat(timespec='seconds')
+                        if rng.random() < 0.7 else None,
+            'status': 'completed' if rng.random() < 0.5 else 'pending',
+            'created_at': (now - timedelta(minutes=i)).isoformat()
+        }
+
+def timed(label: str, fn, repeat: int = 1):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    if repeat == 1:
+        print(f"{label}: {latencies[0]:.1f}ms")
+    else:
+        latencies.sort()
+        print(f"{label}: p50 {statistics.median(latencies):.2f}ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f}ms")
+    return result
+
+def query_plan(todos: TodoManager, sql: str, params) -> str:
+    rows = todos.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark todo storage on a synthetic table")
+    parser.add_argument('--todos', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50, help="Runs per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        todos = TodoManager(db_path=os.path.join(tmp, 'todos.db'))
+        records = list(make_todos(args.todos))
+
+        def load():
+            for i in range(0, len(records), 500):
+                todos.upsert_todos(records[i:i + 500])
+        timed(f"Loaded {args.todos} todos", load)
+
+        rng = random.Random(7)
+        listed = timed("List pending (all)", lambda: todos.list_todos(), args.repeat)
+        print(f"  {len(listed)} rows, nothing truncated")
+        timed("List pending, first 20", lambda: todos.list_todos(limit=20), args.repeat)
+        timed("List pending by category", lambda: todos.list_todos(category=rng.choice(CATEGORIES)), args.repeat)
+        timed("List pending by priority, first 20",
+              lambda: todos.list_todos(priority=rng.choice(PRIORITIES), limit=20), args.repeat)
+        timed("Next due time", todos.next_due_time, args.repeat)
+        # The reminder scheduler clears long-overdue todos before each lookup
+        skipped = timed("Skip long-overdue todos", lambda: todos.skip_overdue(time.time() - 15 * 60))
+        print(f"  {skipped} rows skipped")
+        timed("Due within the next hour", lambda: todos.due_before(time.time() + 3600), args.repeat)
+
+        ids = [record['id'] for record in rng.sample(records, 1000)]
+        timed("Complete 1000 todos by ID", lambda: todos.complete_todos(ids))
+        category = rng.choice(CATEGORIES)
+        count = timed("Delete one category", lambda: todos.delete_todos(filters={'category': category}))
+        print(f"  {count} rows deleted")
+
+        order = " ORDER BY due_date IS NULL, due_date, created_at"
+        print("Query plans:")
+        print("  pending:", query_plan(todos, "SELECT * FROM todos WHERE status = ?" + order, ('pending',)))
+        print("  by category:", query_plan(
+            todos, "SELECT * FROM todos WHERE status = ? AND category = ?" + order, ('pending', CATEGORIES[0])))
+        print("  by priority:", query_plan(
+            todos, "SELECT * FROM todos WHERE status = ? AND priority = ?" + order, ('pending', 'high')))
+        print("  next due:", query_plan(
+            todos, "SELECT MIN(due_ts) FROM todos INDEXED BY idx_todos_due_ts "
+                   "WHERE status = 'pending' AND reminded_at IS NULL AND due_ts IS NOT NULL", ()))
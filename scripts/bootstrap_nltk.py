@@ -0,0 +1,11 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.nltk_resources import bootstrap, NLTK_DATA_DIR
+
+if __name__ == "__main__":
+    manifest = bootstrap()
+    for package, checksum in manifest.items():
+        print(f"{package}: {checksum}")
+    print(f"NLTK resources cached in {NLTK_DATA_DIR}")
@@ -0,0 +1,45 @@
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chromadb import Client, Settings
+from app.core.embedding_cache import CachedEmbeddingFunction
+from app.core.memory_io import export_collection, import_collection, export_todos, import_todos, CHUNK_SIZE
+from app.core.todo_manager import TodoManager
+
+COLLECTIONS = ['user_facts', 'contextual', 'reference', 'todos']
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk export/import of memory collections as JSONL")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('--dir', default='data/export', help="Directory holding <collection>.jsonl files")
+    parser.add_argument('--collections', nargs='+', default=COLLECTIONS, choices=COLLECTIONS)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--no-embeddings', action='store_true',
+                        help="Skip embeddings on export, or recompute them on import")
+    args = parser.parse_args()
+
+    client = Client(Settings(is_persistent=True, persist_directory="data/memory"))
+    embedding_function = CachedEmbeddingFunction()
+
+    for name in args.collections:
+        path = os.path.join(args.dir, f"{name}.jsonl")
+        if name == 'todos':
+            # Todos live in SQLite; the todos collection is only read for migration
+            todos = TodoManager(client=client, embedding_function=embedding_function)
+            if args.action == 'export':
+                print(f"todos: exported {export_todos(todos, path, args.chunk_size)} records to {path}")
+            elif os.path.exists(path):
+                print(f"todos: imported {import_todos(todos, path, args.chunk_size)} records from {path}")
+            continue
+
+        collection = client.get_or_create_collection(name, embedding_function=embedding_function)
+        if args.action == 'export':
+            count = export_collection(collection, path, args.chunk_size, include_embeddings=not args.no_embeddings)
+            print(f"{name}: exported {count} records to {path}")
+        elif os.path.exists(path):
+            count = import_collection(collection, path, args.chunk_size, use_embeddings=not args.no_embeddings)
+            print(f"{name}: imported {count} records from {path}")
+        else:
+            print(f"{name}: no export at {path}, skipped")
@@ -0,0 +1,116 @@
+import asyncio
+import importlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+from app.core.async_services import AsyncGoogleServices
+from app.core.container import ServiceContainer
+
+SLOW_CALL = 0.3
+
+class SlowMailMirror:
+    """Blocking stand-in for MailMirror whose listing takes SLOW_CALL seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def list_recent_emails(self, max_results: int = 30):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(SLOW_CALL)
+        with self._lock:
+            self.in_flight -= 1
+        return [{'id': str(i)} for i in range(max_results)]
+
+class EndpointLimitTest(unittest.TestCase):
+    def test_slow_endpoint_is_capped(self):
+        container = ServiceContainer()
+        mirror = SlowMailMirror()
+        container.register('mail_mirror', lambda: mirror)
+        services = AsyncGoogleServices(container, 'mail_mirror')
+
+        async def main():
+            await asyncio.gather(*(services.mail_mirror.list_recent_emails(max_results=1) for _ in range(6)))
+
+        asyncio.run(main())
+        limit = AsyncGoogleServices.ENDPOINT_LIMITS['mail_mirror.list_recent_emails']
+        self.assertEqual(mirror.max_in_flight, limit)
+        stats = services.stats['mail_mirror.list_recent_emails']
+        self.assertEqual((stats['calls'], stats['in_flight'], stats['waiting']), (6, 0, 0))
+
+class ChatDuringSlowEmailTest(unittest.TestCase):
+    """Load test: /chat keeps answering while /api/emails/recent is slow."""
+
+    EMAIL_REQUESTS = 8
+    CHAT_REQUESTS = 20
+
+    @classmethod
+    def setUpClass(cls):
+        # app.main opens its SQLite indexes under data/ at import; keep them out of the tree
+        cls.tmp = tempfile.TemporaryDirectory()
+        cwd = os.getcwd()
+        os.chdir(cls.tmp.name)
+        try:
+            cls.main = importlib.import_module('app.main')
+        finally:
+            os.chdir(cwd)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.mirror = SlowMailMirror()
+        self.main.llm_manager.container.register('mail_mirror', lambda: self.mirror)
+
+        async def generate_response(prompt, context=None, on_token=None, session=None):
+            await asyncio.sleep(0.01)
+            return f"echo: {prompt}"
+
+        patch = mock.patch.object(self.main.llm_manager, 'generate_response', side_effect=generate_response)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_chat_is_served_while_email_listing_is_slow(self):
+        async def main():
+            transport = httpx.ASGITransport(app=self.main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+                start = time.perf_counter()
+                emails = [
+                    asyncio.create_task(client.get("/api/emails/recent"))
+                    for _ in range(self.EMAIL_REQUESTS)
+                ]
+                await asyncio.sleep(0.05)  # Let the email requests occupy their workers
+
+                chat_latencies = []
+                for i in range(self.CHAT_REQUESTS):
+                    chat_start = time.perf_counter()
+                    response = await client.post("/chat", json={"message": f"hello {i}", "session_id": "load"})
+                    chat_latencies.append(time.perf_counter() - chat_start)
+                    self.assertEqual(response.json()["response"], f"echo: hello {i}")
+                chats_done = time.perf_counter() - start
+
+                responses = await asyncio.gather(*emails)
+                return chat_latencies, chats_done, time.perf_counter() - start, responses
+
+        chat_latencies, chats_done, emails_done, responses = asyncio.run(main())
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        # The email requests take several slow rounds under the endpoint limit...
+        limit = AsyncGoogleServices.ENDPOINT_LIMITS['mail_mirror.list_recent_emails']
+        self.assertGreaterEqual(emails_done, SLOW_CALL * self.EMAIL_REQUESTS / limit)
+        self.assertEqual(self.mirror.max_in_flight, limit)
+        # ...while every chat turn was answered in far less than one slow call
+        self.assertLess(max(chat_latencies), SLOW_CALL / 2)
+        self.assertLess(chats_done, emails_done)
+
+if __name__ == '__main__':
+    unittest.main()
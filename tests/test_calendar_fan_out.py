@@ -0,0 +1,57 @@
+import unittest
+from unittest import mock
+
+from app.core.calendar_manager import CalendarManager
+
+CALENDARS = {
+    'team-a@group.calendar.google.com': "Team",
+    'team-b@group.calendar.google.com': "Team",
+    'primary': "Me",
+}
+EVENTS = {
+    'team-a@group.calendar.google.com': [{'summary': "A practice", 'start': {'dateTime': "2030-01-02T10:00:00Z"}}],
+    'team-b@group.calendar.google.com': [{'summary': "B game", 'start': {'dateTime': "2030-01-01T10:00:00Z"}}],
+    'primary': [{'summary': "Dentist", 'start': {'dateTime': "2030-01-03T10:00:00Z"}}],
+}
+
+class FanOutTest(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(CalendarManager, '_authenticate'), \
+                mock.patch('app.core.calendar_manager.CalendarStore'):
+            self.calendar = CalendarManager()
+
+    def test_calendars_sharing_a_name_are_kept_apart(self):
+        def fetch(cal_id, cal_name):
+            if cal_id == 'primary':
+                raise RuntimeError("boom")
+            return cal_id
+
+        results = self.calendar.fan_out(CALENDARS, fetch)
+        self.assertEqual(results, {cal_id: cal_id for cal_id in CALENDARS if cal_id != 'primary'})
+
+        stats = self.calendar.get_fetch_stats()
+        self.assertEqual(set(stats), set(CALENDARS))
+        self.assertEqual([stats[cal_id]['name'] for cal_id in CALENDARS], ["Team", "Team", "Me"])
+        self.assertEqual(stats['primary']['errors'], 1)
+        self.assertEqual(stats['team-a@group.calendar.google.com']['calls'], 1)
+
+    def test_live_listing_merges_both_same_named_calendars(self):
+        service = mock.MagicMock()
+        service.calendarList.return_value.list.return_value.execute.return_value = {
+            'items': [{'id': cal_id, 'summary': name} for cal_id, name in CALENDARS.items()]
+        }
+
+        def list_events(calendarId, **kwargs):
+            request = mock.MagicMock()
+            request.execute.return_value = {'items': [dict(event) for event in EVENTS[calendarId]]}
+            return request
+
+        service.events.return_value.list.side_effect = list_events
+        self.calendar.service = service
+
+        events = self.calendar._list_live_events(max_results=10)
+        self.assertEqual([event['summary'] for event in events], ["B game", "A practice", "Dentist"])
+        self.assertEqual([event['calendar'] for event in events], ["Team", "Team", "Me"])
+
+if __name__ == '__main__':
+    unittest.main()
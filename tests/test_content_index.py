@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from app.core.content_index import ContentIndex
+from app.core.file_index import FileIndex
+
+class ContentIndexTest(unittest.TestCase):
+    FILES = 400
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'home')
+        for i in range(self.FILES):
+            directory = os.path.join(self.root, f"dir{i // 50}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"note{i}.md"), 'w') as f:
+                f.write(f"budget review number {i}\nsecond line\n")
+        self.file_index = FileIndex(self.root, set(), {'.md'}, db_path=os.path.join(self.tmp.name, 'files.db'))
+        self.file_index.build()
+        self.index = ContentIndex(self.file_index, {'.md'}, db_path=os.path.join(self.tmp.name, 'content.db'),
+                                  max_workers=2)
+        if not self.index.available:
+            self.skipTest("SQLite was built without FTS5")
+
+    def tearDown(self):
+        self.index.conn.close()
+        self.file_index.conn.close()
+        self.tmp.cleanup()
+
+    def test_update_and_search(self):
+        self.index.update()
+        self.assertEqual(self.index.stats['files'], self.FILES)
+        hits = self.index.search("review 17")
+        self.assertEqual([(hit['path'], hit['line']) for hit in hits], [(os.path.join("dir0", "note17.md"), 1)])
+
+    def test_stop_cancels_the_rest_of_the_pass(self):
+        self.index.BATCH_SIZE = 8
+        store = self.index._store
+
+        def store_then_stop(batch):
+            store(batch)
+            self.index.stop()
+
+        self.index._store = store_then_stop
+        self.index.update()
+        self.assertLess(self.index.stats['files'], self.FILES)
+        # An interrupted pass is not recorded as complete
+        self.assertIsNone(self.index.conn.execute("SELECT value FROM state WHERE key = 'indexed'").fetchone())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from app.core.embedding_cache import CachedEmbeddingFunction
+
+class CountingEmbedding:
+    """Fake embedding function that records every batch it is asked to embed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in input]
+
+def as_lists(vectors):
+    return [[float(x) for x in vector] for vector in vectors]
+
+class EmbeddingCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'embeddings.db')
+        self.base = CountingEmbedding()
+        self.cache = CachedEmbeddingFunction(self.base, db_path=self.db_path)
+
+    def tearDown(self):
+        self.cache.conn.close()
+        self.tmp.cleanup()
+
+    def test_one_embed_call_per_distinct_text_in_a_turn(self):
+        vectors = as_lists(self.cache(["what is due today", "budget", "what is due today"]))
+        self.assertEqual(self.base.calls, [["what is due today", "budget"]])
+        self.assertEqual(vectors[0], vectors[2])
+        self.assertEqual(self.cache.stats['misses'], 2)
+
+    def test_lru_hit(self):
+        first = as_lists(self.cache(["budget"]))
+        again = as_lists(self.cache(["budget"]))
+        self.assertEqual(first, again)
+        self.assertEqual(len(self.base.calls), 1)
+        self.assertEqual(self.cache.stats['hits'], 1)
+
+    def test_disk_hit_after_restart(self):
+        first = as_lists(self.cache(["budget"]))
+        self.cache.conn.close()
+        self.cache = CachedEmbeddingFunction(self.base, db_path=self.db_path)
+        self.assertEqual(as_lists(self.cache(["budget"])), first)
+        self.assertEqual(len(self.base.calls), 1)
+        self.assertEqual(self.cache.stats['disk_hits'], 1)
+
+    def test_disk_store_is_capped(self):
+        self.cache.conn.close()
+        self.cache = CachedEmbeddingFunction(self.base, max_entries=2, db_path=self.db_path, max_disk_entries=3)
+        for text in ["a", "b", "c", "d", "e"]:
+            self.cache([text])
+        rows = self.cache.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self.assertEqual(rows, 3)
+        self.assertEqual(self.cache.report()['disk_entries'], 3)
+        self.assertEqual(self.cache.stats['disk_evicted'], 2)
+
+        # The oldest texts were evicted from both tiers, so they are embedded again
+        self.cache(["a"])
+        self.assertEqual(self.base.calls[-1], ["a"])
+
+    def test_expired_rows_are_dropped_on_open(self):
+        self.cache(["budget"])
+        self.cache.conn.execute("UPDATE embeddings SET last_used = 0")
+        self.cache.conn.commit()
+        self.cache.conn.close()
+        self.cache = CachedEmbeddingFunction(self.base, db_path=self.db_path)
+        self.assertEqual(self.cache.stats['disk_evicted'], 1)
+        self.cache(["budget"])
+        self.assertEqual(len(self.base.calls), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import unittest
+from unittest import mock
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
+
+from app.core.gmail_manager import GmailManager
+
+BOUNDARY = "batch_test"
+
+def batch_response(parts):
+    """Build a multipart batch response from (message id, status, body) parts."""
+    body = ""
+    for msg_id, status, payload in parts:
+        reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 400: "Bad Request"}[status]
+        body += (
+            f"--{BOUNDARY}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-test + {msg_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{json.dumps(payload)}\r\n"
+        )
+    body += f"--{BOUNDARY}--"
+    headers = {'status': '200', 'content-type': f'multipart/mixed; boundary="{BOUNDARY}"'}
+    return headers, body
+
+def message(msg_id):
+    return 200, {'id': msg_id, 'labelIds': ['INBOX']}
+
+def error(status, reason):
+    return status, {'error': {'code': status, 'errors': [{'reason': reason}]}}
+
+class BatchGetMessagesTest(unittest.TestCase):
+    def make_manager(self, responses):
+        with mock.patch.object(GmailManager, '_authenticate'):
+            gmail = GmailManager()
+        self.http = HttpMockSequence(responses)
+        gmail.service = build('gmail', 'v1', http=self.http, static_discovery=True)
+        gmail.RETRY_BASE_DELAY = 0
+        return gmail
+
+    def round_trips(self):
+        # HttpMockSequence pops one response per HTTP request
+        return self.initial_responses - len(self.http._iterable)
+
+    def run_batch(self, responses, message_ids):
+        gmail = self.make_manager(responses)
+        self.initial_responses = len(responses)
+        return gmail, gmail._batch_get_messages(message_ids)
+
+    def test_whole_page_in_one_round_trip(self):
+        ids = [f"m{i}" for i in range(30)]
+        gmail, messages = self.run_batch([batch_response([(i, *message(i)) for i in ids])], ids)
+        self.assertEqual([m['id'] for m in messages], ids)
+        self.assertEqual(self.round_trips(), 1)
+        self.assertEqual(gmail.stats['batch_requests'], 1)
+
+    def test_rate_limited_parts_are_retried(self):
+        ids = ["m1", "m2", "m3"]
+        responses = [
+            batch_response([("m1", *message("m1")), ("m2", *error(429, "rateLimitExceeded")),
+                            ("m3", *error(429, "rateLimitExceeded"))]),
+            batch_response([("m2", *message("m2")), ("m3", *message("m3"))]),
+        ]
+        gmail, messages = self.run_batch(responses, ids)
+        self.assertEqual([m['id'] for m in messages], ids)
+        self.assertEqual(self.round_trips(), 2)
+        self.assertEqual(gmail.stats['batch_retries'], 2)
+
+    def test_persistent_rate_limit_raises(self):
+        failing = batch_response([("m1", *error(429, "rateLimitExceeded"))])
+        gmail = self.make_manager([failing] * (GmailManager.MAX_BATCH_RETRIES + 1))
+        with self.assertRaises(HttpError):
+            gmail._batch_get_messages(["m1"])
+
+    def test_deleted_messages_are_skipped(self):
+        _, messages = self.run_batch(
+            [batch_response([("m1", *message("m1")), ("m2", *error(404, "notFound"))])], ["m1", "m2"]
+        )
+        self.assertEqual([m['id'] for m in messages], ["m1"])
+        self.assertEqual(self.round_trips(), 1)
+
+    def test_other_errors_raise(self):
+        gmail = self.make_manager([batch_response([("m1", *error(400, "invalidArgument"))])])
+        with self.assertRaises(HttpError):
+            gmail._batch_get_messages(["m1"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import hashlib
+import unittest
+import uuid
+from unittest import mock
+
+from chromadb import Client, Documents, EmbeddingFunction, Embeddings, Settings
+
+from app.core.hybrid_retriever import HybridRetriever
+
+class WordHashEmbedding(EmbeddingFunction[Documents]):
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = []
+        for text in input:
+            vector = [0.0] * 64
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+            norm = sum(x * x for x in vector) ** 0.5 or 1.0
+            vectors.append([x / norm for x in vector])
+        return vectors
+
+DOCUMENTS = {
+    'dentist': "The dentist appointment with Dr Zorn is every March",
+    'soccer': "Soccer practice is on Tuesdays at the north field",
+    'piano': "Piano lessons moved to Thursday afternoons",
+    'car': "The car insurance renews in October",
+    'wifi': "The wifi password is on the fridge",
+}
+
+class HybridRetrieverTest(unittest.TestCase):
+    def setUp(self):
+        client = Client(Settings(anonymized_telemetry=False))
+        self.collection = client.create_collection(f"test_{uuid.uuid4().hex}", embedding_function=WordHashEmbedding())
+        self.collection.add(ids=list(DOCUMENTS), documents=list(DOCUMENTS.values()))
+        self.retriever = HybridRetriever(self.collection, lambda: {'the', 'is', 'on', 'at', 'to', 'in', 'with'})
+
+    def test_bm25_ranks_matching_documents_first(self):
+        hits = self.retriever.bm25(self.retriever.tokenize("soccer practice field"), 3)
+        self.assertEqual(hits[0][0], 'soccer')
+        self.assertEqual(len(hits), 1)
+
+    def test_exact_keyword_lookup_skips_the_embedding_call(self):
+        with mock.patch.object(self.collection, 'query', wraps=self.collection.query) as query:
+            self.assertEqual(self.retriever.search("Zorn", limit=1), [DOCUMENTS['dentist']])
+            query.assert_not_called()
+        self.assertEqual(self.retriever.stats['keyword_only'], 1)
+
+    def test_other_queries_fuse_vector_and_keyword_results(self):
+        with mock.patch.object(self.collection, 'query', wraps=self.collection.query) as query:
+            results = self.retriever.search("when does the insurance for my car renew", limit=2)
+            query.assert_called_once()
+        self.assertEqual(results[0], DOCUMENTS['car'])
+        self.assertEqual(self.retriever.stats['vector_searches'], 1)
+
+    def test_add_and_remove_keep_the_index_current(self):
+        self.retriever.search("Zorn", limit=1)  # Builds the index
+        self.collection.add(ids=['boat'], documents=["The boat needs a new Zorn propeller"])
+        self.retriever.add('boat', "The boat needs a new Zorn propeller")
+        self.assertEqual({doc_id for doc_id, _ in self.retriever.bm25(['zorn'], 5)}, {'dentist', 'boat'})
+
+        self.retriever.remove('dentist')
+        self.assertEqual([doc_id for doc_id, _ in self.retriever.bm25(['zorn'], 5)], ['boat'])
+        self.assertEqual(self.retriever.report()['documents'], len(DOCUMENTS))
+
+    def test_keyword_field_is_indexed_instead_of_text(self):
+        retriever = HybridRetriever(self.collection, set, keyword_field='keywords')
+        self.collection.update(ids=['wifi'], metadatas=[{'keywords': 'router,network'}])
+        self.assertEqual(retriever.bm25(['router'], 3)[0][0], 'wifi')
+        self.assertEqual(retriever.bm25(['fridge'], 3), [])
+
+if __name__ == '__main__':
+    unittest.main()
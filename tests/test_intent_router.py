@@ -0,0 +1,62 @@
+import json
+import os
+import unittest
+
+from app.core.intent_router import IntentRouter
+
+class IntentRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.router = IntentRouter()
+
+    def classify(self, prompt, teams=()):
+        return self.router.classify(prompt, teams)
+
+    def test_next_event_type(self):
+        intent = self.classify("When is the next practice?")
+        self.assertEqual(intent.name, 'calendar_next')
+        self.assertEqual(intent.slots['search_terms'], ['practice'])
+
+    def test_next_team_event(self):
+        intent = self.classify("when is the next soccer team game", teams=["Soccer Team"])
+        self.assertEqual(intent.name, 'calendar_next')
+        self.assertEqual(intent.slots['search_terms'], ['game', 'soccer team'])
+
+    def test_next_without_known_subject_is_not_an_event_search(self):
+        for prompt in ("what's next on my list", "what is next for me", "what's next up"):
+            intent = self.classify(prompt)
+            self.assertNotEqual(intent.name, 'calendar_next', prompt)
+            self.assertNotIn('search_terms', intent.slots, prompt)
+
+    def test_plain_day_query_is_confident(self):
+        intent = self.classify("What's on tomorrow?")
+        self.assertEqual(intent.name, 'calendar_query')
+        self.assertEqual(intent.slots['day'], 'tomorrow')
+        self.assertTrue(intent.confident)
+
+    def test_day_query_with_other_words_goes_to_llm(self):
+        intent = self.classify("what should I cook for dinner tomorrow")
+        self.assertFalse(intent.confident)
+
+    def test_keywords_match_whole_words(self):
+        # "at" inside "what" and "on" inside "money" are not time words
+        self.assertEqual(self.classify("what about money").name, 'chat')
+
+    def test_commands_and_confirmations(self):
+        self.assertEqual(self.classify("/todo list").name, 'command')
+        self.assertEqual(self.classify("Yes").name, 'confirm')
+        self.assertEqual(self.classify("n").name, 'deny')
+
+    def test_create_needs_a_time(self):
+        self.assertEqual(self.classify("schedule a meeting tomorrow at 3pm").name, 'calendar_create')
+        self.assertEqual(self.classify("I hate meetings").name, 'chat')
+
+    def test_labelled_corpus(self):
+        # scripts/bench_intent_router.py reports per-intent results on the same corpus
+        path = os.path.join(os.path.dirname(__file__), 'fixtures', 'intents.jsonl')
+        with open(path) as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+        correct = sum(self.classify(row['prompt'], ["Soccer Team"]).name == row['intent'] for row in corpus)
+        self.assertGreaterEqual(correct / len(corpus), 0.9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence
+
+from app.core.gmail_manager import GmailManager
+from app.core.mail_mirror import MailMirror
+from test_gmail_batch import batch_response
+
+def ok(payload):
+    return {'status': '200'}, json.dumps(payload)
+
+def metadata(msg_id, label_ids, date=1000):
+    return {
+        'id': msg_id, 'threadId': f"t_{msg_id}", 'internalDate': str(date), 'labelIds': label_ids,
+        'snippet': f"Snippet {msg_id}",
+        'payload': {'headers': [{'name': 'From', 'value': f"{msg_id}@example.com"},
+                                {'name': 'Subject', 'value': f"Subject {msg_id}"}]}
+    }
+
+def messages_batch(*messages):
+    return batch_response([(message['id'], 200, message) for message in messages])
+
+def full_sync(history_id, inbox, starred, messages):
+    """Responses for a full resync: profile, inbox and starred listings, then a metadata batch."""
+    return [
+        ok({'historyId': history_id}),
+        ok({'messages': [{'id': msg_id} for msg_id in inbox]}),
+        ok({'messages': [{'id': msg_id} for msg_id in starred]}),
+        messages_batch(*messages),
+    ]
+
+class MailMirrorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch.object(GmailManager, '_authenticate'):
+            self.gmail = GmailManager()
+        self.gmail.RETRY_BASE_DELAY = 0
+        self.mirror = MailMirror(self.gmail, db_path=os.path.join(self.tmp.name, 'mirror.db'))
+
+    def tearDown(self):
+        self.mirror.conn.close()
+        self.tmp.cleanup()
+
+    def respond(self, responses):
+        self.http = HttpMockSequence(responses)
+        self.gmail.service = build('gmail', 'v1', http=self.http, static_discovery=True)
+
+    def mirrored(self):
+        rows = self.mirror.conn.execute("SELECT id, label_ids FROM messages ORDER BY id").fetchall()
+        return {msg_id: json.loads(label_ids) for msg_id, label_ids in rows}
+
+    def seed(self):
+        self.respond(full_sync("100", ["m1", "m2", "m4"], ["m2"], [
+            metadata("m1", ["INBOX", "UNREAD"], 1001),
+            metadata("m2", ["INBOX", "STARRED"], 1002),
+            metadata("m4", ["INBOX"], 1004),
+        ]))
+        self.mirror.sync(force=True)
+
+    def test_full_sync(self):
+        self.seed()
+        self.assertEqual(self.mirrored(), {'m1': ["INBOX", "UNREAD"], 'm2': ["INBOX", "STARRED"], 'm4': ["INBOX"]})
+        self.assertEqual(self.mirror._get_state('history_id'), "100")
+        self.assertEqual([m['id'] for m in self.mirror._query(['INBOX', 'UNREAD'], None)], ["m1"])
+
+    def test_history_pages_are_applied(self):
+        self.seed()
+        self.respond([
+            ok({
+                'history': [
+                    {'labelsAdded': [{'message': {'id': "m1", 'labelIds': ["INBOX", "UNREAD", "STARRED"]},
+                                      'labelIds': ["STARRED"]}]},
+                    # Archived and unstarred: no mirrored label left
+                    {'labelsRemoved': [{'message': {'id': "m2", 'labelIds': ["IMPORTANT"]},
+                                        'labelIds': ["INBOX", "STARRED"]}]},
+                    # Moved into the inbox from elsewhere; not mirrored yet
+                    {'labelsAdded': [{'message': {'id': "m5", 'labelIds': ["INBOX"]}, 'labelIds': ["INBOX"]}]},
+                ],
+                'historyId': "110",
+                'nextPageToken': "page2"
+            }),
+            ok({
+                'history': [
+                    {'messagesAdded': [{'message': {'id': "m3", 'labelIds': ["INBOX", "UNREAD"]}}]},
+                    {'messagesDeleted': [{'message': {'id': "m4"}}]},
+                ],
+                'historyId': "120"
+            }),
+            messages_batch(metadata("m3", ["INBOX", "UNREAD"], 1003), metadata("m5", ["INBOX"], 1005)),
+        ])
+        self.mirror.sync(force=True)
+
+        self.assertEqual(self.mirrored(), {
+            'm1': ["INBOX", "UNREAD", "STARRED"],
+            'm3': ["INBOX", "UNREAD"],
+            'm5': ["INBOX"],
+        })
+        self.assertEqual([m['id'] for m in self.mirror._query(['STARRED'], None)], ["m1"])
+        self.assertEqual([m['id'] for m in self.mirror._query(['INBOX'], None)], ["m5", "m3", "m1"])
+        self.assertEqual(self.mirror._get_state('history_id'), "120")
+        self.assertEqual(self.mirror.stats['incremental_syncs'], 1)
+        self.assertEqual(len(self.http._iterable), 0)
+
+    def test_expired_history_id_falls_back_to_full_resync(self):
+        self.seed()
+        self.respond([
+            ({'status': '404'}, json.dumps({'error': {'code': 404, 'message': "Requested entity was not found."}})),
+            *full_sync("500", ["m6"], [], [metadata("m6", ["INBOX"], 1006)]),
+        ])
+        self.mirror.sync(force=True)
+
+        self.assertEqual(self.mirrored(), {'m6': ["INBOX"]})
+        self.assertEqual(self.mirror._get_state('history_id'), "500")
+        self.assertEqual(self.mirror.stats['history_expired'], 1)
+        self.assertEqual(self.mirror.stats['full_syncs'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
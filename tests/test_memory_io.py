@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+import uuid
+
+from chromadb import Client, Settings
+
+from app.core.memory_io import export_collection, import_collection
+
+class InterruptingCollection:
+    """Proxy for a chromadb collection whose get fails after a number of calls."""
+
+    def __init__(self, collection, fail_after):
+        self._collection = collection
+        self._calls = 0
+        self._fail_after = fail_after
+
+    def get(self, *args, **kwargs):
+        self._calls += 1
+        if self._calls > self._fail_after:
+            raise KeyboardInterrupt
+        return self._collection.get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+def vector(i):
+    return [float(i % 7), float(i % 11), 1.0]
+
+class ExportResumeTest(unittest.TestCase):
+    CHUNK = 10
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'export', 'facts.jsonl')
+        self.client = Client(Settings(anonymized_telemetry=False))
+        self.source = self.client.create_collection(f"source_{uuid.uuid4().hex}")
+        self.add(range(45))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, numbers):
+        numbers = list(numbers)
+        self.source.add(ids=[f"fact_{i:03d}" for i in numbers], documents=[f"Fact number {i}" for i in numbers],
+                        metadatas=[{'n': i} for i in numbers], embeddings=[vector(i) for i in numbers])
+
+    def interrupted_export(self, fail_after):
+        with self.assertRaises(KeyboardInterrupt):
+            export_collection(InterruptingCollection(self.source, fail_after), self.path, self.CHUNK)
+        # A crash mid-write leaves a partial line behind
+        with open(self.path, 'a') as f:
+            f.write('{"id": "fact_0')
+
+    def assert_round_trip(self):
+        target = self.client.create_collection(f"target_{uuid.uuid4().hex}")
+        import_collection(target, self.path, self.CHUNK)
+        expected = self.source.get(include=['documents', 'metadatas', 'embeddings'])
+        actual = target.get(include=['documents', 'metadatas', 'embeddings'])
+        self.assertEqual(target.count(), self.source.count())
+        def by_id(results):
+            return {
+                record_id: (document, metadata, [float(x) for x in embedding])
+                for record_id, document, metadata, embedding in zip(
+                    results['ids'], results['documents'], results['metadatas'], results['embeddings'])
+            }
+        self.assertEqual(by_id(actual), by_id(expected))
+
+    def exported_ids(self):
+        with open(self.path) as f:
+            return [line.split('"')[3] for line in f if line.endswith('\n')]
+
+    def test_interrupted_export_resumes(self):
+        # Each chunk is an ID page plus a fetch by ID; fail while fetching the third chunk
+        self.interrupted_export(fail_after=5)
+        self.assertEqual(len(self.exported_ids()), 2 * self.CHUNK)
+        self.add(range(45, 50))  # Added before the export is resumed
+        self.assertEqual(export_collection(self.source, self.path, self.CHUNK), 30)
+        ids = self.exported_ids()
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assert_round_trip()
+
+        # A finished export picks up only entries added since
+        self.add(range(50, 53))
+        self.assertEqual(export_collection(self.source, self.path, self.CHUNK), 3)
+        self.assert_round_trip()
+
+    def test_resume_after_deletes_before_the_cursor(self):
+        self.interrupted_export(fail_after=5)
+        self.source.delete(ids=["fact_000", "fact_001", "fact_002"])
+        export_collection(self.source, self.path, self.CHUNK)
+        ids = self.exported_ids()
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids) - set(self.source.get(include=[])['ids']), {"fact_000", "fact_001", "fact_002"})
+
+if __name__ == '__main__':
+    unittest.main()
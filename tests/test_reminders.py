@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from app.core.reminders import ReminderScheduler
+from app.core.todo_manager import TodoManager
+
+class ReminderSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.todos = TodoManager(db_path=os.path.join(self.tmp.name, 'todos.db'))
+
+    def tearDown(self):
+        self.todos.conn.close()
+        self.tmp.cleanup()
+
+    def add(self, task, due: timedelta):
+        self.todos.upsert_todos([{
+            'id': f"todo_{task}",
+            'task': task,
+            'due_date': (datetime.now() + due).isoformat(timespec='seconds'),
+            'created_at': datetime.now().isoformat()
+        }])
+
+    def run_once(self, connected: int = 1):
+        sent = []
+
+        async def notify(message):
+            sent.append(message)
+            return connected
+
+        async def main():
+            scheduler = ReminderScheduler(lambda: self.todos, notify, lead_time=15 * 60)
+            task = asyncio.create_task(scheduler.run())
+            await asyncio.sleep(0.2)
+            task.cancel()
+            return scheduler
+
+        return asyncio.run(main()), sent
+
+    def test_only_todos_inside_the_lead_window_are_announced(self):
+        self.add("long overdue", timedelta(days=-3))
+        self.add("just missed", timedelta(minutes=-5))
+        self.add("due soon", timedelta(minutes=10))
+        self.add("later", timedelta(days=2))
+
+        scheduler, sent = self.run_once()
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sent[0]['type'], 'reminder')
+        self.assertEqual([todo['task'] for todo in sent[0]['todos']], ["just missed", "due soon"])
+        self.assertEqual(scheduler.stats['overdue_skipped'], 1)
+        self.assertEqual(scheduler.stats['reminders_sent'], 2)
+
+        # Nothing is announced twice, and the overdue todo stays silent
+        _, sent = self.run_once()
+        self.assertEqual(sent, [])
+
+    def test_undelivered_reminders_are_kept(self):
+        self.add("due soon", timedelta(minutes=10))
+        _, sent = self.run_once(connected=0)
+        self.assertEqual(len(sent), 1)
+        _, sent = self.run_once()
+        self.assertEqual([todo['task'] for todo in sent[0]['todos']], ["due soon"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import random
+import unittest
+from unittest import mock
+
+from app.core.llm import LLMManager
+from app.core.session import Session, SessionStore
+
+class SessionStoreTest(unittest.TestCase):
+    def make_store(self, **kwargs):
+        self.dropped = []
+        return SessionStore(lambda session_id: Session(session_id, None),
+                            on_discard=lambda session_id, ended: self.dropped.append((session_id, ended)), **kwargs)
+
+    def test_lru_eviction(self):
+        store = self.make_store(max_sessions=2)
+        store.get("a")
+        store.get("b")
+        store.get("a")
+        store.get("c")
+        self.assertEqual(len(store), 2)
+        self.assertEqual(self.dropped, [("b", False)])
+        self.assertEqual(store.stats['evicted_lru'], 1)
+
+    def test_idle_eviction(self):
+        store = self.make_store(idle_timeout=60)
+        store.get("a").last_active -= 120
+        store.get("b")
+        self.assertEqual(self.dropped, [("a", False)])
+        self.assertEqual(store.stats['evicted_idle'], 1)
+
+    def test_discard_ends_session(self):
+        store = self.make_store()
+        first = store.get("a")
+        store.discard("a")
+        self.assertEqual(self.dropped, [("a", True)])
+        self.assertIsNot(store.get("a"), first)
+
+class InterleavedSessionsTest(unittest.TestCase):
+    """Many sessions confirming calendar events at once must not see each other's state."""
+
+    SESSIONS = 20
+
+    def setUp(self):
+        self.llm = LLMManager()
+        self.executed = []
+
+        async def complete(prompt, on_token=None):
+            # Yield mid-turn so the other sessions' turns interleave with this one
+            await asyncio.sleep(random.random() / 100)
+            title = prompt.split('"')[1]
+            return f'/calendar add "{title}" "2:00 PM MST tomorrow"'
+
+        async def handle_command(command, session=None):
+            await asyncio.sleep(random.random() / 100)
+            self.executed.append((session.id, command))
+            return "Event created"
+
+        patches = [
+            mock.patch.object(self.llm, '_complete', side_effect=complete),
+            mock.patch.object(self.llm, '_handle_command', side_effect=handle_command),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def turn(self, session_id: str, message: str) -> str:
+        # Same locking as the /chat and /ws handlers in main.py
+        session = self.llm.sessions.get(session_id)
+        async with session.lock:
+            return await self.llm.generate_response(message, session=session)
+
+    async def conversation(self, i: int):
+        session_id = f"user{i}"
+        reply = await self.turn(session_id, f"schedule a meeting for user {i} tomorrow at 2pm")
+        self.assertIn("Would you like me to add this event?", reply)
+        await asyncio.sleep(random.random() / 100)
+        answer = "yes" if i % 2 == 0 else "no"
+        return await self.turn(session_id, answer)
+
+    def test_pending_confirmations_stay_in_their_session(self):
+        async def main():
+            return await asyncio.gather(*(self.conversation(i) for i in range(self.SESSIONS)))
+
+        replies = asyncio.run(main())
+        for i, reply in enumerate(replies):
+            self.assertEqual(reply, "Event created" if i % 2 == 0 else "Calendar event cancelled.")
+        self.assertEqual(
+            sorted(self.executed),
+            sorted((f"user{i}", f'/calendar add "schedule a meeting for user {i} tomorrow at 2pm" '
+                                f'"2:00 PM MST tomorrow"')
+                   for i in range(0, self.SESSIONS, 2))
+        )
+        for i in range(self.SESSIONS):
+            self.assertIsNone(self.llm.sessions.get(f"user{i}").pending_calendar_command)
+
+    def test_sessions_have_separate_email_state(self):
+        first = self.llm.sessions.get("a").email_handler
+        second = self.llm.sessions.get("b").email_handler
+        self.assertIsNot(first, second)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import importlib
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from starlette.testclient import TestClient
+
+class FakeLLM:
+    """Stands in for OllamaLLM: yields the given chunks, then optionally hangs until cancelled."""
+
+    def __init__(self, chunks, hang=False):
+        self.chunks = chunks
+        self.hang = hang
+        self.cancelled = threading.Event()
+
+    async def astream(self, prompt):
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(0.01)
+                yield chunk
+            if self.hang:
+                await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+class StreamingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # app.main opens its SQLite indexes under data/ at import; keep them out of the tree
+        cls.tmp = tempfile.TemporaryDirectory()
+        cwd = os.getcwd()
+        os.chdir(cls.tmp.name)
+        try:
+            cls.main = importlib.import_module('app.main')
+        finally:
+            os.chdir(cwd)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.llm_manager = self.main.llm_manager
+        memory = mock.MagicMock()
+        memory.gather_context = mock.AsyncMock(return_value={
+            'history': "", 'personal_info': "", 'relevant_facts': "", 'reference': "", 'timings': {'total': 0.0}
+        })
+        container = self.llm_manager.container
+        self.previous_memory = container._instances.get('memory')
+        container._instances['memory'] = memory
+        self.client = TestClient(self.main.app)
+
+    def tearDown(self):
+        container = self.llm_manager.container
+        container._instances.pop('memory', None)
+        if self.previous_memory is not None:
+            container._instances['memory'] = self.previous_memory
+
+    def test_deltas_then_final_message(self):
+        streams = self.llm_manager.turn_stats['streams']
+        with mock.patch.object(self.llm_manager, 'llm', FakeLLM(["Hel", "lo", " there"])):
+            with self.client.websocket_connect("/ws") as websocket:
+                websocket.send_json({"message": "tell me a joke", "stream": True})
+                frames = [websocket.receive_json() for _ in range(4)]
+        self.assertEqual(frames, [
+            {"type": "delta", "content": "Hel"},
+            {"type": "delta", "content": "lo"},
+            {"type": "delta", "content": " there"},
+            {"type": "message", "content": "Hello there"},
+        ])
+        self.assertEqual(self.llm_manager.turn_stats['streams'], streams + 1)
+        self.assertIsNotNone(self.llm_manager.turn_stats['last_ttft_ms'])
+
+    def test_close_cancels_generation(self):
+        llm = FakeLLM(["Hel"], hang=True)
+        with mock.patch.object(self.llm_manager, 'llm', llm):
+            with self.client.websocket_connect("/ws") as websocket:
+                websocket.send_json({"message": "tell me a joke", "stream": True})
+                self.assertEqual(websocket.receive_json(), {"type": "delta", "content": "Hel"})
+            self.assertTrue(llm.cancelled.wait(5))
+
+    def test_messages_sent_mid_reply_are_answered_next(self):
+        with mock.patch.object(self.llm_manager, 'llm', FakeLLM(["a", "b", "c"])):
+            with self.client.websocket_connect("/ws") as websocket:
+                websocket.send_json({"message": "tell me a joke", "stream": True})
+                self.assertEqual(websocket.receive_json()["type"], "delta")
+                websocket.send_json({"message": "tell me another joke", "stream": True})
+                finals = []
+                while len(finals) < 2:
+                    frame = websocket.receive_json()
+                    if frame["type"] == "message":
+                        finals.append(frame)
+        self.assertEqual(finals, [{"type": "message", "content": "abc"}] * 2)
+
+if __name__ == '__main__':
+    unittest.main()
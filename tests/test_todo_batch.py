@@ -0,0 +1,157 @@
+import asyncio
+import importlib
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from app.core.todo_manager import TodoManager
+
+def make_todos(count, **fields):
+    return [{'id': f"todo_{i:05d}", 'task': f"Task {i}", 'created_at': f"2024-01-01T00:00:{i:05d}", **fields}
+            for i in range(count)]
+
+class FailingConnection:
+    """Proxy for a sqlite3 connection whose execute fails after a number of calls."""
+
+    def __init__(self, conn, fail_after):
+        self._conn = conn
+        self._calls = 0
+        self._fail_after = fail_after
+
+    def execute(self, *args):
+        self._calls += 1
+        if self._calls > self._fail_after:
+            raise RuntimeError("disk I/O error")
+        return self._conn.execute(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+class TodoBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.todos = TodoManager(db_path=os.path.join(self.tmp.name, 'todos.db'))
+
+    def tearDown(self):
+        self.todos.conn.close()
+        self.tmp.cleanup()
+
+    def count(self, **where):
+        clause = " AND ".join(f"{key} = ?" for key in where) or "1"
+        return self.todos.conn.execute(f"SELECT COUNT(*) FROM todos WHERE {clause}", list(where.values())).fetchone()[0]
+
+    def test_id_lists_longer_than_a_chunk(self):
+        count = TodoManager.ID_CHUNK_SIZE * 2 + 7
+        self.todos.upsert_todos(make_todos(count))
+        ids = [f"todo_{i:05d}" for i in range(count)] + ["todo_missing"]
+        self.assertEqual(self.todos.complete_todos(ids[:count - 1]), count - 1)
+        self.assertEqual(self.count(status='completed'), count - 1)
+        self.assertEqual(self.todos.set_priority("HIGH", ids), count)
+        self.assertEqual(self.todos.delete_todos(ids), count)
+        self.assertEqual(self.count(), 0)
+
+    def test_filter_only_batches(self):
+        self.todos.upsert_todos(make_todos(10, category='work') + [
+            {'id': f"home_{i}", 'task': "Chore", 'category': 'home', 'priority': 'low'} for i in range(5)
+        ])
+        self.assertEqual(self.todos.set_priority("high", filters={'category': 'work'}), 10)
+        self.assertEqual(self.todos.complete_todos(filters={'priority': 'LOW'}), 5)
+        # Completing again changes nothing: only pending todos are completed
+        self.assertEqual(self.todos.complete_todos(filters={'priority': 'low'}), 0)
+        self.assertEqual(self.todos.delete_todos(filters={'status': 'completed'}), 5)
+        self.assertEqual(self.count(category='work', priority='high'), 10)
+
+    def test_ids_and_filters_combine(self):
+        self.todos.upsert_todos(make_todos(4, category='work'))
+        self.todos.upsert_todos([{'id': "todo_home", 'task': "Chore", 'category': 'home'}])
+        self.assertEqual(self.todos.delete_todos(["todo_00000", "todo_home"], {'category': 'work'}), 1)
+
+    def test_rejects_unknown_filters_and_empty_batches(self):
+        self.todos.upsert_todos(make_todos(3))
+        with self.assertRaises(ValueError):
+            self.todos.delete_todos(filters={'task': 'Task 1'})
+        with self.assertRaises(ValueError):
+            self.todos.delete_todos()
+        with self.assertRaises(ValueError):
+            self.todos.delete_todos([], {'category': ''})
+        with self.assertRaises(ValueError):
+            self.todos.set_priority("urgent", ["todo_00000"])
+        self.assertEqual(self.count(), 3)
+
+    def test_failed_batch_rolls_back(self):
+        count = TodoManager.ID_CHUNK_SIZE + 10
+        self.todos.upsert_todos(make_todos(count))
+        ids = [f"todo_{i:05d}" for i in range(count)]
+        conn = self.todos.conn
+        self.todos.conn = FailingConnection(conn, fail_after=1)  # The second chunk fails
+        try:
+            with self.assertRaises(RuntimeError):
+                self.todos.delete_todos(ids)
+        finally:
+            self.todos.conn = conn
+        self.assertEqual(self.count(), count)
+
+class TodoBatchEndpointTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # app.main opens its SQLite indexes under data/ at import; keep them out of the tree
+        cls.tmp = tempfile.TemporaryDirectory()
+        cwd = os.getcwd()
+        os.chdir(cls.tmp.name)
+        try:
+            cls.main = importlib.import_module('app.main')
+        finally:
+            os.chdir(cwd)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.todos = TodoManager(db_path=os.path.join(self.tmp.name, f"todos_{self._testMethodName}.db"))
+        self.todos.upsert_todos(make_todos(3, category='work'))
+        container = self.main.llm_manager.container
+        container._instances.pop('todos', None)  # Drop the previous test's manager
+        container.register('todos', lambda: self.todos)
+
+    def tearDown(self):
+        self.todos.conn.close()
+
+    def post(self, body):
+        async def main():
+            transport = httpx.ASGITransport(app=self.main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/api/todos/batch", json=body)
+        return asyncio.run(main())
+
+    def test_batch_actions(self):
+        response = self.post({'action': 'priority', 'priority': 'high', 'filters': {'category': 'work'}})
+        self.assertEqual(response.json(), {'status': 'success', 'action': 'priority', 'count': 3})
+        response = self.post({'action': 'complete', 'ids': ["todo_00000", "todo_00001"]})
+        self.assertEqual(response.json()['count'], 2)
+        response = self.post({'action': 'delete', 'filters': {'status': 'completed'}})
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_bad_requests_are_400(self):
+        for body in (
+            {'action': 'archive', 'ids': ["todo_00000"]},
+            {'action': 'priority', 'ids': ["todo_00000"]},
+            {'action': 'priority', 'priority': 'urgent', 'ids': ["todo_00000"]},
+            {'action': 'delete', 'filters': {'task': 'Task 0'}},
+            {'action': 'delete'},
+        ):
+            response = self.post(body)
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(len(self.todos.list_todos()), 3)
+
+    def test_todo_command_reports_unknown_ids(self):
+        handle = self.main.llm_manager._handle_command
+        self.assertEqual(asyncio.run(handle("/todo done todo_missing")), "Could not find todo with ID: todo_missing")
+        self.assertEqual(asyncio.run(handle("/todo delete nope1 nope2")), "Could not find todo with ID: nope1, nope2")
+        self.assertEqual(asyncio.run(handle("/todo priority high --category home")), "No todos matched the filter")
+        self.assertEqual(asyncio.run(handle("/todo done todo_00000 todo_00001")), "Marked 2 todo(s) as completed")
+
+if __name__ == '__main__':
+    unittest.main()